@@ -0,0 +1,270 @@
+"""
+ТӨХӨӨРӨМЖ БҮРИЙН ГУЛСАХ ЦОНХНЫ АНАЛИТИК
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+get_system_efficiency нь зөвхөн агшны ΔT, 25-35°C шалгалт нь логийн
+emoji л байсан. Энд tick бүрт төхөөрөмж бүрийн цонхны статистикийг
+O(1)-ээр шинэчилж, Prometheus gauge болгон гаргана — dashboard бүр
+өгөгдлийн сан руу хүнд aggregate query явуулах шаардлагагүй:
+
+    ΔT = станцаас ирэх - станц руу буцах       mean / min / max (цонх)
+    чадал = ṁ·c·(хэрэглэгч рүү - хэрэглэгчээс)  ṁ = design_flow·√(Δp / design_dp)
+    drift = цонхны ΔT-ийн шугаман налуу (°C/цаг), босго давсан tick-ийн тоо
+    хэвийн бус = band-аас гарсан tick-ийн тоо, цонхон дахь хувь
+
+Цагираг буфер нь (W × N) массив. Дундаж, налуу нь гүйлгэх нийлбэрээр
+(ΣΔT, Σj·ΔT). Min/max нь van Herk / Gil-Werman: W tick тутам дууссан
+блокийн suffix min/max-ийг нэг удаа тооцоолж (O(W·N) / W = O(N)),
+одоогийн блокийн prefix-тэй нийлүүлнэ:
+
+    цонх = [өмнөх блок: p+1 … W-1] ∪ [одоогийн блок: 0 … p]
+    max  = max(suffix_max[p+1], prefix_max)
+
+Блок бүрийн төгсгөлд нийлбэрүүдийг буферээс яг дахин тооцоолж хөвөгч
+таслалын алдааг арилгана.
+"""
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from metrics import REGISTRY
+
+CP = 4.186  # Усны дулаан багтаамж (kJ/kg·K) — kg/s × kJ/kg·K × K = kW
+BUFFER_DTYPE = np.float32
+
+DEVICE_DELTA_T = REGISTRY.gauge(
+    'heating_device_delta_t_celsius', 'Төхөөрөмжийн ΔT (current, цонхны mean/min/max)')
+DEVICE_HEAT_POWER = REGISTRY.gauge(
+    'heating_device_heat_power_kw', 'Төхөөрөмжийн тооцоолсон дулааны чадал (current, цонхны mean)')
+DEVICE_DRIFT = REGISTRY.gauge(
+    'heating_device_delta_t_drift_celsius_per_hour', 'Цонхны ΔT-ийн налуу')
+DEVICE_OUT_OF_BAND = REGISTRY.gauge(
+    'heating_device_out_of_band_ticks', 'ΔT band-аас гарсан tick-ийн тоо (эхэлснээс)')
+FLEET_ANALYTICS = REGISTRY.gauge(
+    'heating_fleet_analytics', 'Флотын нэгтгэл (heat_power_kw, out_of_band, drifting, dt_mean)')
+
+DELTA_T_STATS = {'current': 'dt', 'mean': 'dt_mean', 'min': 'dt_min', 'max': 'dt_max'}
+HEAT_POWER_STATS = {'current': 'power_kw', 'mean': 'power_kw_mean'}
+
+class RollingAnalytics:
+    def __init__(self, size: int, window: int, channels: Sequence[str], interval: float,
+                 band: Tuple[float, float] = (25.0, 35.0), drift_threshold: float = 3.0,
+                 design_flow: float = 2.0, design_dp: float = 0.1):
+        """
+        size:            Төхөөрөмжийн тоо
+        window:          Цонхны урт (tick)
+        channels:        Уншилтын баганын дараалал (Config.SENSORS)
+        interval:        Tick хоорондын хугацаа (секунд) — налууг °C/цаг болгоно
+        band:            Хэвийн ΔT (°C)
+        drift_threshold: Drift гэж тооцох налуу (°C/цаг)
+        design_flow:     design_dp үеийн урсгал (kg/s)
+        """
+        if size <= 0 or window < 2:
+            raise ValueError("size must be positive and window at least 2")
+        index = {channel: i for i, channel in enumerate(channels)}
+        self.t_supply = index['supply_from_station_temp']
+        self.t_return = index['return_to_station_temp']
+        self.t_forward = index['forward_to_consumer_temp']
+        self.t_consumer = index['return_from_consumer_temp']
+        self.p_forward = index['forward_to_consumer_pressure']
+        self.p_consumer = index['return_from_consumer_pressure']
+
+        self.size = size
+        self.window = window
+        self.interval = interval
+        self.band = band
+        self.drift_threshold = drift_threshold
+        self.design_flow = design_flow
+        self.design_dp = design_dp
+
+        shape = (window, size)
+        self.dt_buffer = np.zeros(shape, dtype=BUFFER_DTYPE)
+        self.power_buffer = np.zeros(shape, dtype=BUFFER_DTYPE)
+        self.oob_buffer = np.zeros(shape, dtype=np.uint8)
+        self.suffix_min = np.full(shape, np.inf, dtype=BUFFER_DTYPE)
+        self.suffix_max = np.full(shape, -np.inf, dtype=BUFFER_DTYPE)
+        self.prefix_min = np.full(size, np.inf, dtype=BUFFER_DTYPE)
+        self.prefix_max = np.full(size, -np.inf, dtype=BUFFER_DTYPE)
+
+        self.dt_sum = np.zeros(size)       # ΣΔT
+        self.dt_moment = np.zeros(size)    # Σj·ΔT (j = 0 хамгийн хуучин)
+        self.power_sum = np.zeros(size)
+        self.oob_sum = np.zeros(size, dtype=np.int64)
+        self.position = 0
+        self.count = 0
+
+        self.out_of_band_count = np.zeros(size, dtype=np.int64)
+        self.drift_count = np.zeros(size, dtype=np.int64)
+
+        # Сүүлийн утгууд (snapshot / metrics)
+        self.dt = np.zeros(size)
+        self.power = np.zeros(size)
+        self.dt_min = np.zeros(size)
+        self.dt_max = np.zeros(size)
+        self.drift = np.zeros(size)
+
+    def update(self, readings):
+        """Нэг tick-ийн (N × 8) уншилт"""
+        readings = np.asarray(readings, dtype=np.float64)
+        if readings.shape[0] != self.size:
+            raise ValueError("readings rows must equal analytics size")
+
+        dt = (readings[:, self.t_supply] - readings[:, self.t_return]).astype(BUFFER_DTYPE)
+        dp = np.maximum(readings[:, self.p_forward] - readings[:, self.p_consumer], 0.0)
+        flow = self.design_flow * np.sqrt(dp / self.design_dp)
+        power = (flow * CP * (readings[:, self.t_forward] - readings[:, self.t_consumer])
+                 ).astype(BUFFER_DTYPE)
+        oob = ((dt < self.band[0]) | (dt > self.band[1])).astype(np.uint8)
+
+        p = self.position
+        n = min(self.count, self.window)
+        if self.count >= self.window:
+            old_dt = self.dt_buffer[p].astype(np.float64)
+            # Хамгийн хуучныг хасаж индексүүдийг нэгээр шилжүүлэх
+            self.dt_moment -= self.dt_sum - old_dt
+            self.dt_sum -= old_dt
+            self.power_sum -= self.power_buffer[p]
+            self.oob_sum -= self.oob_buffer[p]
+            n -= 1
+        self.dt_moment += n * dt.astype(np.float64)
+        self.dt_sum += dt
+        self.power_sum += power
+        self.oob_sum += oob
+
+        self.dt_buffer[p] = dt
+        self.power_buffer[p] = power
+        self.oob_buffer[p] = oob
+
+        # van Herk / Gil-Werman
+        if p == 0:
+            self.prefix_min[:] = dt
+            self.prefix_max[:] = dt
+        else:
+            np.minimum(self.prefix_min, dt, out=self.prefix_min)
+            np.maximum(self.prefix_max, dt, out=self.prefix_max)
+        if p + 1 < self.window:
+            self.dt_min = np.minimum(self.suffix_min[p + 1], self.prefix_min).astype(np.float64)
+            self.dt_max = np.maximum(self.suffix_max[p + 1], self.prefix_max).astype(np.float64)
+        else:
+            self.dt_min = self.prefix_min.astype(np.float64)
+            self.dt_max = self.prefix_max.astype(np.float64)
+
+        self.count += 1
+        self.position = (p + 1) % self.window
+        if self.position == 0:
+            self._seal_block()
+
+        self.dt = dt.astype(np.float64)
+        self.power = power.astype(np.float64)
+        self.out_of_band_count += oob
+        self.drift = self._slope() * (3600.0 / self.interval)
+        if self.count >= self.window:
+            self.drift_count += np.abs(self.drift) > self.drift_threshold
+
+    def _seal_block(self):
+        """Дууссан блок: suffix min/max, нийлбэрүүдийг буферээс яг тооцоолох"""
+        np.minimum.accumulate(self.dt_buffer[::-1], axis=0, out=self.suffix_min[::-1])
+        np.maximum.accumulate(self.dt_buffer[::-1], axis=0, out=self.suffix_max[::-1])
+        dt = self.dt_buffer.astype(np.float64)
+        self.dt_sum = dt.sum(axis=0)
+        self.dt_moment = np.arange(self.window, dtype=np.float64) @ dt
+        self.power_sum = self.power_buffer.sum(axis=0, dtype=np.float64)
+        self.oob_sum = self.oob_buffer.sum(axis=0, dtype=np.int64)
+
+    def _slope(self) -> np.ndarray:
+        """Цонхны ΔT-ийн хамгийн бага квадратын налуу (°C / tick)"""
+        n = min(self.count, self.window)
+        if n < 2:
+            return np.zeros(self.size)
+        sum_j = n * (n - 1) / 2
+        sum_jj = (n - 1) * n * (2 * n - 1) / 6
+        return (n * self.dt_moment - sum_j * self.dt_sum) / (n * sum_jj - sum_j * sum_j)
+
+    # ---------- үр дүн ----------
+
+    @property
+    def samples(self) -> int:
+        return min(self.count, self.window)
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """Төхөөрөмж бүрийн derived утгууд (N,)"""
+        n = max(self.samples, 1)
+        return {
+            'dt': self.dt,
+            'dt_mean': self.dt_sum / n,
+            'dt_min': self.dt_min,
+            'dt_max': self.dt_max,
+            'power_kw': self.power,
+            'power_kw_mean': self.power_sum / n,
+            'drift_c_per_h': self.drift,
+            'out_of_band': self.out_of_band_count,
+            'out_of_band_ratio': self.oob_sum / n,
+            'drift_ticks': self.drift_count,
+        }
+
+    def get_statistics(self) -> Dict:
+        """Флотын нэгтгэл"""
+        snapshot = self.snapshot()
+        return {
+            'samples': self.samples,
+            'dt_mean': round(float(snapshot['dt_mean'].mean()), 2),
+            'dt_min': round(float(self.dt_min.min()), 2),
+            'dt_max': round(float(self.dt_max.max()), 2),
+            'heat_power_kw': round(float(snapshot['power_kw_mean'].sum()), 1),
+            'out_of_band': int(np.count_nonzero((self.dt < self.band[0]) | (self.dt > self.band[1]))),
+            'out_of_band_ticks': int(self.out_of_band_count.sum()),
+            'drifting': int(np.count_nonzero(np.abs(self.drift) > self.drift_threshold)),
+        }
+
+    # ---------- checkpoint ----------
+
+    def get_state(self) -> Dict:
+        """Checkpoint-д (checkpoint.py) — сэргээсний дараа цонх хоосноос эхлэхгүй"""
+        return {
+            'dt_buffer': self.dt_buffer, 'power_buffer': self.power_buffer,
+            'oob_buffer': self.oob_buffer, 'suffix_min': self.suffix_min,
+            'suffix_max': self.suffix_max, 'prefix_min': self.prefix_min,
+            'prefix_max': self.prefix_max, 'dt_sum': self.dt_sum, 'dt_moment': self.dt_moment,
+            'power_sum': self.power_sum, 'oob_sum': self.oob_sum,
+            'out_of_band_count': self.out_of_band_count, 'drift_count': self.drift_count,
+            'dt_min': self.dt_min, 'dt_max': self.dt_max, 'dt': self.dt, 'power': self.power,
+            'drift': self.drift, 'position': self.position, 'count': self.count,
+        }
+
+    def set_state(self, state: Dict):
+        if state['dt_buffer'].shape != self.dt_buffer.shape:
+            raise ValueError("checkpoint analytics window or size differs")
+        for name, value in state.items():
+            setattr(self, name, np.array(value) if isinstance(value, np.ndarray) else value)
+
+# ============================================
+# METRICS
+# ============================================
+
+class AnalyticsPublisher:
+    """
+    RollingAnalytics-ийг Prometheus gauge болгох (утгыг scrape үед уншина)
+
+    Флотын нэгтгэл үргэлж. Төхөөрөмж бүрийн цуваа нь max_series хүртэл —
+    10000 төхөөрөмж × 8 цуваа /metrics-ийг хэт томруулна.
+    """
+
+    def __init__(self, analytics: RollingAnalytics, device_ids: Sequence[str],
+                 max_series: int = 100):
+        self.analytics = analytics
+        for stat in ('heat_power_kw', 'out_of_band', 'drifting', 'dt_mean'):
+            FLEET_ANALYTICS.labels(stat=stat).set_function(
+                lambda stat=stat: analytics.get_statistics()[stat])
+        if len(device_ids) > max_series:
+            return
+        for i, device_id in enumerate(device_ids):
+            for stat, name in DELTA_T_STATS.items():
+                DEVICE_DELTA_T.labels(device=device_id, stat=stat).set_function(self._reader(name, i))
+            for stat, name in HEAT_POWER_STATS.items():
+                DEVICE_HEAT_POWER.labels(device=device_id, stat=stat).set_function(self._reader(name, i))
+            DEVICE_DRIFT.labels(device=device_id).set_function(self._reader('drift_c_per_h', i))
+            DEVICE_OUT_OF_BAND.labels(device=device_id).set_function(self._reader('out_of_band', i))
+
+    def _reader(self, name: str, index: int):
+        return lambda: round(float(self.analytics.snapshot()[name][index]), 3)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+ОЛОН ТӨХӨӨРӨМЖИЙН ASYNC HTTP ИЛГЭЭГЧ
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+DataSender-ийн asyncio хувилбар:
+    • Хязгаартай холболтын pool (aiohttp.TCPConnector)
+    • Нэгэн зэрэг илгээх хүсэлтийн хязгаар (Semaphore)
+    • Хүсэлт бүрийн хугацааны хязгаар
+    • Төхөөрөмж бүрийн амжилттай/амжилтгүй тоолуур
+
+Нэг удаагийн удаан POST бусад төхөөрөмжийн илгээлтийг зогсоохгүй.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from metrics import SEND_RESULTS, STAGE_SECONDS
+from scheduler import StaggeredScheduler
+from simulator import (Config, encode_json, fleet_measurement_ids, logger, sensor_ids_resolved,
+                       setup_deadband, setup_logger, start_sensor_registry)
+from wire import CONTENT_TYPES, JSON, WireEncoder
+
+# ============================================
+# ASYNC ИЛГЭЭГЧ
+# ============================================
+
+class AsyncDataSender:
+    def __init__(self, url: str,
+                 max_connections: int = Config.HTTP_MAX_CONNECTIONS,
+                 concurrency: int = Config.HTTP_CONCURRENCY,
+                 timeout: float = Config.HTTP_TIMEOUT,
+                 encoding: str = Config.WIRE_ENCODING):
+        self.url = url
+        self.max_connections = max_connections
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.timezone = timezone(timedelta(hours=8))  # GMT+8
+
+        self.success_count = 0
+        self.failed_count = 0
+        self.unresolved_count = 0
+        self.dropped_count = 0
+        self.device_counts: Dict[str, List[int]] = {}  # device_id → [success, failed]
+        self.sensor_ids: Dict[str, Dict[str, int]] = {}  # device_id → SensorRegistry.sensor_ids
+        self.encoder = WireEncoder(encoding, Config.SENSORS) if encoding != JSON else None
+        self.headers = {'Content-Type': CONTENT_TYPES[encoding]}
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def open(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _count(self, device_id: str, ok: bool):
+        counts = self.device_counts.setdefault(device_id, [0, 0])
+        if ok:
+            self.success_count += 1
+            counts[0] += 1
+        else:
+            self.failed_count += 1
+            counts[1] += 1
+
+    def drop(self, count: int):
+        """Илгээлгүй хаясан уншилтыг тоолох (хүлээгдэж буй хүсэлт хэт олон)"""
+        self.dropped_count += count
+        SEND_RESULTS.labels(result='dropped').inc(count)
+
+    async def send(self, device_id: str, readings: Dict[str, float],
+                   timestamp: Optional[datetime] = None) -> bool:
+        timestamp = timestamp or datetime.now(self.timezone)
+        sensor_ids = self.sensor_ids.get(device_id)
+        if not sensor_ids_resolved(sensor_ids):
+            # 0 ID-тай баримтыг сервер ялгаж чадахгүй — бүртгэл татагдтал алгасна
+            self.unresolved_count += 1
+            if self.unresolved_count == 1 or self.unresolved_count % 1000 == 0:
+                logger.error(f"❌ [{device_id}] sensorObjectId тодорхойгүй — алгаслаа "
+                             f"({self.unresolved_count} удаа)")
+            return False
+        if self.encoder is not None:
+            body = self.encoder.encode(sensor_ids, timestamp, readings)
+        else:
+            body = encode_json(readings, timestamp, sensor_ids)
+
+        async with self._semaphore:
+            try:
+                with STAGE_SECONDS.labels(stage='http').time():
+                    async with self.session.post(self.url, data=body,
+                                                 headers=self.headers) as response:
+                        ok = response.status == 200
+                    if not ok:
+                        logger.error(f"❌ [{device_id}] HTTP {response.status}")
+            except asyncio.TimeoutError:
+                ok = False
+                logger.error(f"❌ [{device_id}] Хугацаа хэтэрлээ ({self.timeout}s)")
+            except aiohttp.ClientError as e:
+                ok = False
+                logger.error(f"❌ [{device_id}] Алдаа: {str(e)}")
+
+        self._count(device_id, ok)
+        return ok
+
+    async def send_many(self, items: Iterable[Tuple[str, Dict[str, float]]],
+                        timestamp: Optional[datetime] = None) -> List[bool]:
+        """Олон төхөөрөмжийн өгөгдлийг зэрэг илгээх (timestamp None бол одоо)"""
+        timestamp = timestamp or datetime.now(self.timezone)
+        return await asyncio.gather(*(
+            self.send(device_id, readings, timestamp)
+            for device_id, readings in items
+        ))
+
+    def get_statistics(self, device_id: Optional[str] = None) -> Dict:
+        if device_id is None:
+            success, failed = self.success_count, self.failed_count
+        else:
+            success, failed = self.device_counts.get(device_id, (0, 0))
+        total = success + failed
+        success_rate = (success / total * 100) if total > 0 else 0
+        return {
+            'success': success,
+            'failed': failed,
+            'total': total,
+            'success_rate': round(success_rate, 2),
+            'unresolved': self.unresolved_count,
+            'dropped': self.dropped_count,
+        }
+
+# ============================================
+# ФЛОТЫН ДАВТАЛТ
+# ============================================
+
+async def run_fleet(size: int = Config.FLEET_SIZE, url: str = Config.SERVER_URL,
+                    interval: float = Config.SEND_INTERVAL):
+    from fleet import create_fleet
+
+    fleet = create_fleet(size)
+    size = fleet.size
+    scheduler = StaggeredScheduler(interval, size, policy=Config.TICK_POLICY)
+    deadband = setup_deadband() if Config.DEADBAND_ENABLED else None
+    rows = [None] * size  # Эхний алхам эхний бүлэг дээр — RNG-ийн tick шатаахгүй
+    previous_start = None
+    pending = set()
+
+    logger.info(f"🏭 {size} төхөөрөмж → {url} (async, "
+                f"pool={Config.HTTP_MAX_CONNECTIONS}, concurrency={Config.HTTP_CONCURRENCY}, "
+                f"{scheduler.slots} slot)")
+
+    async with AsyncDataSender(url) as sender:
+        # Кэшээс шууд, дутууг нь ард талын thread-д зэрэг — давталтыг хүлээлгэхгүй
+        measurement_ids = fleet_measurement_ids(size)
+        registry = start_sensor_registry(measurement_ids)
+        for device_id, measurement_id in zip(fleet.device_ids, measurement_ids):
+            sender.sensor_ids[device_id] = registry.sensor_ids(measurement_id)
+
+        try:
+            while True:
+                group = await scheduler.wait_async()
+
+                # Интервал бүрийн эхэнд бүх флотыг нэг алхмаар тооцоолно (0-р slot
+                # алгасагдсан ч шинэ интервалд орсон бол)
+                new_interval = previous_start is None or group.start <= previous_start
+                previous_start = group.start
+                if new_interval:
+                    readings = fleet.step()
+                    if deadband is not None:
+                        rows = deadband.filter_rows(readings, datetime.now().timestamp())
+                    else:
+                        rows = fleet.readings_frames(readings)
+                    stats = sender.get_statistics()
+                    tick_stats = scheduler.get_statistics()
+                    logger.info(f"📈 ✅ {stats['success']} ❌ {stats['failed']} "
+                                f"({stats['success_rate']:.1f}%), 🗑️ {stats['dropped']}, "
+                                f"jitter {tick_stats['jitter_mean_ms']:.1f} ms, "
+                                f"{tick_stats['overruns']} хэтрэлт")
+                    if deadband is not None:
+                        deadband_stats = deadband.get_statistics()
+                        logger.info(f"🔇 {deadband_stats['suppression_ratio'] * 100:.1f}% дарагдсан "
+                                    f"({deadband_stats['keyframes']} keyframe)")
+
+                # Илгээлтийг хүлээхгүй — удаан хариу дараагийн slot-ыг хойшлуулахгүй
+                indices = [i for i in group if rows[i]]
+                if len(pending) >= Config.HTTP_MAX_PENDING:
+                    # Сервер удаашрахад task-ууд хязгааргүй хуримтлахгүйн тулд бүлгийг хаяна
+                    if indices:
+                        sender.drop(len(indices))
+                        if deadband is not None:
+                            deadband.force_keyframe(indices)
+                        if sender.dropped_count == len(indices) or new_interval:
+                            logger.warning(f"⚠️  {len(pending)} бүлэг хариу хүлээж байна — "
+                                           f"{len(indices)} төхөөрөмж алгаслаа "
+                                           f"(нийт {sender.dropped_count})")
+                    continue
+                items = [(fleet.device_ids[i], rows[i]) for i in indices]
+                task = asyncio.ensure_future(sender.send_many(items))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                if deadband is not None:
+                    task.add_done_callback(
+                        lambda task, indices=indices: _resync_deadband(deadband, indices, task))
+        finally:
+            # Session хаагдахаас өмнө — "Task was destroyed" / unclosed connector үлдээхгүй
+            registry.stop()
+            leftover = list(pending)
+            for task in leftover:
+                task.cancel()
+            if leftover:
+                await asyncio.gather(*leftover, return_exceptions=True)
+
+def _resync_deadband(deadband, indices: List[int], task: asyncio.Future):
+    """Хүрээгүй төхөөрөмжүүдийн бүх утгыг дараагийн tick-т keyframe-ээр"""
+    if task.cancelled() or task.exception() is not None:
+        deadband.force_keyframe(indices)
+        return
+    failed = [i for i, ok in zip(indices, task.result()) if not ok]
+    if failed:
+        deadband.force_keyframe(failed)
+
+def main():
+    setup_logger()
+    try:
+        asyncio.run(run_fleet())
+    except KeyboardInterrupt:
+        logger.info("\n⚠️  Ctrl+C - Зогсож байна")
+
+if __name__ == "__main__":
+    main()
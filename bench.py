@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+СИМУЛЯТОРЫН ХУРДНЫ ХЭМЖИЛТ (BENCHMARK)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Халуун замуудыг 1, 100, 10 000 төхөөрөмж дээр хэмжиж JSON файлд бичнэ:
+
+    physics_scalar   HeatingSystem.calculate_all_readings × N
+    physics_fleet    HeatingFleet.step (N × 8 матриц)
+    physics_network  ThermalNetwork.step (sparse шийдэгч, N дэд станц)
+    payload          build_payload × N
+    serialize_json   json.dumps × N
+    serialize_frame  encode_json(ReadingFrame) × N (загвараар, dict-гүй)
+    serialize_struct WireEncoder('struct') × N
+    log_readings     _print_readings × N (гаралтгүй, форматлалт орно)
+    full_tick        орлолт сервер рүү бүтэн tick: N=1 бол физик → лог →
+                     DataSender, үгүй бол HeatingFleet → AsyncDataSender
+
+Хоёр хэмжилтийг харьцуулах:
+
+    python bench.py --output before.json
+    python bench.py --output after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from functools import cached_property
+from typing import Callable, Dict, List
+
+import numpy as np
+
+import simulator
+from simulator import (Config, DataSender, HeatingSubstationSimulator, HeatingSystem,
+                       build_payload, encode_json, logger, setup_logger)
+from wire import STRUCT, WireEncoder
+
+SIZES = (1, 100, 10000)
+
+def measure(function: Callable[[], None], repeat: int, budget: float,
+            min_sample: float = 0.01) -> List[float]:
+    """
+    Нэг дуудлагын хугацааг repeat удаа хэмжих (budget секунд дуусвал зогсоно)
+
+    Богино функцийг нэг дээжид min_sample секунд хүртэл давтаж, дунджийг
+    авна — микросекундын хэмжилт цагийн нарийвчлалд живэхгүй.
+    """
+    t0 = time.perf_counter()
+    function()  # халаалт
+    number = max(1, int(min_sample / max(time.perf_counter() - t0, 1e-9)))
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeat and (not times or time.perf_counter() - started < budget):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - t0) / number)
+    return times
+
+def silence_logging():
+    """Лог бичлэгийг /dev/null руу чиглүүлэх — форматлалт хэмжигдэнэ, дэлгэц дүүрэхгүй"""
+    setup_logger()
+    sink = logging.StreamHandler(open(os.devnull, 'w', encoding='utf-8'))
+    sink.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    if simulator.log_listener is not None:
+        simulator.log_listener.handlers = (sink,)
+    else:
+        logger.handlers = [sink]
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+# ============================================
+# ХЭМЖИЛТҮҮД
+# ============================================
+
+class Cases:
+    """
+    Нэг хэмжээний (size) хэмжилтүүд
+
+    Бэлтгэл (флот, сүлжээ + халаалтын tick, симулятор, session) нь
+    cached_property — --only-д ороогүй хэмжилтийн бэлтгэл хийгдэхгүй.
+    """
+
+    NAMES = ('physics_scalar', 'physics_fleet', 'physics_network', 'payload',
+             'serialize_json', 'serialize_frame', 'serialize_struct', 'log_readings',
+             'full_tick')
+
+    def __init__(self, size: int, base_url: str, cleanups: List[Callable[[], None]]):
+        self.size = size
+        self.base_url = base_url
+        self.cleanups = cleanups
+
+    def build(self, name: str) -> Callable[[], None]:
+        return getattr(self, name)()
+
+    @cached_property
+    def system(self) -> HeatingSystem:
+        return HeatingSystem()
+
+    @cached_property
+    def fleet(self):
+        from fleet import HeatingFleet
+        return HeatingFleet(self.size)
+
+    @cached_property
+    def timestamp(self) -> datetime:
+        return datetime.now(self.system.clock.timezone)
+
+    @cached_property
+    def matrix(self) -> np.ndarray:
+        return self.fleet.step()
+
+    @cached_property
+    def rows(self) -> List[Dict[str, float]]:
+        return [self.fleet.readings_dict(self.matrix, i) for i in range(self.size)]
+
+    @cached_property
+    def sensor_ids(self) -> Dict[str, int]:
+        from stub_server import stub_sensor_ids
+        return stub_sensor_ids(1)
+
+    @cached_property
+    def sim(self) -> HeatingSubstationSimulator:
+        return HeatingSubstationSimulator()
+
+    def physics_scalar(self):
+        system, size = self.system, self.size
+
+        def physics_scalar():
+            for _ in range(size):
+                system.calculate_all_readings()
+        return physics_scalar
+
+    def physics_fleet(self):
+        return self.fleet.step
+
+    def physics_network(self):
+        from network import ThermalNetwork
+        return ThermalNetwork.generate(self.size, seed=1).step
+
+    def payload(self):
+        rows, timestamp, sensor_ids = self.rows, self.timestamp, self.sensor_ids
+
+        def payload():
+            for readings in rows:
+                build_payload(readings, timestamp, sensor_ids)
+        return payload
+
+    def serialize_json(self):
+        payloads = [build_payload(readings, self.timestamp, self.sensor_ids)
+                    for readings in self.rows]
+
+        def serialize_json():
+            for document in payloads:
+                json.dumps(document)
+        return serialize_json
+
+    def serialize_frame(self):
+        frames = self.fleet.readings_frames(self.matrix)
+        timestamp, sensor_ids = self.timestamp, self.sensor_ids
+
+        def serialize_frame():
+            for frame in frames:
+                encode_json(frame, timestamp, sensor_ids)
+        return serialize_frame
+
+    def serialize_struct(self):
+        encoder = WireEncoder(STRUCT, Config.SENSORS)
+        rows, timestamp, sensor_ids = self.rows, self.timestamp, self.sensor_ids
+
+        def serialize_struct():
+            for readings in rows:
+                encoder.encode(sensor_ids, timestamp, readings)
+        return serialize_struct
+
+    def log_readings(self):
+        sim, rows = self.sim, self.rows
+        efficiency = self.system.get_system_efficiency(rows[0])
+
+        def log_readings():
+            for readings in rows:
+                sim._print_readings(readings, efficiency)
+        return log_readings
+
+    def full_tick(self):
+        if self.size == 1:
+            sim = self.sim
+            sender = DataSender(self.base_url + '/v/value', sensor_ids=self.sensor_ids)
+
+            def full_tick():
+                readings = sim.heating_system.calculate_all_readings()
+                sim._log_tick(readings, sim.heating_system.get_system_efficiency(readings))
+                sender.send(readings, sim.clock.now())
+            return full_tick
+
+        from async_sender import AsyncDataSender
+        from stub_server import stub_sensor_ids
+
+        fleet = self.fleet
+        loop = asyncio.new_event_loop()
+        async_sender = AsyncDataSender(self.base_url + '/v/value')
+        async_sender.sensor_ids = {device_id: stub_sensor_ids(i + 1)
+                                   for i, device_id in enumerate(fleet.device_ids)}
+        loop.run_until_complete(async_sender.open())
+        self.cleanups.append(lambda: loop.run_until_complete(async_sender.close()))
+
+        def full_tick():
+            matrix = fleet.step()
+            loop.run_until_complete(async_sender.send_many(
+                zip(fleet.device_ids, fleet.readings_frames(matrix))
+            ))
+        return full_tick
+
+def run(sizes, repeat: int, budget: float, only: List[str] = None) -> Dict:
+    from stub_server import start_stub_server
+
+    Config.SPOOL_ENABLED = False
+    silence_logging()
+    server = start_stub_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = []
+    for size in sizes:
+        cleanups = []
+        cases = Cases(size, base_url, cleanups)
+        for name in Cases.NAMES:
+            if only and name not in only:
+                continue
+            function = cases.build(name)
+            times = measure(function, repeat, budget)
+            median = statistics.median(times)
+            results.append({
+                'name': name,
+                'devices': size,
+                'runs': len(times),
+                'median_s': median,
+                'min_s': min(times),
+                'mean_s': statistics.fmean(times),
+                'per_device_us': median / size * 1e6,
+            })
+            print(f"{name:18} {size:6} төхөөрөмж  {median * 1000:10.3f} ms  "
+                  f"{median / size * 1e6:9.2f} µs/төхөөрөмж  ({len(times)} удаа)")
+        for cleanup in cleanups:
+            cleanup()
+    server.shutdown()
+
+    return {
+        'meta': {
+            'time': datetime.now().isoformat(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> int:
+    """
+    Хамгийн бага хугацааг харьцуулж, threshold-оос их удааширсан тоог буцаана
+
+    min нь бусад процессын саадад медианаас бага өртдөг.
+    """
+    previous = {(r['name'], r['devices']): r['min_s'] for r in baseline['results']}
+    regressions = 0
+    print(f"\nХарьцуулалт ({baseline['meta'].get('revision') or '?'} → "
+          f"{current['meta'].get('revision') or '?'}):")
+    for result in current['results']:
+        before = previous.get((result['name'], result['devices']))
+        if not before:
+            continue
+        ratio = result['min_s'] / before
+        mark = '⚠️' if ratio > 1 + threshold else ('✅' if ratio < 1 - threshold else '  ')
+        regressions += ratio > 1 + threshold
+        print(f"{mark} {result['name']:18} {result['devices']:6}  ×{ratio:5.2f}")
+    return regressions
+
+# ============================================
+# MAIN
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Симуляторын халуун замын хэмжилт')
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+                        help='төхөөрөмжийн тоонууд (таслалаар)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=10.0,
+                        help='нэг хэмжилтийн дээд хугацаа (секунд)')
+    parser.add_argument('--only', help='зөвхөн эдгээр хэмжилт (таслалаар)')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', help='өмнөх үр дүнгийн JSON')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='удаашралын зөвшөөрөх хэмжээ (0.10 = 10%%)')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    only = args.only.split(',') if args.only else None
+    current = run(sizes, args.repeat, args.budget, only)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, indent=2)
+    print(f"\n💾 {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(current, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+СИМУЛЯТОРЫН ТӨЛӨВИЙН CHECKPOINT / СЭРГЭЭЛТ
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Restart бүрт (systemd Restart=always) физик загвар station_base_temp-аас,
+iteration болон илгээгчийн тоолуур 0-ээс эхэлж dashboard дээр шат
+үүсгэдэг. Энд бүрэлдэхүүн бүрийн төлөвийг (get_state/set_state) үе үе нэг
+файлд хадгалж, эхлэхдээ сэргээнэ:
+
+    b'HSCKPT01' | uint64 толгойн урт | JSON толгой | массивууд (64 байтаар зэрэгцүүлсэн)
+
+JSON толгой нь массив бүрийн dtype/shape/offset болон NumPy бус утгуудыг
+(тоолуур, RNG төлөв, цаг) агуулна. Уншихдаа файлыг mmap хийж массивуудыг
+шууд объект руу хуулна — 10000 төхөөрөмжийн флот хэдхэн миллисекундэд
+сэргэнэ, халаах (warm-up) алхам хэрэггүй.
+
+Бичихдээ path.tmp → fsync → os.replace: процесс дундуур унтарсан ч хуучин
+бүтэн checkpoint хэвээр үлдэнэ.
+
+Бүрэлдэхүүн:
+
+    get_state() -> {түлхүүр: np.ndarray | JSON утга}
+    set_state(state)   — таарахгүй бол (флотын хэмжээ өөр) ValueError
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from datetime import datetime
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+logger = logging.getLogger('HeatingSimulator')
+
+MAGIC = b'HSCKPT01'
+HEADER = struct.Struct('<8sQ')
+ALIGN = 64
+VERSION = 1
+
+def _align(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+# ============================================
+# ФАЙЛ
+# ============================================
+
+def write_checkpoint(path: str, arrays: Dict[str, np.ndarray], values: Dict) -> int:
+    """Массив, утгуудыг атомаар бичих (бичсэн байтын тоо)"""
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = [array.dtype.str, list(array.shape), offset]
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({
+        'version': VERSION,
+        'created': datetime.now().isoformat(),
+        'arrays': layout,
+        'values': values,
+    }, separators=(',', ':')).encode('utf-8')
+    data_start = _align(HEADER.size + len(header))
+
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name][2])
+            f.write(array.data)
+        f.truncate(data_start + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return data_start + offset
+
+def read_checkpoint(path: str) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """
+    Checkpoint-ийг mmap-аар нээх
+
+    Массивууд нь файлын (зөвхөн унших) view — хадгалах бол хуулна.
+    """
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, header_size = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError(f"not a checkpoint file: {path}")
+    header = json.loads(buffer[HEADER.size:HEADER.size + header_size])
+    if header['version'] != VERSION:
+        raise ValueError(f"unsupported checkpoint version: {header['version']}")
+
+    data_start = _align(HEADER.size + header_size)
+    arrays = {}
+    for name, (dtype, shape, offset) in header['arrays'].items():
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape, dtype=np.int64))
+        arrays[name] = np.frombuffer(buffer, dtype, count, data_start + offset).reshape(shape)
+    header['values']['created'] = header['created']
+    return arrays, header['values']
+
+# ============================================
+# CHECKPOINTER
+# ============================================
+
+class Checkpointer:
+    def __init__(self, path: str, components: Dict[str, object], interval: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        path:       Checkpoint файл (хавтас нь үүснэ)
+        components: {нэр: get_state/set_state-тэй объект}
+        interval:   maybe_save()-ийн хадгалах давтамж (секунд)
+        """
+        self.path = path
+        self.components = components
+        self.interval = interval
+        self.clock = clock
+        self.last_save = clock()
+
+        self.save_count = 0
+        self.last_bytes = 0
+        self.last_seconds = 0.0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def save(self) -> bool:
+        started = time.perf_counter()
+        arrays, values = {}, {}
+        for component, obj in self.components.items():
+            for key, value in obj.get_state().items():
+                name = f"{component}.{key}"
+                if isinstance(value, np.ndarray):
+                    arrays[name] = value
+                else:
+                    values[name] = value
+        try:
+            self.last_bytes = write_checkpoint(self.path, arrays, values)
+        except OSError as e:
+            logger.error(f"❌ Checkpoint хадгалж чадсангүй: {str(e)}")
+            return False
+        finally:
+            self.last_save = self.clock()
+        self.last_seconds = time.perf_counter() - started
+        self.save_count += 1
+        return True
+
+    def maybe_save(self) -> bool:
+        """Tick-ийн давталтаас дуудна — interval өнгөрсөн бол хадгална"""
+        if self.clock() - self.last_save < self.interval:
+            return False
+        return self.save()
+
+    def restore(self) -> bool:
+        """
+        Файл байвал бүрэлдэхүүн бүрийг сэргээх
+
+        Таарахгүй бүрэлдэхүүн (хэмжээ, бүтэц өөрчлөгдсөн) шинээр эхэлнэ.
+        """
+        started = time.perf_counter()
+        try:
+            arrays, values = read_checkpoint(self.path)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"⚠️  Checkpoint уншигдсангүй, шинээр эхэлнэ: {str(e)}")
+            return False
+
+        restored = []
+        for component, obj in self.components.items():
+            prefix = component + '.'
+            state = {name[len(prefix):]: value for source in (arrays, values)
+                     for name, value in source.items() if name.startswith(prefix)}
+            if not state:
+                continue
+            try:
+                obj.set_state(state)
+                restored.append(component)
+            except (KeyError, ValueError, TypeError) as e:
+                logger.warning(f"⚠️  Checkpoint: '{component}' таарсангүй, шинээр эхэлнэ ({str(e)})")
+
+        if not restored:
+            return False
+        logger.info(f"♻️  Checkpoint сэргээлээ ({values['created']}): {', '.join(restored)} "
+                    f"— {(time.perf_counter() - started) * 1000:.1f} ms")
+        return True
+
+    def get_statistics(self) -> Dict:
+        return {
+            'saves': self.save_count,
+            'bytes': self.last_bytes,
+            'save_ms': round(self.last_seconds * 1000, 2),
+        }
@@ -0,0 +1,132 @@
+"""
+ӨӨРЧЛӨЛТӨӨР ТАЙЛАГНАХ (REPORT-BY-EXCEPTION / DEADBAND)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Бодит дэд станцууд утга бүрийг tick бүрт илгээдэггүй. Суваг бүр:
+
+    |утга - сүүлд илгээсэн| > deadband    → илгээнэ (өөрчлөлт)
+    сүүлд илгээснээс max_silence өнгөрсөн  → илгээнэ (keyframe)
+    бусад үед                               → дарагдана
+
+Эхний tick бүх утгыг илгээнэ. Төлөв нь (төхөөрөмж × суваг) NumPy массив —
+мөрийн тоо өөрчлөгдвөл (өөр флот) төлөв шинээр эхэлнэ.
+
+Илгээх payload-д зөвхөн өөрчлөгдсөн sensorObjects орно; бүх суваг нь
+дарагдсан төхөөрөмж огт илгээгдэхгүй.
+
+Төлөв нь илгээлтээс өмнө шинэчлэгдэнэ. Илгээлт амжилтгүй болсон эсвэл
+хаягдсан бол дуудагч force_keyframe()-ээр дараагийн tick-т бүх утгыг
+дахин илгээлгэнэ — сервер өөрчлөлтийг аваагүй байж болно.
+"""
+
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+class DeadbandFilter:
+    def __init__(self, channels: Sequence[str], deadbands: Sequence[float],
+                 max_silence: Union[float, Sequence[float]]):
+        """
+        channels:    Сувгийн дараалал (Config.SENSORS-ийн түлхүүрүүд)
+        deadbands:   Суваг бүрийн босго (ижил нэгжээр)
+        max_silence: Суваг бүрийн keyframe интервал (секунд)
+        """
+        self.channels = tuple(channels)
+        self.deadbands = np.asarray(deadbands, dtype=np.float64)
+        self.max_silence = np.broadcast_to(
+            np.asarray(max_silence, dtype=np.float64), self.deadbands.shape).copy()
+        if self.deadbands.shape != (len(self.channels),):
+            raise ValueError("deadbands length must equal channels")
+
+        self.last_value = None   # (N × C) сүүлд илгээсэн утга
+        self.last_sent = None    # (N × C) сүүлд илгээсэн цаг (секунд)
+
+        self.offered_count = 0
+        self.sent_count = 0
+        self.keyframe_count = 0
+
+    def _reset(self, size: int):
+        shape = (size, len(self.channels))
+        self.last_value = np.full(shape, np.nan)
+        self.last_sent = np.full(shape, -np.inf)
+
+    def apply(self, readings, now: float) -> np.ndarray:
+        """
+        (N × C) уншилтаас илгээх утгуудын маск (True = илгээнэ)
+
+        now: секунд (timestamp.timestamp()) — симуляцийн цагтай ч ажиллана
+        """
+        readings = np.asarray(readings, dtype=np.float64)
+        if self.last_value is None or self.last_value.shape != readings.shape:
+            self._reset(readings.shape[0])
+
+        # NaN (анх удаа) харьцуулалт False → өөрчлөгдсөн гэж тооцно
+        changed = ~(np.abs(readings - self.last_value) <= self.deadbands)
+        expired = now - self.last_sent >= self.max_silence
+        mask = changed | expired
+
+        np.copyto(self.last_value, readings, where=mask)
+        self.last_sent[mask] = now
+
+        self.offered_count += mask.size
+        self.sent_count += int(np.count_nonzero(mask))
+        self.keyframe_count += int(np.count_nonzero(expired & ~changed))
+        return mask
+
+    def force_keyframe(self, rows=None):
+        """
+        Дараагийн apply()-д бүх сувгийг илгээх (rows — төхөөрөмжийн индексүүд, None бол бүгд)
+
+        max_silence хүлээхгүй — алдагдсан өөрчлөлт дараагийн tick-т нөхөгдөнө.
+        """
+        if self.last_sent is None:
+            return
+        if rows is None:
+            self.last_sent[:] = -np.inf
+        else:
+            self.last_sent[rows] = -np.inf
+
+    def filter_rows(self, rows, now: float) -> List[Dict[str, float]]:
+        """Төхөөрөмж бүрийн илгээх утгууд (хоосон dict = бүгд дарагдсан)"""
+        values = rows.tolist() if hasattr(rows, 'tolist') else rows
+        mask = self.apply(values, now).tolist()
+        return [
+            {channel: value for channel, value, keep in zip(self.channels, row, keep_row) if keep}
+            for row, keep_row in zip(values, mask)
+        ]
+
+    def filter(self, readings: Dict[str, float], now: float) -> Dict[str, float]:
+        """Нэг төхөөрөмжийн dict уншилт"""
+        return self.filter_rows([[readings[channel] for channel in self.channels]], now)[0]
+
+    def get_state(self) -> Dict:
+        """Checkpoint-д — сэргээсний дараа бүх утгыг дахин илгээхгүй"""
+        state = {
+            'offered': self.offered_count,
+            'sent': self.sent_count,
+            'keyframes': self.keyframe_count,
+        }
+        if self.last_value is not None:
+            state.update(last_value=self.last_value, last_sent=self.last_sent)
+        return state
+
+    def set_state(self, state: Dict):
+        if 'last_value' in state:
+            if state['last_value'].shape[1:] != (len(self.channels),):
+                raise ValueError("checkpoint deadband channels differ")
+            self.last_value = np.array(state['last_value'])
+            self.last_sent = np.array(state['last_sent'])
+        self.offered_count = state['offered']
+        self.sent_count = state['sent']
+        self.keyframe_count = state['keyframes']
+
+    def get_statistics(self) -> Dict:
+        suppressed = self.offered_count - self.sent_count
+        ratio = suppressed / self.offered_count if self.offered_count else 0.0
+        return {
+            'offered': self.offered_count,
+            'sent': self.sent_count,
+            'suppressed': suppressed,
+            'keyframes': self.keyframe_count,
+            'suppression_ratio': round(ratio, 4),
+        }
@@ -0,0 +1,239 @@
+"""
+ОЛОН ХУРДТАЙ ФИЗИК: ТОГТМОЛ ДОТООД АЛХАМ, ЭХНИЙ ЭРЭМБИЙН ХОЦРОГДОЛ
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+HeatingFleet-ийн 'smooth transition' нь илгээлт бүрт нэг удаа (change_rate
+= 0.05) — SEND_INTERVAL өөрчлөгдөхөд динамик өөрчлөгдөнө. Энд төлөв
+Config.PHYSICS_DT алхмаар интеграцлагдаж, тайлан нь тухайн агшны төлөвийг
+л уншина:
+
+    гадна ──lag──→ станц ──lag──→ бойлер орох ──lag──→ хэрэглэгч рүү
+                                                            │ − ачаалал (lag)
+    станц руу ←────────────────lag──────────────────── хэрэглэгчээс
+
+Хоцрогдол бүр y[j] = y[j-1] + α·(u[j] − y[j-1]) + шуугиан, α = 1 − e^(−dt/τ).
+Хоёр тайлангийн хоорондох k алхмыг scipy.signal.lfilter-ээр (k × N)
+массивт нэг дуудлагаар тооцоолно — 1 секундын физик, 30 секундын тайлан
+хямд.
+
+Тайлангийн хурд үр дүнд нөлөөлөхгүй: процессын шуугиан алхам бүрт ижил
+дарааллаар татагдана, мэдрэгчийн шуугиан нь алхмын дугаараар (Philox
+counter-ийн дээд үг) тодорхойлогдоно. Ижил seed, ижил эхлэх цагтай хоёр флот 1 с эсвэл
+30 с тутам тайлагнасан ч нийтлэг агшинд ижил утга гаргана.
+"""
+
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from scipy.signal import lfilter
+
+from fleet import (HeatingFleet, N_CHANNELS, P_FORWARD, P_RETURN, P_RETURN_STATION,
+                   P_SUPPLY, T_FORWARD, T_RETURN, T_RETURN_STATION, T_SUPPLY)
+from frame import ReadingFrame
+from simulator import FRAME_SCHEMA, Config, HeatingSystem
+
+LAGS = ('station', 'supply_pipe', 'boiler', 'return_pipe', 'load', 'outdoor', 'pressure')
+MAX_CHUNK_CELLS = 1 << 20  # Нэг дуудлагын алхам × төхөөрөмж (урт завсарт санах ой хязгаартай)
+
+TEMPERATURES = [T_SUPPLY, T_FORWARD, T_RETURN, T_RETURN_STATION]
+PRESSURES = [P_SUPPLY, P_FORWARD, P_RETURN, P_RETURN_STATION]
+
+def sensor_noise(key: int, substep: int, shape) -> np.ndarray:
+    """
+    substep алхмын мэдрэгчийн шуугиан (N(0, 1))
+
+    Алхмын дугаар нь Philox counter-ийн дээд 64 бит — үүсгэх явцад доод
+    үг нэмэгддэг тул дараалсан алхмуудын урсгал давхцахгүй.
+    """
+    return np.random.Generator(
+        np.random.Philox(key=key, counter=[0, 0, 0, substep])
+    ).standard_normal(shape)
+
+def _lag(target, state: np.ndarray, alpha: float, k: int,
+         noise: Optional[np.ndarray] = None, sigma=0.0) -> np.ndarray:
+    """
+    k алхмын эхний эрэмбийн хоцрогдол (k × N), state-ийг сүүлийн утгаар шинэчилнэ
+
+    sigma: тогтвортой төлөвийн стандарт хазайлт (dt-ээс үл хамаарна)
+    """
+    decay = 1.0 - alpha
+    drive = np.broadcast_to(alpha * np.asarray(target, dtype=np.float64), (k, state.size))
+    if noise is not None:
+        drive = drive + noise * (sigma * math.sqrt(1.0 - decay * decay))
+    out, _ = lfilter([1.0], [1.0, -decay], drive, axis=0, zi=(decay * state)[np.newaxis])
+    state[...] = out[-1]
+    return out
+
+# ============================================
+# ДИНАМИК ФЛОТ
+# ============================================
+
+class DynamicFleet(HeatingFleet):
+    """Тогтмол дотоод алхамтай N дэд станц (HeatingFleet-ийн step()-ийг орлоно)"""
+
+    def __init__(self, size: int, device_ids: Optional[Sequence[str]] = None,
+                 param_spread: float = 0.0, seed: Optional[int] = None,
+                 dt: float = Config.PHYSICS_DT):
+        super().__init__(size, device_ids, param_spread, seed)
+        if dt <= 0:
+            raise ValueError("dt must be positive")
+        self.dt = dt
+        self.cfg = dict(Config.DYNAMICS)
+        self.alpha = {name: 1.0 - math.exp(-dt / self.cfg[f'{name}_tau']) for name in LAGS}
+        # Мэдрэгчийн шуугианы түлхүүр — алхмын дугаар нь counter (sensor_noise)
+        self.sensor_key = seed if seed is not None else int(self.rng.integers(2 ** 62))
+
+        self.sim_time: Optional[datetime] = None  # Интеграцлагдсан сүүлийн агшин
+        self.substeps = 0
+        self.state: Dict[str, np.ndarray] = {}
+
+    def _climate(self, start: datetime, k: int) -> np.ndarray:
+        """start-аас хойшх k алхмын шуугиангүй гадны температур (k × N, дүүргийн талбараас)"""
+        return self.weather.climate(start, self.dt * np.arange(1, k + 1)) @ self.weather_weights.T
+
+    def _station_target(self, outdoor: np.ndarray) -> np.ndarray:
+        p = self.params
+        return np.clip(p['station_base_temp'] - outdoor * p['outdoor_temp_influence'], 70, 100)
+
+    def _initialize(self, now: datetime):
+        """Тэнцвэрт төлөвөөс эхлэх"""
+        p, c, n = self.params, self.cfg, self.size
+        outdoor = self._climate(now - timedelta(seconds=self.dt), 1)[0]
+        station = self._station_target(outdoor)
+        supply_pipe = station - p['pipe_heat_loss']
+        forward = supply_pipe - p['boiler_heat_loss'] / 2
+        load = np.full(n, c['consumer_delta_t'])
+        self.state = {
+            'outdoor_dev': np.zeros(n),
+            'outdoor': outdoor,
+            'station': station,
+            'supply_pipe': supply_pipe,
+            'forward': forward,
+            'load': load,
+            'return_pipe': forward - load - p['pipe_heat_loss'],
+            'pressure_dev': np.zeros(n),
+        }
+        self.sim_time = now
+
+    def _integrate(self, k: int):
+        """k дотоод алхам — шат бүр (k × N) массивт нэг lfilter"""
+        p, c, s, a = self.params, self.cfg, self.state, self.alpha
+        noise = self.rng.standard_normal((k, 4, self.size))  # алхам бүрт ижил дараалал
+
+        outdoor_dev = _lag(0.0, s['outdoor_dev'], a['outdoor'], k, noise[:, 0], c['outdoor_noise'])
+        outdoor = self._climate(self.sim_time, k) + outdoor_dev
+        station = _lag(self._station_target(outdoor), s['station'], a['station'], k,
+                       noise[:, 1], p['temp_noise'])
+        supply_pipe = _lag(station - p['pipe_heat_loss'], s['supply_pipe'], a['supply_pipe'], k)
+        forward = _lag(supply_pipe - p['boiler_heat_loss'] / 2, s['forward'], a['boiler'], k)
+        load = _lag(c['consumer_delta_t'], s['load'], a['load'], k, noise[:, 2], c['load_noise'])
+        _lag(forward - load - p['pipe_heat_loss'], s['return_pipe'], a['return_pipe'], k)
+        _lag(0.0, s['pressure_dev'], a['pressure'], k, noise[:, 3], p['pressure_noise'])
+
+        s['outdoor'] = outdoor[-1].copy()
+        self.sim_time += timedelta(seconds=self.dt * k)
+        self.substeps += k
+
+    def advance(self, now: datetime) -> int:
+        """now хүртэлх бүхэл алхмуудыг интеграцлах (хийсэн алхмын тоо)"""
+        if self.sim_time is None:
+            self._initialize(now)
+            return 0
+        k = int((now - self.sim_time).total_seconds() / self.dt + 1e-9)
+        max_chunk = max(1, MAX_CHUNK_CELLS // self.size)
+        done = 0
+        while done < k:
+            chunk = min(k - done, max_chunk)
+            self._integrate(chunk)
+            done += chunk
+        return done
+
+    def get_outdoor_temperature(self, now: Optional[datetime] = None) -> np.ndarray:
+        if not self.state:
+            return super().get_outdoor_temperature(now)
+        return self.state['outdoor'].copy()
+
+    def get_state(self) -> Dict:
+        state = super().get_state()
+        state.update({f'dynamic_{name}': value for name, value in self.state.items()})
+        state.update(
+            sim_time=self.sim_time.isoformat() if self.sim_time is not None else None,
+            substeps=self.substeps,
+            sensor_key=self.sensor_key,
+            dt=self.dt,
+        )
+        return state
+
+    def set_state(self, state: Dict):
+        if state['dt'] != self.dt:
+            raise ValueError("checkpoint PHYSICS_DT differs")
+        super().set_state(state)
+        self.state = {name[len('dynamic_'):]: np.array(value) for name, value in state.items()
+                      if name.startswith('dynamic_')}
+        self.sim_time = datetime.fromisoformat(state['sim_time']) if state['sim_time'] else None
+        self.substeps = state['substeps']
+        self.sensor_key = state['sensor_key']
+
+    def step(self, now: Optional[datetime] = None) -> np.ndarray:
+        """
+        now агшны 8 мэдрэгч (N × 8)
+
+        Тайлангийн хооронд алхам болоогүй бол төлөв өөрчлөгдөхгүй.
+        Буцаах матриц нь дараагийн дуудлагаар дахин бичигдэнэ.
+        """
+        self.advance(now or datetime.now())
+        p, c, s, out = self.params, self.cfg, self.state, self._readings
+
+        P1 = p['supply_pressure'] + s['pressure_dev']
+        P_forward = P1 - p['pipe_pressure_drop'] - p['boiler_pressure_drop'] / 2
+        P_return = P_forward - 0.1
+
+        out[:, T_SUPPLY] = s['station']
+        out[:, P_SUPPLY] = P1
+        out[:, T_FORWARD] = s['forward']
+        out[:, P_FORWARD] = P_forward
+        out[:, T_RETURN] = s['forward'] - s['load']
+        out[:, P_RETURN] = P_return
+        out[:, T_RETURN_STATION] = s['return_pipe']
+        out[:, P_RETURN_STATION] = P_return - p['pipe_pressure_drop']
+
+        sensor = sensor_noise(self.sensor_key, self.substeps, (self.size, N_CHANNELS))
+        out[:, TEMPERATURES] += sensor[:, TEMPERATURES] * c['temp_sensor_noise']
+        out[:, PRESSURES] += sensor[:, PRESSURES] * c['pressure_sensor_noise']
+        np.round(out, 2, out=out)
+
+        self.last_station_temp = s['station']
+        self.last_pressure = P1
+        return out
+
+# ============================================
+# НЭГ ТӨХӨӨРӨМЖ
+# ============================================
+
+class DynamicHeatingSystem(HeatingSystem):
+    """HeatingSystem-ийн интерфэйстэй, DynamicFleet(1) дээр ажиллах хувилбар"""
+
+    def __init__(self, clock=None, seed: Optional[int] = None):
+        super().__init__(clock)
+        self.fleet = DynamicFleet(1, [Config.DEVICE_ID], seed=seed)
+
+    def get_outdoor_temperature(self) -> float:
+        self.fleet.advance(self.clock.now())
+        return round(float(self.fleet.get_outdoor_temperature()[0]), 2)
+
+    def calculate_station_supply_temp(self) -> float:
+        self.fleet.advance(self.clock.now())
+        return float(self.fleet.state['station'][0])
+
+    def get_state(self) -> Dict:
+        return self.fleet.get_state()
+
+    def set_state(self, state: Dict):
+        self.fleet.set_state(state)
+
+    def calculate_all_readings(self) -> ReadingFrame:
+        readings = FRAME_SCHEMA.frame(self.fleet.step(self.clock.now())[0].tolist())
+        self.outdoor_temp = float(self.fleet.state['outdoor'][0])
+        return readings
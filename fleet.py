@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+ОЛОН ДЭД СТАНЦЫН ВЕКТОРЧИЛСОН ФИЗИК ЗАГВАР
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+HeatingSystem-тэй ижил урсгал (станц → бойлер → хэрэглэгч → буцах),
+гэхдээ N төхөөрөмжийн төлөвийг NumPy массивт хадгалж, нэг алхмаар
+бүгдийг нь зэрэг тооцоолно.
+
+Гаралт: (N × 8) матриц, баганын дараалал нь Config.SENSORS-ийнхтэй ижил.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from frame import ReadingFrame
+from simulator import FRAME_SCHEMA, Config, setup_weather
+
+# ============================================
+# СУВГИЙН ИНДЕКС
+# ============================================
+
+CHANNELS = tuple(Config.SENSORS)
+N_CHANNELS = len(CHANNELS)
+
+T_SUPPLY = CHANNELS.index('supply_from_station_temp')
+P_SUPPLY = CHANNELS.index('supply_from_station_pressure')
+T_FORWARD = CHANNELS.index('forward_to_consumer_temp')
+P_FORWARD = CHANNELS.index('forward_to_consumer_pressure')
+T_RETURN = CHANNELS.index('return_from_consumer_temp')
+P_RETURN = CHANNELS.index('return_from_consumer_pressure')
+T_RETURN_STATION = CHANNELS.index('return_to_station_temp')
+P_RETURN_STATION = CHANNELS.index('return_to_station_pressure')
+
+# ============================================
+# ФЛОТ
+# ============================================
+
+class HeatingFleet:
+    """N ширхэг дулааны дэд станцын векторчилсон загвар"""
+
+    def __init__(self, size: int, device_ids: Optional[Sequence[str]] = None,
+                 param_spread: float = 0.0, seed: Optional[int] = None):
+        """
+        size:         Төхөөрөмжийн тоо
+        device_ids:   Төхөөрөмжийн нэрс (байхгүй бол SUBSTATION_0001 ...)
+        param_spread: Төхөөрөмж бүрийн физик параметрийн санамсаргүй
+                      хазайлт (0.05 = ±5%)
+        seed:         Санамсаргүй тоо үүсгэгчийн үр
+        """
+        if size <= 0:
+            raise ValueError("size must be positive")
+
+        self.size = size
+        self.device_ids = list(device_ids) if device_ids is not None else [
+            f"SUBSTATION_{i + 1:04d}" for i in range(size)
+        ]
+        if len(self.device_ids) != size:
+            raise ValueError("device_ids length must equal size")
+
+        self.rng = np.random.default_rng(seed)
+
+        # Төхөөрөмж бүрийн физик параметр
+        self.params = {
+            name: self._spread(value, param_spread)
+            for name, value in Config.PHYSICS.items()
+        }
+
+        # Smooth transition-ий төлөв
+        self.last_station_temp = self.params['station_base_temp'].copy()
+        self.last_pressure = self.params['supply_pressure'].copy()
+
+        # Дүүргийн цаг агаар — tick бүрт D утга, (N × D) жингээр төхөөрөмжид
+        self.weather = setup_weather()
+        self.weather_weights = self.weather.weights(self.weather.locate(self.device_ids))
+
+        # Дахин ашиглах гаралтын буфер
+        self._readings = np.empty((size, N_CHANNELS), dtype=np.float64)
+
+    def _spread(self, value: float, spread: float) -> np.ndarray:
+        if spread <= 0:
+            return np.full(self.size, value, dtype=np.float64)
+        return value * (1 + self.rng.uniform(-spread, spread, self.size))
+
+    def get_outdoor_temperature(self, now: Optional[datetime] = None) -> np.ndarray:
+        """Гадны температур (дүүргийн талбараас төхөөрөмжийн байршлаар)"""
+        return self.weather.temperature(now or datetime.now(), self.weather_weights)
+
+    def calculate_station_supply_temp(self, now: Optional[datetime] = None) -> np.ndarray:
+        """Дулааны станцаас ирэх температур (бүх төхөөрөмжид)"""
+        p = self.params
+        outdoor = self.get_outdoor_temperature(now)
+
+        target_temp = p['station_base_temp'] - outdoor * p['outdoor_temp_influence']
+
+        change_rate = 0.05
+        new_temp = self.last_station_temp * (1 - change_rate) + target_temp * change_rate
+        new_temp += self.rng.normal(0, 1, self.size) * p['temp_noise']
+        np.clip(new_temp, 70, 100, out=new_temp)
+
+        self.last_station_temp = new_temp
+        return new_temp
+
+    def step(self, now: Optional[datetime] = None) -> np.ndarray:
+        """
+        Бүх төхөөрөмжийн 8 мэдрэгчийг нэг алхмаар тооцоолох
+
+        Буцаах матриц нь дараагийн дуудлагаар дахин бичигдэнэ —
+        хадгалах бол .copy() хийнэ.
+        """
+        p = self.params
+        n = self.size
+        normal = self.rng.normal
+        out = self._readings
+
+        # 1️⃣ Станцаас ирэх
+        T1 = self.calculate_station_supply_temp(now)
+        P1 = p['supply_pressure'] + normal(0, 1, n) * p['pressure_noise']
+        self.last_pressure = P1
+
+        # 2️⃣ Бойлер орох = шугамын алдагдал хасах
+        T2 = T1 - (p['pipe_heat_loss'] + normal(0, 0.3, n))
+        P2 = P1 - (p['pipe_pressure_drop'] + normal(0, 0.02, n))
+
+        # 3️⃣ Бойлер боловсруулалт
+        boiler_temp_loss = p['boiler_heat_loss'] + normal(0, 1.0, n)
+        boiler_pressure_drop = p['boiler_pressure_drop'] + normal(0, 0.05, n)
+
+        # 4️⃣ Хэрэглэгч рүү
+        T_forward = T2 - boiler_temp_loss / 2
+        P_forward = P2 - boiler_pressure_drop / 2
+
+        # 5️⃣ Хэрэглэгч дулаан авна
+        T_return = T_forward - (12 + normal(0, 2, n))
+        P_return = P_forward - 0.1
+
+        # 6️⃣ Станц руу буцах
+        T_return_station = T_return - (p['pipe_heat_loss'] + normal(0, 0.3, n))
+        P_return_station = P_return - (p['pipe_pressure_drop'] + normal(0, 0.02, n))
+
+        out[:, T_SUPPLY] = T1
+        out[:, P_SUPPLY] = P1
+        out[:, T_FORWARD] = T_forward
+        out[:, P_FORWARD] = P_forward
+        out[:, T_RETURN] = T_return
+        out[:, P_RETURN] = P_return
+        out[:, T_RETURN_STATION] = T_return_station
+        out[:, P_RETURN_STATION] = P_return_station
+        np.round(out, 2, out=out)
+
+        return out
+
+    def get_state(self) -> Dict:
+        """Checkpoint-д (checkpoint.py): параметр, smooth transition, RNG"""
+        state = {f'param_{name}': value for name, value in self.params.items()}
+        state.update(
+            device_ids=self.device_ids,
+            last_station_temp=self.last_station_temp,
+            last_pressure=self.last_pressure,
+            rng=self.rng.bit_generator.state,
+        )
+        return state
+
+    def set_state(self, state: Dict):
+        if list(state['device_ids']) != self.device_ids:
+            raise ValueError("checkpoint device_ids differ")
+        self.params = {name: np.array(state[f'param_{name}']) for name in self.params}
+        self.last_station_temp = np.array(state['last_station_temp'])
+        self.last_pressure = np.array(state['last_pressure'])
+        self.rng.bit_generator.state = state['rng']
+
+    def stream(self, start: datetime, end: datetime, step: Union[timedelta, float],
+               chunk: int = 100) -> Iterator[Tuple[List[datetime], np.ndarray]]:
+        """
+        [start, end) хугацааг симуляцийн цагаар үүсгэх (HeatingSystem.stream шиг)
+
+        Chunk бүр: (цагийн жагсаалт, (k × N × 8) матриц)
+        """
+        step = step if isinstance(step, timedelta) else timedelta(seconds=step)
+        if step <= timedelta(0):
+            raise ValueError("step must be positive")
+
+        now = start
+        while now < end:
+            times = []
+            block = np.empty((chunk, self.size, N_CHANNELS), dtype=np.float64)
+            while now < end and len(times) < chunk:
+                block[len(times)] = self.step(now)
+                times.append(now)
+                now += step
+            yield times, block[:len(times)]
+
+    def get_system_efficiency(self, readings: np.ndarray) -> np.ndarray:
+        """Төхөөрөмж бүрийн ΔT (станцаас ирэх - станц руу буцах)"""
+        return readings[:, T_SUPPLY] - readings[:, T_RETURN_STATION]
+
+    def readings_dict(self, readings: np.ndarray, index: int) -> Dict[str, float]:
+        """Нэг төхөөрөмжийн мөрийг DataSender-т тохирох dict болгох"""
+        return dict(zip(CHANNELS, readings[index].tolist()))
+
+    def readings_dicts(self, readings: np.ndarray) -> List[Dict[str, float]]:
+        return [dict(zip(CHANNELS, row)) for row in readings.tolist()]
+
+    def readings_frames(self, readings: np.ndarray) -> List[ReadingFrame]:
+        """Мөр бүрийг ReadingFrame болгох (dict үүсгэхгүй, матрицаас нэг л хуулбар)"""
+        return [FRAME_SCHEMA.frame(row) for row in readings.tolist()]
+
+def create_fleet(size: int = Config.FLEET_SIZE, seed: Optional[int] = None) -> HeatingFleet:
+    """
+    Config.FLEET_MODEL-ийн дагуу флот үүсгэх ('network' бол network.ThermalNetwork)
+
+    Config.PHYSICS_MODEL == 'dynamic' бол тусдаа шугамууд dynamics.DynamicFleet
+    """
+    if Config.FLEET_MODEL == 'network':
+        from network import ThermalNetwork
+        if Config.NETWORK_FILE:
+            return ThermalNetwork.load(Config.NETWORK_FILE, seed=seed)
+        return ThermalNetwork.generate(size, seed=seed)
+    if Config.PHYSICS_MODEL == 'dynamic':
+        from dynamics import DynamicFleet
+        return DynamicFleet(size, seed=seed)
+    return HeatingFleet(size, seed=seed)
@@ -0,0 +1,77 @@
+"""
+ТОГТМОЛ БҮТЭЦТЭЙ УНШИЛТЫН FRAME
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Tick бүрт 8 урт түлхүүртэй dict, дараа нь payload-ийн 8 dict үүсгэхийн
+оронд нэг жагсаалттай __slots__ объект:
+
+    FrameSchema(Config.SENSORS)     ← сувгийн индекс нэг удаа
+        └─ ReadingFrame.data        ← 8 float, Config.SENSORS дараалал
+
+Frame нь Mapping — readings['supply_from_station_temp'], .items(), **readings
+хуучин кодод хэвээр ажиллана. JSON-ыг sensorObjectId-ийн хослол бүрт нэг
+удаа бэлдсэн загвараар (template) шууд мөр болгож гаргана —
+build_payload-ийн завсрын dict-үүд үүсэхгүй.
+"""
+
+import json
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+class FrameSchema:
+    __slots__ = ('channels', 'index', '_templates')
+
+    def __init__(self, channels: Sequence[str]):
+        self.channels = tuple(channels)
+        self.index = {channel: i for i, channel in enumerate(self.channels)}
+        self._templates: Dict[Tuple, str] = {}
+
+    def frame(self, data: List[float]) -> 'ReadingFrame':
+        """data-г хуулахгүй (жагсаалтыг frame эзэмшинэ)"""
+        return ReadingFrame(self, data)
+
+    def empty(self) -> 'ReadingFrame':
+        return ReadingFrame(self, [0.0] * len(self.channels))
+
+    def ids(self, sensor_ids: Mapping) -> Tuple:
+        return tuple(map(sensor_ids.__getitem__, self.channels))
+
+    def json_template(self, ids: Tuple) -> str:
+        """/v/value баримтын %-загвар: эхний %s нь цаг, дараа нь утгууд"""
+        template = self._templates.get(ids)
+        if template is None:
+            objects = ','.join(
+                '{"sensorObjectId":' + json.dumps(sensor_id).replace('%', '%%') + ',"value":%s}'
+                for sensor_id in ids
+            )
+            template = self._templates[ids] = '{"time":"%s","sensorObjects":[' + objects + ']}'
+        return template
+
+class ReadingFrame(Mapping):
+    __slots__ = ('schema', 'data')
+
+    def __init__(self, schema: FrameSchema, data: List[float]):
+        self.schema = schema
+        self.data = data
+
+    def __getitem__(self, key: str) -> float:
+        return self.data[self.schema.index[key]]
+
+    def __setitem__(self, key: str, value: float):
+        self.data[self.schema.index[key]] = value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.schema.channels)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def items(self):
+        return zip(self.schema.channels, self.data)
+
+    def to_json(self, timestamp: str, ids: Tuple) -> str:
+        """Compact JSON (json.dumps(build_payload(...), separators=(',', ':'))-тэй ижил)"""
+        return self.schema.json_template(ids) % (timestamp, *map(float.__repr__, self.data))
+
+    def __repr__(self) -> str:
+        return f"ReadingFrame({dict(self.items())})"
@@ -24,6 +24,9 @@ sudo mkdir -p "$INSTALL_DIR"
 # Log хавтас
 sudo mkdir -p /var/log/heating_simulator
 
+# Spool хавтас (сервер тасарсан үед өгөгдөл хадгалах)
+sudo mkdir -p /var/lib/heating_simulator/spool
+
 echo "✅ Хавтас бэлэн: $INSTALL_DIR"
 
 # ============================================
@@ -33,6 +36,29 @@ echo "✅ Хавтас бэлэн: $INSTALL_DIR"
 echo ""
 echo "📄 2. Python скрипт үүсгэж байна..."
 sudo cp simulator.py "$INSTALL_DIR/simulator.py"
+sudo cp fleet.py "$INSTALL_DIR/fleet.py"
+sudo cp async_sender.py "$INSTALL_DIR/async_sender.py"
+sudo cp spool.py "$INSTALL_DIR/spool.py"
+sudo cp scheduler.py "$INSTALL_DIR/scheduler.py"
+sudo cp metrics.py "$INSTALL_DIR/metrics.py"
+sudo cp sensor_registry.py "$INSTALL_DIR/sensor_registry.py"
+sudo cp wire.py "$INSTALL_DIR/wire.py"
+sudo cp frame.py "$INSTALL_DIR/frame.py"
+sudo cp deadband.py "$INSTALL_DIR/deadband.py"
+sudo cp pipeline.py "$INSTALL_DIR/pipeline.py"
+sudo cp loadtest.py "$INSTALL_DIR/loadtest.py"
+sudo cp stub_server.py "$INSTALL_DIR/stub_server.py"
+sudo cp bench.py "$INSTALL_DIR/bench.py"
+sudo cp network.py "$INSTALL_DIR/network.py"
+sudo cp tb_gateway.py "$INSTALL_DIR/tb_gateway.py"
+sudo cp sinks.py "$INSTALL_DIR/sinks.py"
+sudo cp sharded.py "$INSTALL_DIR/sharded.py"
+sudo cp recording.py "$INSTALL_DIR/recording.py"
+sudo cp timescale_sink.py "$INSTALL_DIR/timescale_sink.py"
+sudo cp dynamics.py "$INSTALL_DIR/dynamics.py"
+sudo cp checkpoint.py "$INSTALL_DIR/checkpoint.py"
+sudo cp weather.py "$INSTALL_DIR/weather.py"
+sudo cp analytics.py "$INSTALL_DIR/analytics.py"
 sudo chmod +x "$INSTALL_DIR/simulator.py"
 echo "✅ Python скрипт үүслээ"
 
@@ -88,7 +114,7 @@ fi
 # Note: Pointing directly to the venv pip avoids needing to 'activate' the script
 echo "Installing Python packages..."
 "$VENV_PATH/bin/pip" install --upgrade pip
-"$VENV_PATH/bin/pip" install requests
+"$VENV_PATH/bin/pip" install requests numpy scipy aiohttp msgpack paho-mqtt "psycopg[binary]" psycopg-pool
 # Activate the virtual environment
 source "$VENV_PATH/bin/activate"
 
@@ -111,6 +137,7 @@ sudo chmod 644 /etc/systemd/system/heating-simulator.service
 # Log хавтас эрх
 sudo chown -R root:root /var/log/heating_simulator
 sudo chmod 755 /var/log/heating_simulator
+sudo chown -R root:root /var/lib/heating_simulator
 
 echo "✅ Эрхүүд тохирлоо"
 
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+INGEST API-ИЙН АЧААЛЛЫН ТУРШИЛТ
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Флотын бодит уншилтыг шат (stage) бүрээр өсгөж илгээгээд, серверийн
+хариуны хугацаа, алдааны хувь, бодит дамжуулалтыг хэмжинэ.
+
+Шат = (төхөөрөмж, tick/сек, нэг хүсэлт дэх уншилт, үргэлжлэх секунд):
+
+    python loadtest.py --profile ramp --url http://host:5000/v/value
+    python loadtest.py --stages 100:1:1:30,1000:1:10:60 --local --latency 0.02 --failure-rate 0.01
+
+Ачаалал нь нээлттэй давталттай (open-loop): хүсэлтүүд хуваарийн дагуу
+гарч, удаан хариу дараагийнхыг хойшлуулахгүй. 'latency' нь хуваарьт
+цагаас хариу хүртэл (клиентийн дараалал орно), 'service' нь зөвхөн HTTP.
+
+--local нь stub_server-ийг процессын дотор эхлүүлнэ (offline).
+"""
+
+import argparse
+import asyncio
+import json
+import math
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import aiohttp
+import numpy as np
+
+from simulator import Config, build_payload, logger, setup_logger, setup_sensor_registry
+from stub_server import stub_sensor_ids
+from wire import CONTENT_TYPES, JSON, WireEncoder
+
+# batch == 1 бол /v/value руу нэг баримт, үгүй бол /v/value/batch руу массив
+Stage = namedtuple('Stage', ['devices', 'rate', 'batch', 'duration'])
+
+PROFILES = {
+    'smoke': [Stage(10, 1.0, 1, 10)],
+    'ramp':  [Stage(devices, 1.0, 1, 30) for devices in (10, 50, 100, 500, 1000)],
+    'spike': [Stage(50, 1.0, 1, 20), Stage(2000, 1.0, 1, 20), Stage(50, 1.0, 1, 20)],
+    'batch': [Stage(1000, 1.0, batch, 30) for batch in (1, 10, 100)],
+    'soak':  [Stage(Config.FLEET_SIZE, 1.0 / Config.SEND_INTERVAL, 1, 600)],
+}
+
+def parse_stages(text: str) -> List[Stage]:
+    """'devices:rate:batch:seconds,...' → [Stage, ...]"""
+    stages = []
+    for part in text.split(','):
+        devices, rate, batch, duration = part.strip().split(':')
+        stages.append(Stage(int(devices), float(rate), int(batch), float(duration)))
+    return stages
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'p50': p50 * 1000, 'p95': p95 * 1000, 'p99': p99 * 1000, 'max': max(values) * 1000}
+
+# ============================================
+# ШАТНЫ ҮР ДҮН
+# ============================================
+
+class StageResult:
+    def __init__(self, stage: Stage):
+        self.stage = stage
+        self.latencies: List[float] = []
+        self.service_times: List[float] = []
+        self.statuses = Counter()     # HTTP код эсвэл 'timeout'/'error'
+        self.readings_ok = 0
+        self.bytes_sent = 0
+        self.scheduled = 0
+        self.cancelled = 0            # шатны төгсгөлд хариу ирээгүй тул цуцалсан
+        self.elapsed = 0.0
+
+    def record(self, status, latency: float, service: float, readings: int, size: int):
+        self.statuses[status] += 1
+        self.latencies.append(latency)
+        self.service_times.append(service)
+        self.bytes_sent += size
+        if status == 200:
+            self.readings_ok += readings
+
+    def summary(self) -> Dict:
+        completed = sum(self.statuses.values())
+        errors = completed - self.statuses.get(200, 0)
+        target = self.stage.devices * self.stage.rate
+        return {
+            'devices': self.stage.devices,
+            'rate': self.stage.rate,
+            'batch': self.stage.batch,
+            'duration': self.stage.duration,
+            'requests': completed,
+            'scheduled': self.scheduled,
+            'cancelled': self.cancelled,
+            'errors': errors,
+            'error_rate': round(errors / completed, 4) if completed else 0.0,
+            'statuses': {str(status): count for status, count in self.statuses.items()},
+            'target_readings_per_sec': round(target, 2),
+            'readings_per_sec': round(self.readings_ok / self.elapsed, 2) if self.elapsed else 0.0,
+            'requests_per_sec': round(completed / self.elapsed, 2) if self.elapsed else 0.0,
+            'bytes_per_reading': round(self.bytes_sent / max(1, completed * self.stage.batch), 1),
+            'latency_ms': {k: round(v, 2) for k, v in percentiles(self.latencies).items()},
+            'service_ms': {k: round(v, 2) for k, v in percentiles(self.service_times).items()},
+        }
+
+# ============================================
+# АЧААЛАЛ ҮҮСГЭГЧ
+# ============================================
+
+class LoadGenerator:
+    def __init__(self, url: str, batch_url: str, encoding: str = JSON,
+                 max_connections: int = Config.HTTP_MAX_CONNECTIONS,
+                 concurrency: int = Config.HTTP_CONCURRENCY,
+                 timeout: float = Config.HTTP_TIMEOUT):
+        self.url = url
+        self.batch_url = batch_url
+        self.max_connections = max_connections
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.timezone = timezone(timedelta(hours=8))  # GMT+8
+
+        self.encoder = WireEncoder(encoding, Config.SENSORS) if encoding != JSON else None
+        self.headers = {'Content-Type': CONTENT_TYPES[encoding]}
+        self.sensor_ids: List[Dict[str, int]] = []   # төхөөрөмж бүрийн
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def open(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _body(self, rows: List[List[float]], first: int, timestamp: datetime,
+              batched: bool) -> bytes:
+        documents = []
+        for offset, row in enumerate(rows):
+            sensor_ids = self.sensor_ids[first + offset]
+            readings = dict(zip(Config.SENSORS, row))
+            if self.encoder is not None:
+                documents.append(self.encoder.encode(sensor_ids, timestamp, readings))
+            else:
+                documents.append(build_payload(readings, timestamp, sensor_ids))
+        if self.encoder is not None:
+            return b''.join(documents)
+        return json.dumps(documents if batched else documents[0],
+                          separators=(',', ':')).encode('utf-8')
+
+    async def _request(self, url: str, body: bytes, readings: int,
+                       scheduled: float, result: StageResult):
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            started = loop.time()
+            try:
+                async with self.session.post(url, data=body, headers=self.headers) as response:
+                    await response.read()
+                    status = response.status
+            except asyncio.TimeoutError:
+                status = 'timeout'
+            except aiohttp.ClientError:
+                status = 'error'
+        finished = loop.time()
+        result.record(status, finished - scheduled, finished - started, readings, len(body))
+
+    async def run_stage(self, stage: Stage, fleet) -> StageResult:
+        """Шатыг хуваарийн дагуу ажиллуулж, бүх хариуг хүлээх"""
+        loop = asyncio.get_running_loop()
+        result = StageResult(stage)
+        url = self.url if stage.batch == 1 else self.batch_url
+        interval = 1.0 / stage.rate
+        requests_per_tick = math.ceil(stage.devices / stage.batch)
+        spacing = interval / requests_per_tick
+        pending = set()
+
+        started = loop.time()
+        tick_start = started
+        try:
+            while tick_start < started + stage.duration:
+                rows = fleet.step()[:stage.devices].tolist()
+                timestamp = datetime.now(self.timezone)
+                for index in range(requests_per_tick):
+                    scheduled = tick_start + index * spacing
+                    delay = scheduled - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    first = index * stage.batch
+                    chunk = rows[first:first + stage.batch]
+                    task = asyncio.ensure_future(self._request(
+                        url, self._body(chunk, first, timestamp, stage.batch > 1), len(chunk), scheduled, result))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                    result.scheduled += 1
+                tick_start += interval
+
+            if pending:
+                await asyncio.wait(pending, timeout=self.timeout * 2)
+        finally:
+            # Үлдсэн хүсэлт дараагийн шатны үр дүнд орох эсвэл хаагдсан session дээр унахгүй
+            leftover = list(pending)
+            for task in leftover:
+                task.cancel()
+            if leftover:
+                await asyncio.gather(*leftover, return_exceptions=True)
+            result.cancelled += len(leftover)
+        # Сүүлийн tick хугацааны дундуур эхэлдэг тул шатны хугацаанаас богиносгохгүй
+        result.elapsed = max(loop.time() - started, stage.duration)
+        return result
+
+# ============================================
+# MAIN
+# ============================================
+
+def log_summary(summary: Dict):
+    latency, service = summary['latency_ms'], summary['service_ms']
+    logger.info(
+        f"📊 {summary['devices']} төхөөрөмж × {summary['rate']}/s × {summary['batch']}: "
+        f"{summary['readings_per_sec']:.0f}/{summary['target_readings_per_sec']:.0f} уншилт/s, "
+        f"{summary['requests_per_sec']:.0f} хүсэлт/s, "
+        f"❌ {summary['error_rate']:.2%} {summary['statuses']}"
+        + (f", 🚫 {summary['cancelled']} цуцалсан" if summary['cancelled'] else "")
+    )
+    logger.info(
+        f"   ⏱️  latency p50 {latency['p50']:.1f} p95 {latency['p95']:.1f} "
+        f"p99 {latency['p99']:.1f} ms | service p50 {service['p50']:.1f} "
+        f"p95 {service['p95']:.1f} p99 {service['p99']:.1f} ms"
+    )
+
+async def run(args) -> List[Dict]:
+    from fleet import HeatingFleet
+
+    stages = parse_stages(args.stages) if args.stages else PROFILES[args.profile]
+    url, batch_url = args.url, args.batch_url
+    server = None
+    if args.local:
+        from stub_server import start_stub_server
+        server = start_stub_server(latency=args.latency, jitter=args.jitter,
+                                   failure_rate=args.failure_rate)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        url, batch_url = base + '/v/value', base + '/v/value/batch'
+        Config.SENSOR_OBJECTS_URL = base + '/m/sensor-objects-in-measurement-object/{id}'
+
+    fleet = HeatingFleet(max(stage.devices for stage in stages))
+    generator = LoadGenerator(url, batch_url, args.encoding,
+                              concurrency=args.concurrency, timeout=args.timeout)
+
+    if args.first_measurement_id:
+        registry = setup_sensor_registry()
+        measurement_ids = [args.first_measurement_id + i for i in range(fleet.size)]
+        registry.load()
+        started = asyncio.get_running_loop().time()
+        await asyncio.get_running_loop().run_in_executor(None, registry.resolve, measurement_ids)
+        logger.info(f"🗂️  {fleet.size} объектын ID "
+                    f"{asyncio.get_running_loop().time() - started:.2f}s-д бэлэн боллоо")
+        generator.sensor_ids = [registry.sensor_ids(mid) for mid in measurement_ids]
+    else:
+        # Орлолт серверийн ID — жинхэнэ сервер рүү 0 ID илгээхгүй
+        if not args.local:
+            logger.warning("⚠️  --first-measurement-id өгөөгүй: орлолт серверийн ID ашиглана")
+        generator.sensor_ids = [stub_sensor_ids(i + 1) for i in range(fleet.size)]
+
+    logger.info(f"🚀 Ачааллын туршилт → {url} ({len(stages)} шат, {args.encoding})")
+    summaries = []
+    await generator.open()
+    try:
+        for stage in stages:
+            summary = (await generator.run_stage(stage, fleet)).summary()
+            log_summary(summary)
+            summaries.append(summary)
+    finally:
+        await generator.close()
+        if server is not None:
+            server.shutdown()
+    return summaries
+
+def main():
+    setup_logger()
+    parser = argparse.ArgumentParser(description='Ingest API-ийн ачааллын туршилт')
+    parser.add_argument('--url', default=Config.SERVER_URL)
+    parser.add_argument('--batch-url', default=Config.BATCH_URL)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='smoke')
+    parser.add_argument('--stages', help="'devices:rate:batch:seconds,...' (--profile-ийг дарна)")
+    parser.add_argument('--encoding', choices=sorted(CONTENT_TYPES), default=Config.WIRE_ENCODING)
+    parser.add_argument('--concurrency', type=int, default=Config.HTTP_CONCURRENCY)
+    parser.add_argument('--timeout', type=float, default=Config.HTTP_TIMEOUT)
+    parser.add_argument('--first-measurement-id', type=int, default=0,
+                        help='төхөөрөмж бүрийн sensor ID-г татах (эхний measurement object)')
+    parser.add_argument('--json', help='үр дүнг JSON файлд бичих')
+    parser.add_argument('--local', action='store_true', help='орлолт серверийг дотор нь эхлүүлэх')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    try:
+        summaries = asyncio.run(run(args))
+    except KeyboardInterrupt:
+        logger.info("\n⚠️  Ctrl+C - Зогсож байна")
+        return
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'url': args.url if not args.local else 'local', 'stages': summaries}, f, indent=2)
+        logger.info(f"💾 Үр дүн: {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+ХУРДНЫ ХЭМЖИЛТ БА METRICS ENDPOINT
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Давталтын шат бүрийн хугацааг гистограммаар хэмжиж, Prometheus-ийн
+текст форматаар http://<host>:<port>/metrics дээр гаргана:
+
+    heating_stage_seconds{stage="physics|payload|serialize|http|mqtt|log"}
+    heating_tick_lag_seconds          - сүүлийн tick-ийн хоцролт
+    heating_bytes_sent_total{transport="http|mqtt"}
+    heating_queue_depth{queue="..."}  - дарааллын урт (уншихад тооцоологдоно)
+
+Хэрэглээ:
+    with STAGE_SECONDS.labels(stage='physics').time():
+        readings = system.calculate_all_readings()
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: str = '') -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+# ============================================
+# ХЭМЖИГДЭХҮҮН
+# ============================================
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self.lock:
+            self.value += amount
+
+    def samples(self, name, labels):
+        yield f"{name}{_format_labels(labels)} {self.value}"
+
+class Gauge:
+    kind = 'gauge'
+
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Утгыг metrics уншигдах үед тооцоолох (дарааллын урт гэх мэт)"""
+        self.function = function
+
+    def samples(self, name, labels):
+        value = self.function() if self.function is not None else self.value
+        yield f"{name}{_format_labels(labels)} {value}"
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.lock = threading.Lock()
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def samples(self, name, labels):
+        with self.lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            le = 'le="%s"' % bound
+            yield f"{name}_bucket{_format_labels(labels, le)} {cumulative}"
+        le = 'le="+Inf"'
+        yield f"{name}_bucket{_format_labels(labels, le)} {count}"
+        yield f"{name}_sum{_format_labels(labels)} {total}"
+        yield f"{name}_count{_format_labels(labels)} {count}"
+
+class Family:
+    """Нэг нэртэй, өөр өөр label-тай хэмжигдэхүүний бүлэг"""
+
+    def __init__(self, name: str, help: str, factory):
+        self.name = name
+        self.help = help
+        self.factory = factory
+        self.kind = factory().kind
+        self.lock = threading.Lock()
+        self.children: Dict[Tuple[Tuple[str, str], ...], object] = {}
+
+    def labels(self, **labels):
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(key, self.factory())
+        return child
+
+    # Label-гүй хэрэглээ
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for key, child in list(self.children.items()):
+            yield from child.samples(self.name, key)
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.families: Dict[str, Family] = {}
+
+    def _family(self, name, help, factory) -> Family:
+        with self.lock:
+            family = self.families.get(name)
+            if family is None:
+                family = self.families[name] = Family(name, help, factory)
+            return family
+
+    def counter(self, name: str, help: str) -> Family:
+        return self._family(name, help, Counter)
+
+    def gauge(self, name: str, help: str) -> Family:
+        return self._family(name, help, Gauge)
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Family:
+        return self._family(name, help, lambda: Histogram(buckets))
+
+    def render(self) -> str:
+        lines = []
+        for family in list(self.families.values()):
+            lines.extend(family.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'heating_stage_seconds', 'Давталтын шат бүрийн хугацаа (секунд)')
+TICK_LAG_SECONDS = REGISTRY.gauge(
+    'heating_tick_lag_seconds', 'Сүүлийн tick-ийн хуваарьт хугацаанаас хоцорсон хугацаа')
+TICK_OVERRUNS = REGISTRY.gauge(
+    'heating_tick_overruns', 'Tick хугацаа хэтэрсэн тоо (эхэлснээс, scheduler-ийн тоолуур)')
+BYTES_SENT = REGISTRY.counter(
+    'heating_bytes_sent_total', 'Илгээсэн байт')
+SEND_RESULTS = REGISTRY.counter(
+    'heating_send_total', 'Илгээлтийн үр дүн')
+QUEUE_DEPTH = REGISTRY.gauge(
+    'heating_queue_depth', 'Дарааллын урт')
+
+# ============================================
+# HTTP ENDPOINT
+# ============================================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def start_metrics_server(port: int, host: str = '0.0.0.0',
+                         registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """/metrics endpoint-ийг ард талын thread дээр эхлүүлэх"""
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name='Metrics').start()
+    return server
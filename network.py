@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+ХОТЫН ДУЛААНЫ СҮЛЖЭЭНИЙ ЗАГВАР (SPARSE SOLVER)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+HeatingFleet-ийн дэд станц бүр өөрийн тогтмол шугамтай. Энд дулааны
+станц → магистраль → салбар → дэд станцуудын граф дээр tick бүрт:
+
+    1. Дэд станцын ачаалал гадны температураас (градус-цаг), урсгалыг
+       хянагч нь өмнөх tick-ийн орох температур ба даралтын зөрүүгээр
+    2. Гидравлик: A^T·G·A·p = -c  (G = 1/(R·|m|), дараалсан шугамчлал)
+    3. Шууд шугамын температур: урсгалын чигт холилт + шугамын алдагдал
+       T_гарах = T_газар + (T_орох - T_газар)·exp(-UA / (m·cp))
+    4. Буцах шугамын температур: дэд станцын буцах урсгал холилдож станц руу
+
+Бүгд scipy.sparse шугаман системүүд — хэдэн арван мянган зангилаа нэг
+tick-д багтана. Алс, ачаалал ихтэй салбарын дэд станцууд даралт
+дутаж, урсгал нь хязгаарлагдана.
+
+Гаралт HeatingFleet-тэй ижил (N × 8) матриц (зөвхөн дэд станцууд):
+
+    python network.py --substations 20000 --ticks 10
+    python network.py --load city.json
+"""
+
+import argparse
+import json
+import math
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import scipy.sparse as sparse
+from scipy.sparse.linalg import spsolve
+
+from fleet import (HeatingFleet, P_FORWARD, P_RETURN, P_RETURN_STATION, P_SUPPLY,
+                   T_FORWARD, T_RETURN, T_RETURN_STATION, T_SUPPLY)
+from simulator import Config, logger, setup_logger
+
+CP = 4190.0        # Усны дулаан багтаамж (J/kg·K)
+RHO = 970.0        # Усны нягт ~80°C (kg/m³)
+BAR = 1e5          # Pa
+
+PLANT, JUNCTION, SUBSTATION = 'plant', 'junction', 'substation'
+
+# ============================================
+# СҮЛЖЭЭ
+# ============================================
+
+class ThermalNetwork(HeatingFleet):
+    """
+    Граф дээрх дэд станцуудын загвар
+
+    nodes: [{'id', 'type': plant|junction|substation, 'design_load_kw'}]
+    pipes: [{'from', 'to', 'length_m', 'diameter_m'}]
+    Яг нэг plant байна. Гогцоотой (meshed) сүлжээ ч болно.
+    """
+
+    def __init__(self, nodes: List[Dict], pipes: List[Dict], seed: Optional[int] = None):
+        # Станцыг 0-р зангилаа болгох
+        plants = [node for node in nodes if node['type'] == PLANT]
+        if len(plants) != 1:
+            raise ValueError("network must have exactly one plant")
+        nodes = plants + [node for node in nodes if node['type'] != PLANT]
+        index = {node['id']: i for i, node in enumerate(nodes)}
+
+        substations = [i for i, node in enumerate(nodes) if node['type'] == SUBSTATION]
+        if not substations:
+            raise ValueError("network has no substations")
+        super().__init__(len(substations), [nodes[i]['id'] for i in substations], seed=seed)
+
+        cfg = Config.NETWORK
+        self.cfg = cfg
+        self.nodes = nodes
+        self.pipes = pipes
+        self.n_nodes = len(nodes)
+        self.sub_nodes = np.array(substations, dtype=np.int64)
+        self.design_load = np.array(
+            [nodes[i].get('design_load_kw', cfg['design_load_kw']) * 1000.0 for i in substations])
+
+        self.edge_from = np.array([index[pipe['from']] for pipe in pipes], dtype=np.int64)
+        self.edge_to = np.array([index[pipe['to']] for pipe in pipes], dtype=np.int64)
+        length = np.array([pipe['length_m'] for pipe in pipes], dtype=np.float64)
+        diameter = np.array([pipe['diameter_m'] for pipe in pipes], dtype=np.float64)
+
+        # Δp = R·m·|m| (Darcy–Weisbach), алдагдал UA = k·L (W/K)
+        area = math.pi * diameter ** 2 / 4
+        self.resistance = cfg['pipe_friction'] * length / (diameter * 2 * RHO * area ** 2)
+        self.loss_ua = cfg['pipe_loss_w_per_mk'] * length
+
+        # Лапласын бүтэц (tick бүрт зөвхөн утга өөрчлөгдөнө)
+        f, t = self.edge_from, self.edge_to
+        self._lap_rows = np.concatenate([f, t, f, t])
+        self._lap_cols = np.concatenate([f, t, t, f])
+
+        # Төлөв
+        self.flow = np.full(len(pipes), 1.0)                 # kg/s, from → to эерэг
+        self.pressure = np.full(self.n_nodes, cfg['plant_supply_pressure'] * BAR)
+        self.supply_temp = np.full(self.n_nodes, Config.PHYSICS['station_base_temp'])
+        self.return_temp = np.full(self.n_nodes, cfg['return_target_temp'])
+        self.sub_flow = np.zeros(self.size)
+        self.throttle = np.ones(self.size)
+        self.heat_demand = np.zeros(self.size)
+        self.heat_delivered = np.zeros(self.size)
+        self.plant_temp = Config.PHYSICS['station_base_temp']
+        self.solve_seconds = 0.0
+
+        # Эхний тэнцвэрт төлөв рүү халаах
+        for _ in range(cfg['warmup_ticks']):
+            self.step()
+
+    # ---------- бүтээх ----------
+
+    @classmethod
+    def load(cls, path: str, seed: Optional[int] = None) -> 'ThermalNetwork':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['nodes'], data['pipes'], seed=seed)
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'nodes': self.nodes, 'pipes': self.pipes}, f)
+
+    @classmethod
+    def generate(cls, substations: int, per_junction: int = 8, branch_length: int = 10,
+                 loops: int = 0, seed: Optional[int] = None) -> 'ThermalNetwork':
+        """
+        Станц → магистраль → салбар → дэд станц мод үүсгэх
+
+        per_junction:  салбарын зангилаа бүрт холбогдох дэд станц
+        branch_length: салбарын гинжин дэх зангилааны тоо
+        loops:         салбаруудын үзүүрийг холбох нэмэлт шугам (гогцоо)
+        Шугамын диаметрийг доод талын тооцооны урсгалаар сонгоно.
+        """
+        cfg = Config.NETWORK
+        rng = np.random.default_rng(seed)
+        n_junctions = math.ceil(substations / per_junction)
+        n_branches = math.ceil(n_junctions / branch_length)
+        n_trunk = max(1, round(math.sqrt(n_branches)))
+
+        nodes = [{'id': 'PLANT', 'type': PLANT}]
+        parent = [-1]
+        lengths = [0.0]
+
+        def add(node, parent_index, length):
+            nodes.append(node)
+            parent.append(parent_index)
+            lengths.append(length)
+            return len(nodes) - 1
+
+        trunk = []
+        for i in range(n_trunk):
+            previous = trunk[-1] if trunk else 0
+            trunk.append(add({'id': f'TRUNK_{i + 1:03d}', 'type': JUNCTION}, previous,
+                             float(rng.uniform(200, 400))))
+
+        branch_ends = []
+        junction_count = 0
+        substation_count = 0
+        for b in range(n_branches):
+            previous = trunk[b % n_trunk]
+            for j in range(branch_length):
+                if junction_count >= n_junctions:
+                    break
+                junction_count += 1
+                previous = add({'id': f'BRANCH_{b + 1:04d}_{j + 1:02d}', 'type': JUNCTION},
+                               previous, float(rng.uniform(50, 120)))
+                for _ in range(per_junction):
+                    if substation_count >= substations:
+                        break
+                    substation_count += 1
+                    add({'id': f'SUBSTATION_{substation_count:04d}', 'type': SUBSTATION,
+                         'design_load_kw': round(float(rng.lognormal(
+                             math.log(cfg['design_load_kw']), 0.4)), 1)},
+                        previous, float(rng.uniform(20, 80)))
+            branch_ends.append(previous)
+
+        # Доод талын тооцооны урсгал (хүүхэд эцгээсээ хойно үүссэн)
+        design_flow = np.zeros(len(nodes))
+        design_dt = Config.PHYSICS['station_base_temp'] - cfg['return_target_temp']
+        for i, node in enumerate(nodes):
+            if node['type'] == SUBSTATION:
+                design_flow[i] = node['design_load_kw'] * 1000.0 / (CP * design_dt)
+        for i in range(len(nodes) - 1, 0, -1):
+            design_flow[parent[i]] += design_flow[i]
+
+        def diameter(flow):
+            return max(0.05, math.sqrt(4 * flow / (RHO * math.pi * cfg['design_velocity'])))
+
+        pipes = [
+            {'from': nodes[parent[i]]['id'], 'to': nodes[i]['id'],
+             'length_m': round(lengths[i], 1), 'diameter_m': round(diameter(design_flow[i]), 3)}
+            for i in range(1, len(nodes))
+        ]
+        for _ in range(min(loops, len(branch_ends) // 2)):
+            a, b = rng.choice(len(branch_ends), 2, replace=False)
+            pipes.append({'from': nodes[branch_ends[a]]['id'], 'to': nodes[branch_ends[b]]['id'],
+                          'length_m': round(float(rng.uniform(100, 300)), 1), 'diameter_m': 0.1})
+
+        return cls(nodes, pipes, seed=seed)
+
+    # ---------- шийдэгч ----------
+
+    def _solve_hydraulics(self, consumption: np.ndarray):
+        """A^T·G·A·p = -c, станцын даралт тогтмол (Dirichlet)"""
+        n = self.n_nodes
+        f, t = self.edge_from, self.edge_to
+        for _ in range(self.cfg['hydraulic_iterations']):
+            g = 1.0 / (self.resistance * np.maximum(np.abs(self.flow), 1e-3))
+            laplacian = sparse.coo_matrix(
+                (np.concatenate([g, g, -g, -g]), (self._lap_rows, self._lap_cols)),
+                shape=(n, n)).tocsc()
+            p0 = self.cfg['plant_supply_pressure'] * BAR
+            rhs = -consumption[1:] - laplacian[1:, 0].toarray().ravel() * p0
+            self.pressure[0] = p0
+            self.pressure[1:] = spsolve(laplacian[1:, 1:], rhs)
+            # Хагас алхам — R·m·|m|-ийн шугамчлал хэлбэлзэхгүй
+            self.flow = 0.5 * (self.flow + g * (self.pressure[f] - self.pressure[t]))
+
+    def _transport(self, upstream, downstream, flow, fixed=None, injection=None,
+                   injection_temp=None) -> np.ndarray:
+        """
+        Урсгалын чигт холилтын температур
+
+        Зангилаа бүр: Σ m·T_ирэх(алдагдалтай) + m_нэмэлт·T_нэмэлт = (Σ m + m_нэмэлт)·T
+        fixed: (зангилаа, температур) — станцын гаралт
+        """
+        n = self.n_nodes
+        ground = self.cfg['ground_temp']
+        decay = np.exp(-self.loss_ua / (np.maximum(flow, 1e-6) * CP))
+        eps = 1e-6  # урсгалгүй зангилаа газрын температурт очно
+
+        diagonal = np.full(n, eps)
+        np.add.at(diagonal, downstream, flow)
+        rhs = np.full(n, eps * ground)
+        np.add.at(rhs, downstream, flow * (1 - decay) * ground)
+        if injection is not None:
+            diagonal[self.sub_nodes] += injection
+            rhs[self.sub_nodes] += injection * injection_temp
+
+        rows, cols, data = downstream, upstream, -flow * decay
+        if fixed is not None:
+            node, temp = fixed
+            keep = downstream != node
+            rows, cols, data = rows[keep], cols[keep], data[keep]
+            diagonal[node], rhs[node] = 1.0, temp
+
+        matrix = sparse.coo_matrix(
+            (np.concatenate([diagonal, data]),
+             (np.concatenate([np.arange(n), rows]), np.concatenate([np.arange(n), cols]))),
+            shape=(n, n)).tocsc()
+        return spsolve(matrix, rhs)
+
+    def step(self, now: Optional[datetime] = None) -> np.ndarray:
+        """Бүх сүлжээг нэг tick-ээр шийдэж, дэд станцуудын (N × 8) матрицыг буцаах"""
+        started = time.perf_counter()
+        cfg = self.cfg
+        p = self.params
+        n = self.size
+        normal = self.rng.normal
+        subs = self.sub_nodes
+        out = self._readings
+
+        # 1️⃣ Станцын гаралтын температур (HeatingFleet-тэй ижил муруй, хотын дундажаар)
+        outdoor = self.get_outdoor_temperature(now)
+        target = (Config.PHYSICS['station_base_temp']
+                  - float(outdoor.mean()) * Config.PHYSICS['outdoor_temp_influence'])
+        self.plant_temp = min(100.0, max(70.0, self.plant_temp * 0.95 + target * 0.05))
+
+        # 2️⃣ Дэд станцын ачаалал ба урсгалын хүсэлт
+        load_fraction = np.clip((cfg['indoor_temp'] - outdoor) /
+                                (cfg['indoor_temp'] - cfg['design_outdoor_temp']), 0.0, 1.2)
+        self.heat_demand = self.design_load * load_fraction * (1 + normal(0, 0.05, n))
+        np.maximum(self.heat_demand, 0.0, out=self.heat_demand)
+        available_dt = np.maximum(self.supply_temp[subs] - cfg['return_target_temp'], 5.0)
+        demand_flow = self.heat_demand / (CP * available_dt)
+
+        # Даралтын зөрүү хүрэхгүй бол хавхлага бүрэн нээлттэй ч урсгал багасна
+        dp = 2 * self.pressure[subs] - (cfg['plant_supply_pressure'] + cfg['plant_return_pressure']) * BAR
+        throttle = np.sqrt(np.clip(dp / (cfg['substation_dp_min'] * BAR), 0.0, 1.0))
+        # Хавхлагын хөтлүүр аажим хөдөлнө (tick хооронд савлахгүй)
+        self.throttle += 0.3 * (throttle - self.throttle)
+        self.sub_flow = demand_flow * self.throttle
+
+        # 3️⃣ Гидравлик
+        consumption = np.zeros(self.n_nodes)
+        consumption[subs] = self.sub_flow
+        self._solve_hydraulics(consumption)
+
+        # 4️⃣ Шууд шугамын температур
+        forward = self.flow >= 0
+        upstream = np.where(forward, self.edge_from, self.edge_to)
+        downstream = np.where(forward, self.edge_to, self.edge_from)
+        flow = np.abs(self.flow)
+        self.supply_temp = self._transport(upstream, downstream, flow, fixed=(0, self.plant_temp))
+
+        # 5️⃣ Дэд станцын анхдагч буцах температур (энергийн тэнцэл)
+        T_s = self.supply_temp[subs]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            T_r = T_s - self.heat_demand / (self.sub_flow * CP)
+        # Дулаан солилцуур хэрэглэгчийн буцах усаас доош хөргөж чадахгүй
+        T_r = np.clip(np.nan_to_num(T_r, nan=T_s), np.minimum(cfg['min_return_temp'], T_s), T_s)
+        self.heat_delivered = self.sub_flow * CP * (T_s - T_r)
+
+        # 6️⃣ Буцах шугам — урсгал эсрэг чигт
+        self.return_temp = self._transport(downstream, upstream, flow,
+                                           injection=self.sub_flow, injection_temp=T_r)
+
+        # 7️⃣ Мэдрэгчүүд (дэд станц доторх хэсэг нь HeatingFleet-тэй ижил)
+        supply_pressure = self.pressure[subs] / BAR
+        return_pressure = (cfg['plant_supply_pressure'] + cfg['plant_return_pressure']) - supply_pressure
+        T1 = T_s + normal(0, 0.1, n)
+        T_forward = T1 - p['pipe_heat_loss'] - p['boiler_heat_loss'] / 2
+        P_forward = supply_pressure - p['pipe_pressure_drop'] - p['boiler_pressure_drop'] / 2
+        delivered_fraction = self.heat_delivered / self.design_load
+
+        out[:, T_SUPPLY] = T1
+        out[:, P_SUPPLY] = supply_pressure + normal(0, 0.01, n)
+        out[:, T_FORWARD] = T_forward
+        out[:, P_FORWARD] = P_forward
+        out[:, T_RETURN] = T_forward - cfg['consumer_delta_t'] * delivered_fraction
+        out[:, P_RETURN] = P_forward - 0.1
+        out[:, T_RETURN_STATION] = T_r + normal(0, 0.1, n)
+        out[:, P_RETURN_STATION] = return_pressure + normal(0, 0.01, n)
+        np.round(out, 2, out=out)
+
+        self.last_station_temp[:] = T_s
+        self.last_pressure = supply_pressure
+        self.solve_seconds = time.perf_counter() - started
+        return out
+
+    def get_statistics(self) -> Dict:
+        dp = self._readings[:, P_SUPPLY] - self._readings[:, P_RETURN_STATION]
+        return {
+            'nodes': self.n_nodes,
+            'pipes': len(self.pipes),
+            'substations': self.size,
+            'plant_supply_temp': round(self.plant_temp, 2),
+            'plant_return_temp': round(float(self.return_temp[0]), 2),
+            'plant_flow_kg_s': round(float(self.sub_flow.sum()), 1),
+            'demand_mw': round(float(self.heat_demand.sum()) / 1e6, 2),
+            'delivered_mw': round(float(self.heat_delivered.sum()) / 1e6, 2),
+            'min_dp_bar': round(float(dp.min()), 3),
+            'starved': int(np.count_nonzero(self.heat_delivered < 0.95 * self.heat_demand)),
+            'solve_ms': round(self.solve_seconds * 1000, 1),
+        }
+
+# ============================================
+# MAIN
+# ============================================
+
+def main():
+    setup_logger()
+    parser = argparse.ArgumentParser(description='Хотын дулааны сүлжээний загвар')
+    parser.add_argument('--load', help='сүлжээний JSON (байхгүй бол үүсгэнэ)')
+    parser.add_argument('--save', help='үүсгэсэн сүлжээг JSON-д хадгалах')
+    parser.add_argument('--substations', type=int, default=Config.FLEET_SIZE)
+    parser.add_argument('--loops', type=int, default=0)
+    parser.add_argument('--ticks', type=int, default=10)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.load:
+        network = ThermalNetwork.load(args.load, seed=args.seed)
+    else:
+        network = ThermalNetwork.generate(args.substations, loops=args.loops, seed=args.seed)
+    logger.info(f"🏙️  Сүлжээ: {network.n_nodes} зангилаа, {len(network.pipes)} шугам, "
+                f"{network.size} дэд станц ({time.perf_counter() - started:.2f}s)")
+    if args.save:
+        network.save(args.save)
+
+    for _ in range(args.ticks):
+        network.step()
+        stats = network.get_statistics()
+        logger.info(f"🔥 {stats['plant_supply_temp']:.1f}→{stats['plant_return_temp']:.1f}°C, "
+                    f"{stats['delivered_mw']:.1f}/{stats['demand_mw']:.1f} MW, "
+                    f"Δp min {stats['min_dp_bar']:.2f} bar, "
+                    f"⚠️ {stats['starved']} дутсан, ⏱️ {stats['solve_ms']:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+ҮҮСГЭГЧ / ИЛГЭЭГЧИЙГ САЛГАСАН ДАМЖУУЛАХ ШУГАМ
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+DataSender.send нь tick-ийн давталт дотор шууд ажиллавал 5 секундын
+timeout бүр tick-ийг сунгана. Энд физик загвар хязгаартай дараалал руу
+хийгээд л үргэлжилнэ, илгээлт тусдаа thread дээр:
+
+    tick → submit() → [дараалал, max_size] → DeliveryPipeline thread
+                                                  ↓
+                                          CircuitBreaker.allow()?
+                                           ├ тийм → sender.send()
+                                           └ үгүй → sender.defer() (spool)
+
+Дараалал дүүрэх үеийн бодлого:
+
+    drop_oldest  хамгийн хуучныг хаяна (tick хэзээ ч хүлээхгүй)
+    spill        шинэ уншилтыг spool руу бичнэ (tick хүлээхгүй, алдагдалгүй)
+    block        дараалал сулрахыг хүлээнэ — tick хоцорно; зөвхөн хурдаас
+                 бүрэн байдал чухал үед (нөхөж ачаалах гэх мэт)
+
+Circuit breaker: дараалсан failure_threshold алдааны дараа нээгдэж (open),
+илгээгчийг оролдохгүй — уншилтууд spool руу шууд орно. reset_timeout-ийн
+дараа нэг туршилтын илгээлт (half-open); амжилттай бол хаагдана, үгүй бол
+хүлээх хугацаа хоёр дахин ихсэнэ (max_timeout хүртэл, ±10% jitter).
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+from metrics import QUEUE_DEPTH, REGISTRY
+
+logger = logging.getLogger('HeatingSimulator')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DROP_OLDEST = 'drop_oldest'
+SPILL = 'spill'
+BLOCK = 'block'
+POLICIES = (DROP_OLDEST, SPILL, BLOCK)
+
+CIRCUIT_STATE = REGISTRY.gauge(
+    'heating_circuit_open', 'Circuit breaker нээлттэй эсэх (0 хаалттай, 0.5 туршилт, 1 нээлттэй)')
+
+_STATE_VALUES = {CLOSED: 0.0, HALF_OPEN: 0.5, OPEN: 1.0}
+
+# ============================================
+# CIRCUIT BREAKER
+# ============================================
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 5.0,
+                 max_timeout: float = 300.0, name: str = 'http',
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        failure_threshold: Нээгдэх дараалсан алдааны тоо
+        reset_timeout:     Эхний туршилт хүртэлх хугацаа (секунд)
+        max_timeout:       Хүлээх хугацааны дээд хязгаар (секунд)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_timeout = max_timeout
+        self.name = name
+        self.clock = clock
+        self.lock = threading.Lock()
+
+        self.state = CLOSED
+        self.failures = 0
+        self.timeout = reset_timeout
+        self.opened_at = 0.0
+        self.retry_at = 0.0
+
+        self.open_count = 0
+        self.rejected_count = 0
+        CIRCUIT_STATE.labels(circuit=name).set_function(lambda: _STATE_VALUES[self.state])
+
+    def allow(self) -> bool:
+        """Илгээх эсэх — нээлттэй үед хугацаа болсон бол нэг туршилт зөвшөөрнө"""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() >= self.retry_at:
+                self.state = HALF_OPEN
+                return True
+            self.rejected_count += 1
+            return False
+
+    def record_success(self):
+        with self.lock:
+            if self.state != CLOSED:
+                logger.info(f"🟢 [{self.name}] Circuit хаагдлаа — сервер сэргэлээ "
+                            f"({self.clock() - self.opened_at:.0f} секунд тасалдсан)")
+            self.state = CLOSED
+            self.failures = 0
+            self.timeout = self.reset_timeout
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.timeout = min(self.timeout * 2, self.max_timeout)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+                self.open_count += 1
+                self._open()
+                logger.warning(f"🔴 [{self.name}] Circuit нээгдлээ: {self.failures} дараалсан алдаа")
+
+    def _open(self):
+        self.state = OPEN
+        self.retry_at = self.clock() + self.timeout * random.uniform(0.9, 1.1)
+
+    def get_statistics(self) -> Dict:
+        return {
+            'state': self.state,
+            'opens': self.open_count,
+            'rejected': self.rejected_count,
+            'timeout': round(self.timeout, 1),
+        }
+
+def deliver(sender, breaker: CircuitBreaker, readings: Dict[str, float],
+            timestamp: datetime, sensor_ids: Dict[str, int] = None) -> bool:
+    """
+    Breaker-ээр шүүж илгээх; нээлттэй бол sender.defer() (spool)
+
+    sensor_ids: флотын төхөөрөмжийн ID (None бол sender.sensor_ids)
+    """
+    if not sender.check_sensor_ids(sensor_ids):
+        return False  # Серверийн алдаа биш — breaker-т тоолохгүй
+    if breaker is not None and not breaker.allow():
+        sender.defer(readings, timestamp, sensor_ids)
+        return False
+    ok = sender.send(readings, timestamp, sensor_ids)
+    if breaker is not None:
+        if ok:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+    return ok
+
+# ============================================
+# ДАМЖУУЛАХ ШУГАМ
+# ============================================
+
+class DeliveryPipeline(threading.Thread):
+    def __init__(self, sender, breaker: CircuitBreaker = None, max_size: int = 1000,
+                 policy: str = DROP_OLDEST):
+        """
+        sender:  DataSender / BatchingSender (spill-д spool-той байх ёстой)
+        breaker: CircuitBreaker (None бол үргэлж илгээнэ)
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"unknown delivery policy: {policy}")
+        if policy == SPILL and sender.spool is None:
+            raise ValueError("spill policy requires a sender with a spool")
+        super().__init__(daemon=True, name='DeliveryPipeline')
+        self.sender = sender
+        self.breaker = breaker
+        self.policy = policy
+        self.queue = queue.Queue(maxsize=max_size)
+        QUEUE_DEPTH.labels(queue='delivery').set_function(self.queue.qsize)
+        self._stop_event = threading.Event()
+
+        self.submitted_count = 0
+        self.dropped_count = 0
+        self.spilled_count = 0
+        self.max_depth = 0
+
+    def submit(self, readings: Dict[str, float], timestamp: datetime):
+        """Tick-ийн давталтаас дуудна (block бодлогоос бусад үед хүлээхгүй)"""
+        self.submitted_count += 1
+        item = (readings, timestamp)
+        if self.policy == BLOCK:
+            self.queue.put(item)
+        else:
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    break
+                except queue.Full:
+                    if self.policy == SPILL:
+                        if self.sender.defer(readings, timestamp):
+                            self.spilled_count += 1
+                        else:
+                            self.dropped_count += 1
+                        break
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped_count += 1
+                    except queue.Empty:
+                        pass
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                readings, timestamp = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                deliver(self.sender, self.breaker, readings, timestamp)
+            except Exception as e:
+                logger.error(f"❌ Илгээх шугамын алдаа: {str(e)}")
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Үлдсэнийг timeout хүртэл илгээж, дараа нь spool руу хадгалах
+
+        Thread-ийг эхэлж зогсооно — үлдэгдлийг энэ (дуудсан) thread дээр
+        дуусгана. Thread удаан хариунд гацсан бол илгээгчийг зэрэг
+        ашиглахгүй, бүгдийг spool руу.
+        """
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+        deadline = time.monotonic() + timeout if not self.is_alive() else 0.0
+        spooled = lost = 0
+        while True:
+            try:
+                readings, timestamp = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if time.monotonic() < deadline:
+                deliver(self.sender, self.breaker, readings, timestamp)
+            elif self.sender.defer(readings, timestamp):
+                spooled += 1
+            else:
+                lost += 1
+        if spooled:
+            logger.warning(f"⚠️  Зогсох үед {spooled} уншилт spool руу шилжлээ")
+        if lost:
+            logger.warning(f"⚠️  Зогсох үед {lost} уншилт хаягдлаа (spool байхгүй)")
+
+    def get_statistics(self) -> Dict:
+        stats = {
+            'policy': self.policy,
+            'submitted': self.submitted_count,
+            'queued': self.queue.qsize(),
+            'max_depth': self.max_depth,
+            'dropped': self.dropped_count,
+            'spilled': self.spilled_count,
+        }
+        if self.breaker is not None:
+            stats['breaker'] = self.breaker.get_statistics()
+        return stats
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+ТЕЛЕМЕТРИЙГ БИЧИЖ, ДАХИН ТОГЛУУЛАХ (RECORD / REPLAY)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Ачааллын тест, алдааг давтан үүсгэхэд яг ижил урсгал хэрэгтэй. Бичлэг нь
+хавтас — суваг бүр тусдаа багана файл (memmap хийгдэнэ):
+
+    readings.rec/
+        meta.json                     ← сувгууд, төхөөрөмжүүд, цагийн бүс
+        time.i8                       ← tick бүрийн цаг (мс, int64)
+        supply_from_station_temp.f4   ← (tick × төхөөрөмж) float32
+        ...                           ← Config.SENSORS-ийн 8 суваг
+
+Нэг өдөр × 1000 төхөөрөмж × 10 секунд ≈ 276 MB. Утгууд float32-оор
+хадгалагдаж, уншихдаа meta.json-ий decimals хүртэл бөөрөнхийлөгдөнө
+(физик загвар 2 оронтой гаргадаг тул алдагдалгүй).
+
+Tick-ийн тоо нь хамгийн богино файлаар тодорхойлогдоно — бичлэг тасарсан ч
+сүүлийн дутуу tick-ээс бусад нь уншигдана.
+
+    python recording.py record day.rec --devices 1000 --start 2026-01-15T00:00 --duration 86400 --step 10
+    python recording.py replay day.rec --speed max --sinks http
+    python recording.py info day.rec
+
+Бодит ажиллагааг бичих бол Config.SINKS-д 'record' нэмнэ (Config.RECORD_PATH).
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fleet import CHANNELS, create_fleet
+from simulator import Config, logger, setup_logger
+
+VERSION = 1
+META_FILE = 'meta.json'
+TIME_FILE = 'time.i8'
+TIME_DTYPE = np.dtype('<i8')
+VALUE_DTYPE = np.dtype('<f4')
+
+def _column_file(channel: str) -> str:
+    return f"{channel}.f4"
+
+def _timestamp_ms(timestamp: datetime) -> int:
+    return int(round(timestamp.timestamp() * 1000))
+
+# ============================================
+# БИЧИГЧ
+# ============================================
+
+class Recorder:
+    """Tick-үүдийг багана файлуудын төгсгөлд нэмж бичих"""
+
+    def __init__(self, path: str, device_ids: Sequence[str],
+                 channels: Sequence[str] = CHANNELS, decimals: int = 2,
+                 tz: timezone = timezone(timedelta(hours=8))):
+        """
+        path:       Бичлэгийн хавтас (байгаа бол ижил төхөөрөмжүүдтэй байх ёстой)
+        device_ids: Мөрийн дараалал — бүх tick-т ижил
+        """
+        self.path = path
+        self.device_ids = list(device_ids)
+        self.channels = tuple(channels)
+        self.tick_count = 0
+
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta['device_ids'] != self.device_ids or tuple(meta['channels']) != self.channels:
+                raise ValueError(f"{path}: өөр төхөөрөмж/сувагтай бичлэг байна")
+        else:
+            offset = tz.utcoffset(None).total_seconds()
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': VERSION,
+                    'channels': list(self.channels),
+                    'device_ids': self.device_ids,
+                    'decimals': decimals,
+                    'utc_offset_s': int(offset),
+                    'created': datetime.now(tz).isoformat(),
+                }, f, ensure_ascii=False)
+
+        self.columns = [open(os.path.join(path, _column_file(channel)), 'ab')
+                        for channel in self.channels]
+        self.times = open(os.path.join(path, TIME_FILE), 'ab')
+
+    def append(self, timestamp: datetime, readings: np.ndarray):
+        """Нэг tick: (N × 8) матриц"""
+        self.append_block([timestamp], np.asarray(readings)[np.newaxis])
+
+    def append_block(self, timestamps: Sequence[datetime], block: np.ndarray):
+        """k tick: (k × N × 8) матриц — суваг бүр нэг write"""
+        block = np.asarray(block)
+        if block.shape[1:] != (len(self.device_ids), len(self.channels)):
+            raise ValueError(f"block shape {block.shape} does not match recording")
+        for c, column in enumerate(self.columns):
+            column.write(np.ascontiguousarray(block[:, :, c], dtype=VALUE_DTYPE).tobytes())
+        # Цагийг хамгийн сүүлд бичнэ — tick-ийн тоо үүгээр тоологдоно
+        self.times.write(np.array([_timestamp_ms(t) for t in timestamps],
+                                  dtype=TIME_DTYPE).tobytes())
+        self.tick_count += len(timestamps)
+
+    def flush(self):
+        for f in self.columns + [self.times]:
+            f.flush()
+
+    def close(self):
+        for f in self.columns + [self.times]:
+            f.close()
+
+# ============================================
+# УНШИГЧ
+# ============================================
+
+class Recording:
+    """Бичлэгийг memmap-аар унших (файлыг бүхэлд нь санах ойд ачаалахгүй)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != VERSION:
+            raise ValueError(f"{path}: unsupported recording version {self.meta.get('version')}")
+
+        self.device_ids: List[str] = self.meta['device_ids']
+        self.channels: Tuple[str, ...] = tuple(self.meta['channels'])
+        self.decimals: int = self.meta.get('decimals', 2)
+        self.timezone = timezone(timedelta(seconds=self.meta.get('utc_offset_s', 0)))
+
+        n = len(self.device_ids)
+        files = [TIME_FILE] + [_column_file(channel) for channel in self.channels]
+        sizes = [os.path.getsize(os.path.join(path, name)) for name in files]
+        self.tick_count = min([sizes[0] // TIME_DTYPE.itemsize] +
+                              [size // (n * VALUE_DTYPE.itemsize) for size in sizes[1:]])
+
+        if self.tick_count:
+            self.times = np.memmap(os.path.join(path, TIME_FILE), dtype=TIME_DTYPE,
+                                   mode='r', shape=(self.tick_count,))
+            self.columns = [
+                np.memmap(os.path.join(path, _column_file(channel)), dtype=VALUE_DTYPE,
+                          mode='r', shape=(self.tick_count, n))
+                for channel in self.channels
+            ]
+        else:
+            self.times = np.empty(0, dtype=TIME_DTYPE)
+            self.columns = [np.empty((0, n), dtype=VALUE_DTYPE) for _ in self.channels]
+
+    def __len__(self) -> int:
+        return self.tick_count
+
+    def timestamp(self, timestamp_ms: int) -> datetime:
+        return datetime.fromtimestamp(timestamp_ms / 1000, self.timezone)
+
+    def block(self, start: int, stop: int) -> np.ndarray:
+        """[start, stop) tick-үүд: (k × N × 8) float64"""
+        block = np.stack([column[start:stop] for column in self.columns], axis=-1)
+        return np.round(block.astype(np.float64), self.decimals)
+
+    def chunks(self, chunk: int = 100, start: int = 0) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Chunk бүр: (цаг мс, (k × N × 8) матриц)"""
+        for offset in range(start, self.tick_count, chunk):
+            stop = min(offset + chunk, self.tick_count)
+            yield np.asarray(self.times[offset:stop]), self.block(offset, stop)
+
+    def describe(self) -> str:
+        if not self.tick_count:
+            return f"{self.path}: {len(self.device_ids)} төхөөрөмж, хоосон"
+        first, last = self.timestamp(int(self.times[0])), self.timestamp(int(self.times[-1]))
+        size = sum(os.path.getsize(os.path.join(self.path, name))
+                   for name in os.listdir(self.path))
+        return (f"{self.path}: {len(self.device_ids)} төхөөрөмж × {self.tick_count} tick, "
+                f"{first.isoformat()} → {last.isoformat()}, {size / 1024 / 1024:.1f} MB")
+
+# ============================================
+# БИЧИХ / ТОГЛУУЛАХ
+# ============================================
+
+def record(path: str, fleet, start: datetime, end: datetime,
+           step: timedelta, chunk: int = 100) -> int:
+    """Флотыг симуляцийн цагаар [start, end) ажиллуулж бичих (бодит хугацаа хүлээхгүй)"""
+    recorder = Recorder(path, fleet.device_ids, tz=start.tzinfo or timezone.utc)
+    try:
+        for times, block in fleet.stream(start, end, step, chunk):
+            recorder.append_block(times, block)
+    finally:
+        recorder.close()
+    return recorder.tick_count
+
+def replay(recording: Recording, fanout, speed: float = 1.0, shift: bool = False,
+           chunk: int = 100, stop_event: Optional[threading.Event] = None) -> int:
+    """
+    Бичлэгийг гаралтууд руу дахин дамжуулах (физик тооцоололгүй)
+
+    speed: 1 = бичсэн хурдаар, N = N дахин хурдан, 0 = хүлээлтгүй
+    shift: цагийг одоогоос эхлэхээр шилжүүлэх (үгүй бол бичсэн цагаараа)
+
+    Гаралтын дараалал дүүрвэл хүлээнэ (хаяхгүй) — хурдыг гаралтууд тогтооно.
+    """
+    if not recording.tick_count:
+        return 0
+    stop_event = stop_event or threading.Event()
+    first_ms = int(recording.times[0])
+    offset_ms = _timestamp_ms(datetime.now(recording.timezone)) - first_ms if shift else 0
+    started = time.monotonic()
+    published = 0
+
+    for times, block in recording.chunks(chunk):
+        for timestamp_ms, readings in zip(times.tolist(), block):
+            if speed > 0:
+                delay = started + (timestamp_ms - first_ms) / 1000 / speed - time.monotonic()
+                if delay > 0 and stop_event.wait(delay):
+                    return published
+            elif stop_event.is_set():
+                return published
+            fanout.publish(recording.timestamp(timestamp_ms + offset_ms),
+                           recording.device_ids, readings, block=True)
+            published += 1
+    return published
+
+# ============================================
+# MAIN
+# ============================================
+
+def _parse_start(value: str) -> datetime:
+    start = datetime.fromisoformat(value)
+    return start if start.tzinfo else start.replace(tzinfo=timezone(timedelta(hours=8)))
+
+def main():
+    setup_logger()
+    parser = argparse.ArgumentParser(description='Телеметрийг бичих / дахин тоглуулах')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    rec = commands.add_parser('record', help='флотыг симуляцийн цагаар бичих')
+    rec.add_argument('path')
+    rec.add_argument('--devices', type=int, default=Config.FLEET_SIZE)
+    rec.add_argument('--start', type=_parse_start,
+                     default=datetime.now(timezone(timedelta(hours=8))).replace(microsecond=0))
+    rec.add_argument('--duration', type=float, default=86400.0, help='секунд')
+    rec.add_argument('--step', type=float, default=Config.SEND_INTERVAL, help='секунд')
+    rec.add_argument('--seed', type=int)
+
+    play = commands.add_parser('replay', help='бичлэгийг гаралтууд руу тоглуулах')
+    play.add_argument('path')
+    play.add_argument('--speed', default='1', help="1, N эсвэл 'max'")
+    play.add_argument('--sinks', default=','.join(Config.SINKS))
+    play.add_argument('--shift', action='store_true', help='цагийг одоогоос эхлүүлэх')
+
+    info = commands.add_parser('info', help='бичлэгийн тойм')
+    info.add_argument('path')
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        fleet = create_fleet(args.devices, seed=args.seed)
+        end = args.start + timedelta(seconds=args.duration)
+        started = time.perf_counter()
+        ticks = record(args.path, fleet, args.start, end, timedelta(seconds=args.step))
+        logger.info(f"💾 {ticks} tick × {fleet.size} төхөөрөмж "
+                    f"{time.perf_counter() - started:.1f} секундэд бичигдлээ")
+        logger.info(Recording(args.path).describe())
+
+    elif args.command == 'replay':
+        from sinks import FanOut, build_sinks
+
+        recording = Recording(args.path)
+        speed = 0.0 if args.speed == 'max' else float(args.speed)
+        fanout = FanOut(build_sinks(args.sinks.split(','), device_ids=recording.device_ids))
+        logger.info(f"▶️  {recording.describe()} → {args.sinks} "
+                    f"({'max' if not speed else f'{speed:g}×'})")
+        fanout.start()
+        started = time.perf_counter()
+        published = 0
+        try:
+            published = replay(recording, fanout, speed, args.shift)
+        except KeyboardInterrupt:
+            logger.info("\n⚠️  Ctrl+C - Зогсож байна")
+        finally:
+            fanout.stop()
+        elapsed = time.perf_counter() - started
+        rows = published * len(recording.device_ids)
+        logger.info(f"⏹️  {published} tick ({rows} мөр) {elapsed:.1f} секундэд, "
+                    f"{rows / max(elapsed, 1e-9):.0f} мөр/с")
+        for name, stats in fanout.get_statistics().items():
+            logger.info(f"📈 {name}: ✍️ {stats['written']} 🗑️ {stats['dropped']} "
+                        f"❌ {stats['errors']}")
+
+    else:
+        print(Recording(args.path).describe())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+ТОГТМОЛ ДАВТАМЖТАЙ TICK ТӨЛӨВЛӨГЧ
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+time.sleep(interval)-ээс ялгаатай нь tick бүрийн хугацааг monotonic
+цагаар тооцоолно — тооцоолол, лог, сүлжээний хугацаа давтамжийг
+гулсуулахгүй.
+
+Хоцролтын бодлого:
+    catch_up - алдсан tick-үүдийг (max_catch_up хүртэл) дараалан гүйцээнэ
+    skip     - алдсан tick-үүдийг алгасаж, дараагийн хуваарьт шилжинэ
+
+StaggeredScheduler нь олон төхөөрөмжийг интервалын дотор жигд
+тарааж, серверт ачааллыг нэг агшинд биш тэгш хүргэнэ.
+"""
+
+import asyncio
+import time
+import zlib
+from typing import Dict, Optional
+
+CATCH_UP = 'catch_up'
+SKIP = 'skip'
+
+class _MonotonicClock:
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+def device_phase(device_id: str, interval: float) -> float:
+    """Төхөөрөмжийн нэрээс тогтмол фаз (0 ... interval) гаргах"""
+    return (zlib.crc32(device_id.encode('utf-8')) % 10000) / 10000 * interval
+
+# ============================================
+# TICK ТӨЛӨВЛӨГЧ
+# ============================================
+
+class TickScheduler:
+    def __init__(self, interval: float, phase: float = 0.0, policy: str = SKIP,
+                 max_catch_up: int = 10, clock=None):
+        """
+        interval:     Tick хоорондын хугацаа (секунд)
+        phase:        Эхний tick-ийн шилжилт (секунд)
+        policy:       'catch_up' эсвэл 'skip'
+        max_catch_up: catch_up үед дараалан гүйцээх tick-ийн дээд тоо
+        clock:        monotonic()/sleep() бүхий цаг (SimulatedClock байж болно)
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if policy not in (CATCH_UP, SKIP):
+            raise ValueError(f"unknown policy: {policy}")
+
+        self.interval = interval
+        self.phase = phase
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.clock = clock or _MonotonicClock()
+
+        self.deadline: Optional[float] = None
+        self.tick_count = 0
+        self.overrun_count = 0
+        self.skipped_count = 0
+        self.last_lateness = 0.0
+        self.max_lateness = 0.0
+        self._lateness_sum = 0.0
+
+    def _next_delay(self) -> float:
+        """Дараагийн tick хүртэлх хугацаа (хоцролтын бодлогыг хэрэгжүүлнэ)"""
+        now = self.clock.monotonic()
+        if self.deadline is None:
+            self.deadline = now + self.phase
+
+        behind = now - self.deadline
+        if behind > 0:
+            self.overrun_count += 1
+            missed = int(behind // self.interval)
+            if self.policy == SKIP:
+                drop = missed
+            else:
+                drop = max(0, missed - self.max_catch_up)
+            self.deadline += drop * self.interval
+            self.skipped_count += drop
+
+        return self.deadline - now
+
+    def _record(self):
+        lateness = self.clock.monotonic() - self.deadline
+        self.tick_count += 1
+        self.last_lateness = lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+        self._lateness_sum += abs(lateness)
+        self.deadline += self.interval
+        return lateness
+
+    def wait(self) -> float:
+        """Дараагийн tick хүртэл хүлээх. Хоцролтыг (секунд) буцаана."""
+        delay = self._next_delay()
+        if delay > 0:
+            self.clock.sleep(delay)
+        return self._record()
+
+    async def wait_async(self) -> float:
+        delay = self._next_delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._record()
+
+    def get_statistics(self) -> Dict:
+        mean = self._lateness_sum / self.tick_count if self.tick_count else 0.0
+        return {
+            'ticks': self.tick_count,
+            'overruns': self.overrun_count,
+            'skipped': self.skipped_count,
+            'jitter_last_ms': round(self.last_lateness * 1000, 3),
+            'jitter_mean_ms': round(mean * 1000, 3),
+            'jitter_max_ms': round(self.max_lateness * 1000, 3),
+        }
+
+class StaggeredScheduler:
+    """
+    Олон төхөөрөмжийг интервалын дотор жигд тараах
+
+    Интервалыг slots хэсэгт хувааж, хэсэг бүрт төхөөрөмжийн нэг бүлгийг
+    ононо. wait() нь тухайн агшинд илгээх төхөөрөмжийн индексийн range-ийг
+    буцаана. Алгассан tick-ийн slot-ууд мөн алгасагдана — бүлэг бүр
+    интервал доторх өөрийн агшиндаа үлдэнэ.
+    """
+
+    def __init__(self, interval: float, device_count: int, slots: Optional[int] = None,
+                 policy: str = SKIP, clock=None):
+        slots = slots or min(device_count, 100)
+        self.slots = slots
+        self.device_count = device_count
+        self.ticker = TickScheduler(interval / slots, policy=policy, clock=clock)
+        self._slot = 0
+
+    def _group(self, skipped: int = 0) -> range:
+        slot = (self._slot + skipped) % self.slots
+        self._slot = (slot + 1) % self.slots
+        start = slot * self.device_count // self.slots
+        end = (slot + 1) * self.device_count // self.slots
+        return range(start, end)
+
+    def wait(self) -> range:
+        skipped = self.ticker.skipped_count
+        self.ticker.wait()
+        return self._group(self.ticker.skipped_count - skipped)
+
+    async def wait_async(self) -> range:
+        skipped = self.ticker.skipped_count
+        await self.ticker.wait_async()
+        return self._group(self.ticker.skipped_count - skipped)
+
+    def get_statistics(self) -> Dict:
+        return self.ticker.get_statistics()
@@ -0,0 +1,179 @@
+"""
+МЭДРЭГЧИЙН ID-ИЙН БҮРТГЭЛ (дискэн кэштэй)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+/m/sensor-objects-in-measurement-object/<id>-ийн хариуг
+sensorObjectLocationId-аар индексжүүлж, JSON файлд TTL-тэй хадгална:
+
+    • Дахин эхлэхэд кэшээс шууд ачаална (сүлжээ хүлээхгүй)
+    • Олон measurement object-ийг ThreadPool-оор зэрэг татна
+    • Ард талын thread хуучирсан бичлэгийг үе үе шинэчилнэ
+    • Татаж чадаагүй бол өмнөх утга хэвээр үлдэнэ
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable
+
+import requests
+
+logger = logging.getLogger('HeatingSimulator')
+
+# ============================================
+# БҮРТГЭЛ
+# ============================================
+
+class SensorRegistry:
+    def __init__(self, url_template: str, sensors: Dict[str, Dict], cache_path: str,
+                 ttl: float = 3600, workers: int = 16, timeout: float = 5):
+        """
+        url_template: '.../sensor-objects-in-measurement-object/{id}'
+        sensors:      Config.SENSORS (түлхүүр → {'sensorObjectLocationId': ...})
+        cache_path:   Кэш файлын зам
+        ttl:          Бичлэг хуучрах хугацаа (секунд)
+        """
+        self.url_template = url_template
+        self.locations = {key: config['sensorObjectLocationId'] for key, config in sensors.items()}
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.workers = workers
+        self.timeout = timeout
+
+        self.lock = threading.Lock()
+        self.by_location: Dict[int, Dict[int, int]] = {}   # measurement → {location → sensor id}
+        self.fetched_at: Dict[int, float] = {}
+        self.mappings: Dict[int, Dict[str, int]] = {}      # measurement → {түлхүүр → sensor id}
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'User-Agent': 'Mozilla/5.0'
+        })
+        self._stop_event = threading.Event()
+
+    # ---------- кэш ----------
+
+    def load(self) -> int:
+        """Кэш файлаас ачаалах. Ачаалсан measurement object-ийн тоог буцаана."""
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        for measurement_id, entry in data.items():
+            self._store(int(measurement_id),
+                        {int(loc): sensor_id for loc, sensor_id in entry['sensors'].items()},
+                        entry['fetched_at'])
+        logger.info(f"🗂️  Мэдрэгчийн кэш ачааллаа: {len(data)} объект ({self.cache_path})")
+        return len(data)
+
+    def save(self):
+        """
+        Кэш файлд нэгтгэж бичих
+
+        Өөр процессын (shard) бичлэгүүдийг хадгалж, зөвхөн өөрийн
+        объектуудыг шинэчилнэ.
+        """
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        with self.lock:
+            data.update({
+                str(mid): {'fetched_at': self.fetched_at[mid],
+                           'sensors': {str(loc): sid for loc, sid in index.items()}}
+                for mid, index in self.by_location.items()
+            })
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, self.cache_path)
+
+    # ---------- татах ----------
+
+    def _store(self, measurement_id: int, index: Dict[int, int], fetched_at: float):
+        with self.lock:
+            self.by_location[measurement_id] = index
+            self.fetched_at[measurement_id] = fetched_at
+            mapping = self.mappings.setdefault(measurement_id, {key: 0 for key in self.locations})
+            # Байрандаа шинэчилнэ — DataSender-ийн барьж буй dict ч шинэчлэгдэнэ
+            mapping.update({key: index.get(loc, 0) for key, loc in self.locations.items()})
+
+    def fetch(self, measurement_id: int) -> bool:
+        url = self.url_template.format(id=measurement_id)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            if response.status_code not in (200, 201):
+                logger.error(f"❌ HTTP {response.status_code} while fetching sensor IDs ({url})")
+                return False
+            index = {sensor['sensorObjectLocationId']: sensor['id'] for sensor in response.json()}
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            logger.error(f"❌ Error fetching sensor IDs ({url}): {str(e)}")
+            return False
+
+        self._store(measurement_id, index, time.time())
+        return True
+
+    def is_stale(self, measurement_id: int) -> bool:
+        fetched_at = self.fetched_at.get(measurement_id)
+        return fetched_at is None or time.time() - fetched_at > self.ttl
+
+    def resolve(self, measurement_ids: Iterable[int], force: bool = False) -> int:
+        """
+        Байхгүй эсвэл хуучирсан объектуудыг зэрэг татах
+
+        Амжилттай татсан тоог буцаана. Кэшийг шинэчилж хадгална.
+        """
+        pending = [mid for mid in measurement_ids if force or self.is_stale(mid)]
+        if not pending:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+            fetched = sum(pool.map(self.fetch, pending))
+
+        if fetched:
+            try:
+                self.save()
+            except OSError as e:
+                logger.error(f"❌ Мэдрэгчийн кэш хадгалж чадсангүй: {str(e)}")
+        logger.info(f"✅ Мэдрэгчийн ID: {fetched}/{len(pending)} объект шинэчлэгдлээ")
+        return fetched
+
+    def sensor_ids(self, measurement_id: int) -> Dict[str, int]:
+        """
+        Түлхүүр → sensorObjectId (мэдэгдэхгүй бол 0)
+
+        Буцаасан dict нь дараагийн шинэчлэлтээр байрандаа өөрчлөгдөнө.
+        """
+        with self.lock:
+            return self.mappings.setdefault(measurement_id, {key: 0 for key in self.locations})
+
+    # ---------- ард талын шинэчлэлт ----------
+
+    def start_refresh(self, measurement_ids: Iterable[int], interval: float = 600):
+        """
+        Эхний resolve-ийг шууд, дараа нь interval тутам ард талын thread-д
+
+        Дуудагч сүлжээг хүлээхгүй — кэшид байхгүй ID нь татагдтал 0 байна.
+        """
+        measurement_ids = list(measurement_ids)
+
+        def loop():
+            while True:
+                self.resolve(measurement_ids)
+                if self._stop_event.wait(interval):
+                    break
+
+        threading.Thread(target=loop, daemon=True, name='SensorRegistry').start()
+
+    def stop(self):
+        self._stop_event.set()
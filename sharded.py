@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+ОЛОН ЦӨМТ ХУВААГДСАН (SHARDED) ФЛОТ
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Нэг Python процесс GIL-ээр хязгаарлагдана. Энд төхөөрөмжүүдийг процесс
+бүрт хувааж (shard), тус бүр өөрийн физик төлөв, гаралт (sinks), spool-той
+ажиллана:
+
+    эцэг процесс ─┬→ shard 0: SUBSTATION_0001..0250 → FanOut → sinks
+                  ├→ shard 1: SUBSTATION_0251..0500 → FanOut → sinks
+                  └→ ...
+                        ↓ мөр бүрт зөвхөн өөрөө бичнэ
+                  [shared memory хүснэгт: ticks, sent, failed, lag, ...]
+                        ↓
+                  эцэг нь нэгтгэж лог / metrics-д гаргана
+
+Shard бүр HeatingSubstationSimulator-оос удамшина. SIGTERM/SIGINT дээр
+simulator.signal_handler-ээр цэвэр зогсоно (гаралт, spool хадгалагдана).
+Shard-ууд tick-ийн фазыг интервал дотор тэнцүү тараана.
+
+    python sharded.py --devices 10000 --shards 4 --sinks http --first-measurement-id 1001
+
+Бүх shard зогсох, эсвэл аль нэг нь эхний tick-ээсээ өмнө алдаатай гарвал
+эцэг процесс 0 биш кодоор гарна.
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import signal
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import simulator
+from fleet import HeatingFleet
+from metrics import REGISTRY, STAGE_SECONDS, TICK_LAG_SECONDS
+from scheduler import TickScheduler
+from simulator import Config, HeatingSubstationSimulator, logger, setup_logger
+from sinks import FanOut, build_sinks
+
+FIELDS = ('pid', 'heartbeat', 'ticks', 'readings', 'sent', 'failed', 'dropped',
+          'lag_ms', 'overruns')
+FIELD = {name: i for i, name in enumerate(FIELDS)}
+
+SHARD_COUNTERS = REGISTRY.gauge('heating_shard_counter', 'Shard бүрийн тоолуур')
+
+# ============================================
+# ХУВААЛЦСАН ХҮСНЭГТ
+# ============================================
+
+class ShardTable:
+    """(shard × FIELDS) float64 хүснэгт — shard бүр зөвхөн өөрийн мөрөнд бичнэ"""
+
+    def __init__(self, shards: int, name: Optional[str] = None):
+        size = shards * len(FIELDS) * 8
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.array = np.ndarray((shards, len(FIELDS)), dtype=np.float64, buffer=self.shm.buf)
+        if self.owner:
+            self.array[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def set(self, shard: int, **values):
+        row = self.array[shard]
+        for key, value in values.items():
+            row[FIELD[key]] = value
+
+    def get(self, shard: int) -> Dict[str, float]:
+        return dict(zip(FIELDS, self.array[shard].tolist()))
+
+    def totals(self) -> Dict[str, float]:
+        array = self.array.copy()
+        totals = dict(zip(FIELDS, array.sum(axis=0).tolist()))
+        totals['lag_ms'] = float(array[:, FIELD['lag_ms']].max())
+        return totals
+
+    def close(self):
+        del self.array
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+# ============================================
+# SHARD
+# ============================================
+
+class ShardSimulator(HeatingSubstationSimulator):
+    """Төхөөрөмжийн нэг хэсгийг өөрийн процесст ажиллуулах симулятор"""
+
+    def __init__(self, shard: int, offset: int, size: int, shards: int,
+                 table: ShardTable, clock=None):
+        self.shard = shard
+        self.offset = offset
+        self.table = table
+        self.device_ids = [f"SUBSTATION_{i + 1:04d}" for i in range(offset, offset + size)]
+        super().__init__(clock)
+
+        if Config.PHYSICS_MODEL == 'dynamic':
+            from dynamics import DynamicFleet
+            self.fleet = DynamicFleet(size, self.device_ids)
+        else:
+            self.fleet = HeatingFleet(size, self.device_ids)
+        self.fanout = FanOut(build_sinks(Config.SINKS, sender=self.data_sender,
+                                         deadband=self.deadband, breaker=self.breaker,
+                                         device_ids=self.device_ids, offset=offset))
+        self.scheduler = TickScheduler(
+            Config.SEND_INTERVAL,
+            phase=shard * Config.SEND_INTERVAL / shards,
+            policy=Config.TICK_POLICY,
+            clock=self.clock,
+        )
+
+    def _print_banner(self):
+        logger.info(f"🧩 Shard {self.shard}: pid {os.getpid()}, "
+                    f"SUBSTATION_{self.offset + 1:04d}-ээс эхлэн")
+
+    def _setup_analytics(self):
+        return simulator.setup_analytics(self.device_ids)
+
+    def _checkpoint_components(self) -> Dict:
+        components = super()._checkpoint_components()
+        components['fleet'] = self.fleet
+        return components
+
+    def run(self):
+        self.running = True
+        self.table.set(self.shard, pid=os.getpid())
+        self.fanout.start()
+        self._start_spool_drainer()
+        self._restore_checkpoint()
+
+        try:
+            while self.running:
+                lag = self.scheduler.wait()
+                TICK_LAG_SECONDS.set(lag)
+                self.iteration += 1
+
+                with STAGE_SECONDS.labels(stage='physics').time():
+                    readings = self.fleet.step()
+                if self.analytics is not None:
+                    self.analytics.update(readings)
+                self.fanout.publish(self.clock.now(), self.fleet.device_ids, readings)
+                self._publish_counters(lag)
+                if self.checkpointer is not None:
+                    self.checkpointer.maybe_save()
+
+        except Exception as e:
+            logger.error(f"❌ [shard {self.shard}] Алдаа: {str(e)}")
+            self.stop()
+
+    def _publish_counters(self, lag: Optional[float] = None):
+        """
+        Хүснэгтийн мөрийг шинэчлэх
+
+        sent/failed — http гаралтад илгээгчийн тоолуур, бусад гаралтад
+        бичсэн tick × төхөөрөмж (гаралтуудын нийлбэр).
+        """
+        size = self.fleet.size
+        sent = failed = dropped = 0
+        for kind, stats in self.fanout.get_statistics().items():
+            if kind == 'analytics':
+                continue  # гаралт биш — уншилт хаашаа ч бичигдэхгүй
+            if 'sender' in stats:
+                sent += stats['sender']['success']
+                failed += stats['sender']['failed']
+                dropped += stats['sender']['dropped']
+            else:
+                sent += stats['written'] * size
+                failed += stats['errors'] * size
+            dropped += stats['dropped'] * size
+
+        values = dict(heartbeat=time.time(), ticks=self.iteration,
+                      readings=self.iteration * size, sent=sent, failed=failed,
+                      dropped=dropped, overruns=self.scheduler.overrun_count)
+        if lag is not None:
+            values['lag_ms'] = lag * 1000
+        self.table.set(self.shard, **values)
+
+    def stop(self):
+        # Гаралтуудыг эхэлж хаана (HttpSink.close нь илгээгчийг flush хийнэ)
+        self.fanout.stop()
+        super().stop()
+        self._publish_counters()
+
+def _shutdown(signum, frame):
+    # Давхар дохио (терминалын SIGINT + эцгийн SIGTERM) зогсолтыг дахин эхлүүлэхгүй
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    simulator.signal_handler(signum, frame)
+
+def _worker(shard: int, offset: int, size: int, shards: int, table_name: str,
+            overrides: Dict):
+    for key, value in overrides.items():
+        setattr(Config, key, value)
+    Config.METRICS_PORT = 0  # эцэг нь нэгтгэж гаргана
+    Config.SPOOL_DIR = os.path.join(Config.SPOOL_DIR, f'shard-{shard:02d}')
+    Config.CHECKPOINT_PATH = f"{Config.CHECKPOINT_PATH}.shard-{shard:02d}"
+    setup_logger()
+
+    table = ShardTable(shards, name=table_name)
+    shard_simulator = ShardSimulator(shard, offset, size, shards, table)
+    simulator.simulator = shard_simulator
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+    try:
+        shard_simulator.run()
+    finally:
+        table.close()
+
+# ============================================
+# ЭЦЭГ ПРОЦЕСС
+# ============================================
+
+class ShardedRunner:
+    def __init__(self, devices: int, shards: int, overrides: Optional[Dict] = None):
+        if devices < shards:
+            raise ValueError("devices must be >= shards")
+        self.devices = devices
+        self.shards = shards
+        self.overrides = overrides or {}
+        self.table: Optional[ShardTable] = None
+        self.processes: List[mp.Process] = []
+        self._stop_event = threading.Event()
+
+    def start(self):
+        self.table = ShardTable(self.shards)
+        context = mp.get_context('spawn')  # логийн listener thread fork-д дамжихгүй
+        base, extra = divmod(self.devices, self.shards)
+        offset = 0
+        for shard in range(self.shards):
+            size = base + (1 if shard < extra else 0)
+            process = context.Process(
+                target=_worker, name=f'shard-{shard}',
+                args=(shard, offset, size, self.shards, self.table.name, self.overrides),
+            )
+            process.start()
+            self.processes.append(process)
+            offset += size
+        logger.info(f"🧩 {self.devices} төхөөрөмж → {self.shards} shard")
+
+    def aggregate(self) -> Dict:
+        totals = self.table.totals()
+        totals['alive'] = sum(process.is_alive() for process in self.processes)
+        totals['stale'] = sum(
+            1 for shard in range(self.shards)
+            if time.time() - self.table.get(shard)['heartbeat'] > 3 * Config.SEND_INTERVAL + 5
+        )
+        return totals
+
+    def expose_metrics(self):
+        for shard in range(self.shards):
+            for field in FIELDS[2:]:
+                SHARD_COUNTERS.labels(shard=shard, field=field).set_function(
+                    lambda shard=shard, field=field: self.table.array[shard, FIELD[field]])
+
+    def request_stop(self, *args):
+        self._stop_event.set()
+
+    def check_processes(self) -> Optional[str]:
+        """Shard-ууд үхсэн бол шалтгааныг буцаах (үргэлжлүүлэх боломжгүй)"""
+        exited = [(shard, process) for shard, process in enumerate(self.processes)
+                  if process.exitcode is not None]
+        for shard, process in exited:
+            # Heartbeat бичээгүй = эхлэхдээ унасан (тохиргоо буруу г.м.)
+            if process.exitcode != 0 and not self.table.get(shard)['heartbeat']:
+                return f"{process.name} эхлэхдээ унав (exit {process.exitcode})"
+        if len(exited) == len(self.processes):
+            codes = ', '.join(str(process.exitcode) for _, process in exited)
+            return f"бүх shard зогслоо (exit {codes})"
+        return None
+
+    def run(self, report_interval: float = 10.0) -> int:
+        """Тайлан гаргаж ажиллуулах; shard-ууд үхвэл 1 буцаана"""
+        self.start()
+        if Config.METRICS_PORT:
+            self.expose_metrics()
+            simulator.serve_metrics()
+        previous, previous_time = self.aggregate(), time.monotonic()
+        next_report = previous_time + report_interval
+        status = 0
+        try:
+            while not self._stop_event.wait(min(1.0, report_interval)):
+                failure = self.check_processes()
+                if failure is not None:
+                    logger.error(f"❌ {failure} — зогсож байна")
+                    status = 1
+                    break
+                if time.monotonic() < next_report:
+                    continue
+                next_report += report_interval
+                totals, now = self.aggregate(), time.monotonic()
+                rate = (totals['sent'] - previous['sent']) / (now - previous_time)
+                logger.info(f"📈 {totals['alive']}/{self.shards} shard, "
+                            f"✅ {totals['sent']:.0f} ({rate:.0f}/s) ❌ {totals['failed']:.0f} "
+                            f"🗑️ {totals['dropped']:.0f}, lag {totals['lag_ms']:.0f} ms, "
+                            f"{totals['overruns']:.0f} хэтрэлт")
+                if totals['stale']:
+                    logger.warning(f"⚠️  {totals['stale']} shard heartbeat шинэчлэгдэхгүй байна")
+                previous, previous_time = totals, now
+        except KeyboardInterrupt:
+            logger.info("\n⚠️  Ctrl+C - Зогсож байна")
+        finally:
+            self.stop()
+        return status
+
+    def stop(self, timeout: float = 15.0):
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()  # SIGTERM → shard-ийн signal_handler
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"⚠️  {process.name} хугацаандаа зогссонгүй — kill")
+                process.kill()
+                process.join()
+
+        totals = self.table.totals()
+        logger.info(f"🛑 Нийт: {totals['readings']:.0f} уншилт, ✅ {totals['sent']:.0f} "
+                    f"❌ {totals['failed']:.0f} 🗑️ {totals['dropped']:.0f}")
+        self.table.close()
+
+# ============================================
+# MAIN
+# ============================================
+
+def main():
+    setup_logger()
+    parser = argparse.ArgumentParser(description='Олон процесст хуваагдсан флот')
+    parser.add_argument('--devices', type=int, default=Config.FLEET_SIZE)
+    parser.add_argument('--shards', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--sinks', default=','.join(Config.SINKS))
+    parser.add_argument('--url', default=Config.SERVER_URL)
+    parser.add_argument('--interval', type=float, default=Config.SEND_INTERVAL)
+    parser.add_argument('--report-interval', type=float, default=10.0)
+    parser.add_argument('--first-measurement-id', type=int,
+                        default=Config.FLEET_FIRST_MEASUREMENT_ID,
+                        help='SUBSTATION_0001-ийн measurementObjectId (http sink-д шаардлагатай)')
+    args = parser.parse_args()
+
+    # spawn-ээр эхэлсэн shard-ууд Config-ийн өөрчлөлтийг өвлөхгүй
+    overrides = {
+        'SINKS': args.sinks.split(','),
+        'SERVER_URL': args.url,
+        'SEND_INTERVAL': args.interval,
+        'FLEET_FIRST_MEASUREMENT_ID': args.first_measurement_id,
+    }
+    Config.SEND_INTERVAL = args.interval
+
+    runner = ShardedRunner(args.devices, args.shards, overrides)
+    signal.signal(signal.SIGTERM, runner.request_stop)
+    sys.exit(runner.run(args.report_interval))
+
+if __name__ == "__main__":
+    main()
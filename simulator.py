@@ -23,14 +23,31 @@
 
 import time
 import json
+import gzip
 import logging
 import random
-import math
 import requests
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Tuple
+from typing import Dict, Iterator, List, Tuple, Union
+import os
 import signal
 import sys
+import atexit
+import queue
+import logging.handlers
+
+from analytics import AnalyticsPublisher, RollingAnalytics
+from checkpoint import Checkpointer
+from deadband import DeadbandFilter
+from frame import FrameSchema, ReadingFrame
+from metrics import (BYTES_SENT, QUEUE_DEPTH, SEND_RESULTS, STAGE_SECONDS,
+                     TICK_LAG_SECONDS, TICK_OVERRUNS, start_metrics_server)
+from pipeline import CircuitBreaker, DeliveryPipeline
+from scheduler import TickScheduler, device_phase
+from sensor_registry import SensorRegistry
+from spool import Spool, SpoolDrainer
+from weather import HistoricalWeather, WeatherProvider
+from wire import CONTENT_TYPES, JSON, WireEncoder
 
 # ============================================
 # ТОХИРГОО
@@ -43,8 +60,88 @@ class Config:
     
     # Сервер
     SERVER_URL = "http://mysql-server-tailscale.tailb51a53.ts.net:5000/v/value"
-    GET_SENSOR_ID_URL = "http://mysql-server-tailscale.tailb51a53.ts.net:5000/m/sensor-objects-in-measurement-object/2"
+    SENSOR_OBJECTS_URL = "http://mysql-server-tailscale.tailb51a53.ts.net:5000/m/sensor-objects-in-measurement-object/{id}"
+    MEASUREMENT_OBJECT_ID = 2
     SEND_INTERVAL = 3  # секунд
+    TICK_POLICY = 'skip'  # Хоцорсон tick: 'skip' эсвэл 'catch_up'
+    METRICS_PORT = 9108   # Prometheus /metrics порт (0 бол унтраана)
+    
+    # Олон төхөөрөмжийн HTTP илгээлт (async_sender.py)
+    FLEET_SIZE = 500                # Виртуал дэд станцын тоо
+    HTTP_MAX_CONNECTIONS = 100      # Холболтын pool-ийн дээд хэмжээ
+    HTTP_CONCURRENCY = 200          # Нэгэн зэрэг илгээх хүсэлтийн тоо
+    HTTP_TIMEOUT = 5.0              # Нэг хүсэлтийн хугацаа (секунд)
+    HTTP_MAX_PENDING = 100          # Хариу хүлээж буй бүлгийн (send_many) дээд тоо — async флот
+    FLEET_FIRST_MEASUREMENT_ID = 0  # i-р төхөөрөмж → энэ + i (HTTP-ээр олон төхөөрөмж илгээхэд заавал)
+    
+    # Багцлан илгээх (BatchingSender)
+    BATCH_ENABLED = False
+    BATCH_URL = "http://mysql-server-tailscale.tailb51a53.ts.net:5000/v/value/batch"
+    BATCH_MAX_ITEMS = 100           # Багцын дээд мөр
+    BATCH_MAX_AGE = 30.0            # Багцын дээд нас (секунд)
+    BATCH_GZIP = True               # gzip шахалт
+    
+    # Өөрчлөлтөөр тайлагнах (deadband.py): босго нь SENSORS[...]['deadband']
+    DEADBAND_ENABLED = False
+    DEADBAND_MAX_SILENCE = 300.0    # Өөрчлөгдөөгүй ч энэ хугацаанд нэг удаа (секунд)
+    
+    # Илгээх кодчилол (wire.py): 'json' | 'msgpack' | 'struct'
+    WIRE_ENCODING = 'json'
+    
+    # ThingsBoard gateway (tb_gateway.py)
+    TB_HOST = "localhost"
+    TB_PORT = 1883
+    TB_GATEWAY_TOKEN = ""           # Gateway төхөөрөмжийн access token
+    TB_BATCH_SIZE = 200             # Нэг MQTT мессеж дэх төхөөрөмжийн тоо
+    TB_QOS = 1
+    
+    # Олон гаралт (sinks.py): 'http', 'thingsboard', 'timescale', 'file', 'record', 'analytics', 'stdout'
+    SINKS = ['http']
+    SINK_FILE_PATH = "/tmp/heating_simulator_readings.jsonl"
+    RECORD_PATH = "/tmp/heating_simulator_readings.rec"   # recording.py-ийн хавтас
+    
+    # TimescaleDB руу шууд COPY (timescale_sink.py) — нууц үгийг PGPASSWORD-оор
+    TIMESCALE_DSN = os.environ.get(
+        'TIMESCALE_DSN',
+        "host=mysql-server-tailscale.tailb51a53.ts.net port=5432 dbname=nodejs_prisma user=erdene")
+    TIMESCALE_TABLE = "heating_readings"
+    TIMESCALE_BATCH_ROWS = 50000          # Нэг COPY-ийн мөр
+    TIMESCALE_FLUSH_INTERVAL = 5.0        # Буферийн дээд нас (секунд)
+    TIMESCALE_POOL_SIZE = 4               # Зэрэг COPY хийх холболт
+    
+    # Үүсгэгч / илгээгчийн хоорондох дараалал (pipeline.py)
+    DELIVERY_QUEUE_SIZE = 1000
+    DELIVERY_POLICY = 'drop_oldest'       # 'drop_oldest' | 'spill' | 'block'
+    BREAKER_FAILURE_THRESHOLD = 5         # Circuit нээх дараалсан алдаа
+    BREAKER_RESET_TIMEOUT = 5.0           # Эхний туршилт хүртэл (секунд)
+    BREAKER_MAX_TIMEOUT = 300.0           # Туршилт хоорондын дээд хугацаа (секунд)
+    
+    # Гулсах цонхны аналитик (analytics.py): ΔT mean/min/max, дулааны чадал,
+    # drift, хэвийн бус тоолуур → Prometheus gauge
+    ANALYTICS_ENABLED = True
+    ANALYTICS_WINDOW = 900.0              # Цонх (секунд) — санах ой ≈ цонх/SEND_INTERVAL × төхөөрөмж × 17 байт
+    ANALYTICS_BAND = (25.0, 35.0)         # Оновчтой ΔT (°C)
+    ANALYTICS_DRIFT_THRESHOLD = 3.0       # Drift гэж тооцох ΔT-ийн налуу (°C/цаг)
+    ANALYTICS_DESIGN_FLOW = 2.0           # Хэрэглэгчийн урсгал design Δp үед (kg/s)
+    ANALYTICS_DESIGN_DP = 0.1             # Хэрэглэгч рүү / хэрэглэгчээс даралтын зөрүү (bar)
+    ANALYTICS_DEVICE_SERIES = 100         # Төхөөрөмж бүрийн metrics цуваа гаргах дээд тоо
+    
+    # Restart-ийн дараа төлөвөө үргэлжлүүлэх (checkpoint.py)
+    CHECKPOINT_ENABLED = True
+    CHECKPOINT_PATH = "/var/lib/heating_simulator/state.ckpt"
+    CHECKPOINT_INTERVAL = 60.0            # Хадгалах давтамж (секунд)
+    
+    # Хадгалж-дамжуулах дараалал (spool.py)
+    SPOOL_ENABLED = True
+    SPOOL_DIR = "/var/lib/heating_simulator/spool"
+    SPOOL_MAX_BYTES = 256 * 1024 * 1024   # Дискний дээд хэмжээ
+    SPOOL_BATCH_SIZE = 500                # Буцааж илгээх багцын хэмжээ
+    SPOOL_REPLAY_RATE = 200.0             # Буцааж илгээх хурд (баримт/сек)
+    
+    # Мэдрэгчийн ID-ийн кэш (sensor_registry.py)
+    SENSOR_CACHE_FILE = "/var/lib/heating_simulator/sensor_ids.json"
+    SENSOR_CACHE_TTL = 3600               # Кэш хуучрах хугацаа (секунд)
+    SENSOR_REFRESH_INTERVAL = 600         # Ард талын шинэчлэлт (секунд)
     
     # Физик параметрүүд
     PHYSICS = {
@@ -66,6 +163,71 @@ class Config:
         'pressure_noise': 0.1,          # Даралтын шуугиан
     }
     
+    # Физикийн горим: 'tick' (илгээлт бүрт нэг шинэчлэл) |
+    # 'dynamic' (тогтмол дотоод алхамтай, инерцтэй — dynamics.py)
+    PHYSICS_MODEL = 'tick'
+    PHYSICS_DT = 1.0                    # Дотоод интеграцийн алхам (секунд)
+    DYNAMICS = {
+        # Эхний эрэмбийн хоцрогдлын хугацааны тогтмол (секунд)
+        'station_tau': 60.0,            # Станцын температурын зохицуулалт
+        'supply_pipe_tau': 30.0,        # Станц → бойлер шугам
+        'boiler_tau': 20.0,             # Бойлер
+        'return_pipe_tau': 30.0,        # Хэрэглэгч → станц шугам
+        'load_tau': 300.0,              # Хэрэглэгчийн ачаалал
+        'outdoor_tau': 1800.0,          # Гадны температурын хэлбэлзэл
+        'pressure_tau': 10.0,           # Даралтын хэлбэлзэл
+        
+        # Тогтвортой төлөвийн хэлбэлзэл (стандарт хазайлт)
+        'outdoor_noise': 2.0,
+        'load_noise': 2.0,
+        'consumer_delta_t': 12.0,       # Хэрэглэгчийн дундаж ΔT
+        
+        # Хэмжилтийн шуугиан (мэдрэгч)
+        'temp_sensor_noise': 0.2,
+        'pressure_sensor_noise': 0.01,
+    }
+    
+    # Гадны температур (weather.py): tick бүрт дүүрэг бүрт нэг утга,
+    # төхөөрөмжид байршлаар нь interpolation
+    WEATHER_FILE = None                 # Түүхэн CSV (None бол өдрийн синус + шуугиан)
+    WEATHER_NOISE = 2.0                 # Дүүргийн шуугиан (°C, зөвхөн синус загварт)
+    WEATHER_RESOLUTION = 60.0           # Шуугианы цэгүүдийн хоорондох хугацаа (секунд)
+    WEATHER_SEED = 0                    # Бүх процесс (shard) ижил цаг агаар харна
+    DEVICE_DISTRICT = 'sukhbaatar'      # DEVICE_ID-ийн дүүрэг (LOCATION)
+    WEATHER_DISTRICTS = {
+        # offset: хотын төвөөс зөрөх (°C) — хотын дулаан арал, голын хөндий
+        'sukhbaatar':      {'lat': 47.921, 'lon': 106.918, 'offset': 1.0},
+        'chingeltei':      {'lat': 47.935, 'lon': 106.903, 'offset': 0.5},
+        'bayanzurkh':      {'lat': 47.915, 'lon': 106.975, 'offset': 0.5},
+        'bayangol':        {'lat': 47.905, 'lon': 106.860, 'offset': 0.5},
+        'khan_uul':        {'lat': 47.880, 'lon': 106.900, 'offset': -1.0},
+        'songinokhairkhan': {'lat': 47.925, 'lon': 106.780, 'offset': -0.5},
+        'nalaikh':         {'lat': 47.770, 'lon': 107.255, 'offset': -2.0},
+        'baganuur':        {'lat': 47.780, 'lon': 108.360, 'offset': -3.0},
+        'bagakhangai':     {'lat': 47.340, 'lon': 107.480, 'offset': -2.5},
+    }
+    
+    # Флотын загвар: 'fleet' (тусдаа шугамууд) | 'network' (хотын сүлжээ, network.py)
+    FLEET_MODEL = 'fleet'
+    NETWORK_FILE = None             # Сүлжээний JSON (None бол FLEET_SIZE-ээр үүсгэнэ)
+    NETWORK = {
+        'plant_supply_pressure': 6.5,   # Станцын шууд шугамын даралт (bar)
+        'plant_return_pressure': 3.0,   # Станцын буцах шугамын даралт (bar)
+        'substation_dp_min': 0.3,       # Дэд станцад хэрэгтэй даралтын зөрүү (bar)
+        'design_load_kw': 400.0,        # Дэд станцын тооцооны ачаалал
+        'design_outdoor_temp': -39.0,   # Улаанбаатарын тооцооны гадны температур
+        'indoor_temp': 20.0,            # Өрөөний температур
+        'return_target_temp': 55.0,     # Анхдагч буцах температурын зорилт
+        'min_return_temp': 40.0,        # Дулаан солилцуураас гарах хамгийн бага температур
+        'consumer_delta_t': 18.0,       # Хэрэглэгчийн талын ΔT (тооцооны ачаалалд)
+        'ground_temp': 5.0,             # Шугамын орчны температур
+        'pipe_friction': 0.02,          # Darcy үрэлтийн коэффициент
+        'pipe_loss_w_per_mk': 0.4,      # Шугамын дулаан алдагдал (W/m·K)
+        'design_velocity': 2.0,         # Диаметр сонгох урсгалын хурд (m/s)
+        'hydraulic_iterations': 2,      # Tick бүрийн гидравлик давталт
+        'warmup_ticks': 20,             # Эхлэхэд тэнцвэрт төлөв рүү
+    }
+    
     # Мэдрэгчийн тодорхойлолт
     SENSORS = {
         # Шугам 1: Станцаас ирэх (Supply from station)
@@ -75,7 +237,9 @@ class Config:
             'name': 'Станцаас ирэх температур',
             'typeId': 1,
             'unit': '°C',
-            'pipe': 'supply_station'
+            'deadband': 1.0,
+            'pipe': 'supply_station',
+            'tbKey': 'temp_in_fac'
         },
         'supply_from_station_pressure': {
             'id':0,
@@ -83,7 +247,9 @@ class Config:
             'name': 'Станцаас ирэх даралт',
             'typeId': 2,
             'unit': 'bar',
-            'pipe': 'supply_station'
+            'deadband': 0.1,
+            'pipe': 'supply_station',
+            'tbKey': 'press_in_fac'
         },
         
         # Шугам 2: Хэрэглэгч рүү (Forward to consumer)
@@ -93,7 +259,9 @@ class Config:
             'name': 'Хэрэглэгч рүү гарах температур',
             'typeId': 1,
             'unit': '°C',
-            'pipe': 'forward_consumer'
+            'deadband': 1.0,
+            'pipe': 'forward_consumer',
+            'tbKey': 'temp_in_cus'
         },
         'forward_to_consumer_pressure': {
             'id':0,
@@ -101,7 +269,9 @@ class Config:
             'name': 'Хэрэглэгч рүү гарах даралт',
             'typeId': 2,
             'unit': 'bar',
-            'pipe': 'forward_consumer'
+            'deadband': 0.1,
+            'pipe': 'forward_consumer',
+            'tbKey': 'press_in_cus'
         },
         
         # Шугам 3: Хэрэглэгчээс буцах (Return from consumer)
@@ -111,7 +281,9 @@ class Config:
             'name': 'Хэрэглэгчээс буцах температур',
             'typeId': 1,
             'unit': '°C',
-            'pipe': 'return_consumer'
+            'deadband': 1.0,
+            'pipe': 'return_consumer',
+            'tbKey': 'temp_out_cus'
         },
         'return_from_consumer_pressure': {
             'id':0,
@@ -119,7 +291,9 @@ class Config:
             'name': 'Хэрэглэгчээс буцах даралт',
             'typeId': 2,
             'unit': 'bar',
-            'pipe': 'return_consumer'
+            'deadband': 0.1,
+            'pipe': 'return_consumer',
+            'tbKey': 'press_out_cus'
         },
         
         # Шугам 4: Станц руу буцах (Return to station)
@@ -129,7 +303,9 @@ class Config:
             'name': 'Станц руу буцах температур',
             'typeId': 1,
             'unit': '°C',
-            'pipe': 'return_station'
+            'deadband': 1.0,
+            'pipe': 'return_station',
+            'tbKey': 'temp_out_fac'
         },
         'return_to_station_pressure': {
             'id':0,
@@ -137,40 +313,312 @@ class Config:
             'name': 'Станц руу буцах даралт',
             'typeId': 2,
             'unit': 'bar',
-            'pipe': 'return_station'
+            'deadband': 0.1,
+            'pipe': 'return_station',
+            'tbKey': 'press_out_fac'
         }
     }
     
     LOG_FILE = "/var/log/heating_simulator/simulator.log"
     LOG_LEVEL = logging.INFO
+    LOG_QUEUE = True              # Лог бичилтийг тусдаа thread дээр хийх
+    LOG_FORMAT = 'text'           # 'text' эсвэл 'json' (бүтэцтэй)
+    LOG_MODE = 'verbose'          # 'verbose' - tick бүрийн дэлгэрэнгүй, 'summary' - үе үеийн хураангуй
+    LOG_SAMPLE_EVERY = 1          # Төхөөрөмж бүрийн N tick тутамд нэг дэлгэрэнгүй лог
+    LOG_RATE_LIMIT = 0            # Төхөөрөмж бүрийн секундэд дээд лог (0 бол хязгааргүй)
+    LOG_SUMMARY_INTERVAL = 60     # Хураангуйн давтамж (секунд)
+
+# Уншилтын frame-ийн сувгийн дараалал (frame.py) — индекс нэг удаа
+FRAME_SCHEMA = FrameSchema(Config.SENSORS)
 
 # ============================================
 # LOGGER
 # ============================================
 
+class JsonFormatter(logging.Formatter):
+    """Нэг мөрөнд нэг JSON бичлэг (extra={'fields': {...}} талбаруудтай)"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            data.update(fields)
+        return json.dumps(data, ensure_ascii=False)
+
+log_listener = None
+
 def setup_logger():
+    """
+    Лог бичигчийг тохируулах — entry point бүрийн main() дуудна
+    
+    Import хийхэд файл нээгдэхгүй, listener thread эхлэхгүй; дахин
+    дуудахад юу ч хийхгүй.
+    """
+    global log_listener
     logger = logging.getLogger('HeatingSimulator')
+    if logger.handlers:
+        return logger
     logger.setLevel(Config.LOG_LEVEL)
     
     try:
         file_handler = logging.FileHandler(Config.LOG_FILE)
-    except PermissionError:
+    except OSError:
         file_handler = logging.FileHandler('/tmp/heating_simulator.log')
     
     console_handler = logging.StreamHandler()
     
-    formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(message)s'
-    )
+    if Config.LOG_FORMAT == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            '%(asctime)s - %(levelname)s - %(message)s'
+        )
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
     
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    if Config.LOG_QUEUE:
+        # Давталтын thread зөвхөн дараалалд хийнэ, бичилт listener thread дээр
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        log_listener.start()
+        atexit.register(log_listener.stop)
+    else:
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
     
     return logger
 
-logger = setup_logger()
+logger = logging.getLogger('HeatingSimulator')
+
+class DeviceSampler:
+    """
+    Төхөөрөмж бүрийн дэлгэрэнгүй логийн дээжлэлт
+    
+    every: N tick тутамд нэг удаа
+    rate:  секундэд дээд тал нь хэдэн удаа (token bucket, 0 бол хязгааргүй)
+    
+    Нэг төхөөрөмжийн давталт болон флотын StdoutSink (sinks, sharded,
+    replay) ашиглана. Async илгээгч төхөөрөмж бүрээр лог бичдэггүй.
+    """
+    
+    def __init__(self, every: int = 1, rate: float = 0):
+        self.every = max(1, every)
+        self.rate = rate
+        self.counters: Dict[str, int] = {}
+        self.buckets: Dict[str, List[float]] = {}  # device_id → [tokens, last]
+        self.suppressed_count = 0
+    
+    def allow(self, device_id: str) -> bool:
+        count = self.counters.get(device_id, 0)
+        self.counters[device_id] = count + 1
+        if count % self.every != 0:
+            self.suppressed_count += 1
+            return False
+        
+        if self.rate > 0:
+            now = time.monotonic()
+            bucket = self.buckets.setdefault(device_id, [self.rate, now])
+            bucket[0] = min(self.rate, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                self.suppressed_count += 1
+                return False
+            bucket[0] -= 1
+        return True
+
+class ReadingSummary:
+    """Tick бүрийн дэлгэрэнгүй логийн оронд үе үеийн min/mean/max хураангуй"""
+    
+    def __init__(self, interval: float = Config.LOG_SUMMARY_INTERVAL):
+        self.interval = interval
+        self._reset()
+    
+    def _reset(self):
+        self.started = time.monotonic()
+        self.count = 0
+        self.minimum: Dict[str, float] = {}
+        self.maximum: Dict[str, float] = {}
+        self.total: Dict[str, float] = {}
+        self.out_of_band = 0
+    
+    def add(self, readings: Dict[str, float], efficiency: float):
+        self.count += 1
+        for key, value in readings.items():
+            if key in self.total:
+                self.total[key] += value
+                if value < self.minimum[key]:
+                    self.minimum[key] = value
+                if value > self.maximum[key]:
+                    self.maximum[key] = value
+            else:
+                self.total[key] = self.minimum[key] = self.maximum[key] = value
+        if not 25 <= efficiency <= 35:
+            self.out_of_band += 1
+    
+    def due(self) -> bool:
+        return self.count > 0 and time.monotonic() - self.started >= self.interval
+    
+    def emit(self, logger: logging.Logger):
+        if logger.isEnabledFor(logging.INFO):
+            fields = {
+                key: {
+                    'min': self.minimum[key],
+                    'mean': round(self.total[key] / self.count, 2),
+                    'max': self.maximum[key],
+                }
+                for key in self.total
+            }
+            logger.info(
+                "📋 Хураангуй: %d tick, ΔT хязгаараас гадуур %d удаа",
+                self.count, self.out_of_band,
+                extra={'fields': {'ticks': self.count, 'out_of_band': self.out_of_band,
+                                  'channels': fields}},
+            )
+        self._reset()
+
+def setup_sensor_registry() -> SensorRegistry:
+    registry = SensorRegistry(Config.SENSOR_OBJECTS_URL, Config.SENSORS,
+                              Config.SENSOR_CACHE_FILE, ttl=Config.SENSOR_CACHE_TTL)
+    try:
+        os.makedirs(os.path.dirname(Config.SENSOR_CACHE_FILE), exist_ok=True)
+    except PermissionError:
+        registry.cache_path = '/tmp/heating_simulator_sensor_ids.json'
+    return registry
+
+def fleet_measurement_ids(size: int, offset: int = 0) -> List[int]:
+    """
+    Төхөөрөмж бүрийн measurement object (offset — shard-ийн эхний индекс)
+
+    i-р төхөөрөмж → FLEET_FIRST_MEASUREMENT_ID + i. Ганц төхөөрөмж бол
+    MEASUREMENT_OBJECT_ID. Олон төхөөрөмж нэг ижил sensorObjectId-аар
+    илгээвэл сервер ялгаж чадахгүй тул FLEET_FIRST_MEASUREMENT_ID заавал.
+    """
+    if Config.FLEET_FIRST_MEASUREMENT_ID:
+        first = Config.FLEET_FIRST_MEASUREMENT_ID + offset
+        return list(range(first, first + size))
+    if size == 1 and offset == 0:
+        return [Config.MEASUREMENT_OBJECT_ID]
+    raise ValueError("FLEET_FIRST_MEASUREMENT_ID must be set to send more than one device over HTTP")
+
+def start_sensor_registry(measurement_ids: List[int]) -> SensorRegistry:
+    """Кэшээс шууд ачаалж, эхний татах болон үе үеийн шинэчлэлтийг ард талд"""
+    registry = setup_sensor_registry()
+    registry.load()
+    registry.start_refresh(measurement_ids, Config.SENSOR_REFRESH_INTERVAL)
+    return registry
+
+def serve_metrics(port: int = None) -> bool:
+    """
+    /metrics endpoint эхлүүлэх — порт завгүй бол (өөр instance) metrics-гүй үргэлжилнэ
+    """
+    port = port or Config.METRICS_PORT
+    try:
+        start_metrics_server(port)
+    except OSError as e:
+        logger.error(f"❌ Metrics endpoint эхэлсэнгүй (порт {port}): {str(e)} — metrics-гүй үргэлжилнэ")
+        return False
+    logger.info(f"📊 Metrics: http://0.0.0.0:{port}/metrics")
+    return True
+
+def setup_deadband() -> DeadbandFilter:
+    """Config.SENSORS-ийн босгоор deadband шүүлтүүр (зөвхөн JSON кодчилолд)"""
+    if Config.WIRE_ENCODING != JSON:
+        raise ValueError("deadband requires 'json' wire encoding (binary frames carry all 8 values)")
+    return DeadbandFilter(
+        Config.SENSORS,
+        [config['deadband'] for config in Config.SENSORS.values()],
+        [config.get('max_silence', Config.DEADBAND_MAX_SILENCE) for config in Config.SENSORS.values()],
+    )
+
+def setup_analytics(device_ids: List[str]) -> RollingAnalytics:
+    """Төхөөрөмжүүдийн гулсах цонхны аналитик + metrics gauge"""
+    analytics = RollingAnalytics(
+        len(device_ids),
+        max(2, round(Config.ANALYTICS_WINDOW / Config.SEND_INTERVAL)),
+        Config.SENSORS,
+        Config.SEND_INTERVAL,
+        band=Config.ANALYTICS_BAND,
+        drift_threshold=Config.ANALYTICS_DRIFT_THRESHOLD,
+        design_flow=Config.ANALYTICS_DESIGN_FLOW,
+        design_dp=Config.ANALYTICS_DESIGN_DP,
+    )
+    AnalyticsPublisher(analytics, device_ids, Config.ANALYTICS_DEVICE_SERIES)
+    return analytics
+
+def setup_checkpointer(components: Dict) -> Checkpointer:
+    try:
+        return Checkpointer(Config.CHECKPOINT_PATH, components, Config.CHECKPOINT_INTERVAL)
+    except PermissionError:
+        return Checkpointer('/tmp/heating_simulator_state.ckpt', components,
+                            Config.CHECKPOINT_INTERVAL)
+
+weather = None
+
+def setup_weather() -> WeatherProvider:
+    """Процесс бүрт нэг цаг агаарын талбар (HeatingSystem, флотууд хуваалцана)"""
+    global weather
+    if weather is None:
+        history = HistoricalWeather.load(Config.WEATHER_FILE) if Config.WEATHER_FILE else None
+        weather = WeatherProvider(
+            Config.WEATHER_DISTRICTS, history,
+            noise=0.0 if history is not None else Config.WEATHER_NOISE,
+            resolution=Config.WEATHER_RESOLUTION,
+            seed=Config.WEATHER_SEED,
+        )
+    return weather
+
+def setup_spool() -> Spool:
+    try:
+        return Spool(Config.SPOOL_DIR, max_bytes=Config.SPOOL_MAX_BYTES)
+    except PermissionError:
+        return Spool('/tmp/heating_simulator_spool', max_bytes=Config.SPOOL_MAX_BYTES)
+
+# ============================================
+# ЦАГ
+# ============================================
+
+class SystemClock:
+    """Бодит цаг (GMT+8)"""
+    
+    def __init__(self, tz: timezone = timezone(timedelta(hours=8))):
+        self.timezone = tz
+    
+    def now(self) -> datetime:
+        return datetime.now(self.timezone)
+    
+    def monotonic(self) -> float:
+        return time.monotonic()
+    
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+class SimulatedClock:
+    """
+    Симуляцийн цаг
+    
+    sleep() нь хүлээхгүй, зөвхөн цагийг урагшлуулна — түүхэн өгөгдлийг
+    бодит хугацаанаас хурдан үүсгэхэд ашиглана.
+    """
+    
+    def __init__(self, start: datetime):
+        self.start = start
+        self.current = start
+    
+    def now(self) -> datetime:
+        return self.current
+    
+    def monotonic(self) -> float:
+        return (self.current - self.start).total_seconds()
+    
+    def sleep(self, seconds: float):
+        self.current += timedelta(seconds=seconds)
 
 # ============================================
 # ФИЗИК ДУЛААНЫ СИСТЕМ
@@ -179,10 +627,16 @@ logger = setup_logger()
 class HeatingSystem:
     """Дулааны системийн физик загвар"""
     
-    def __init__(self):
-        self.outdoor_temp = -15.0  # Гадны температур (°C)
+    def __init__(self, clock=None, weather: WeatherProvider = None):
+        self.clock = clock or SystemClock()
+        self.outdoor_temp = -15.0  # Физикт сүүлд ашигласан гадны температур (°C)
         self.time_of_day = 0
         
+        # Дүүргийн цаг агаарын талбар (DEVICE_DISTRICT-ийн төвд)
+        self.weather = weather or setup_weather()
+        district = self.weather.names.index(Config.DEVICE_DISTRICT)
+        self.weather_weights = self.weather.weights(self.weather.coords[district])
+        
         # Smooth transition-ий төлөв
         self.last_station_temp = Config.PHYSICS['station_base_temp']
         self.last_pressure = Config.PHYSICS['supply_pressure']
@@ -194,16 +648,10 @@ class HeatingSystem:
         Улаанбаатарын температур:
         - Өвөл: -30°C ... -10°C
         - Өдрийн хэлбэлзэл: ±5°C
-        """
-        hour = datetime.now().hour
-        
-        # Өдрийн температурын өөрчлөлт
-        daily_variation = 5 * math.sin((hour - 6) * math.pi / 12)
         
-        # Улирлын температур (өвөл)
-        base_temp = -20.0
-        
-        return base_temp + daily_variation + random.gauss(0, 2)
+        Дүүргийн талбараас (weather.py) — ижил агшинд ижил утга.
+        """
+        return float(self.weather.temperature(self.clock.now(), self.weather_weights)[0])
     
     def calculate_station_supply_temp(self) -> float:
         """
@@ -214,6 +662,7 @@ class HeatingSystem:
         - Гадна дулаан → станц бага халуун ус илгээнэ
         """
         outdoor = self.get_outdoor_temperature()
+        self.outdoor_temp = outdoor
         
         # Гадны температураас хамааралтай compensation
         # Гадна -30°C → станц 95°C
@@ -238,9 +687,9 @@ class HeatingSystem:
         self.last_station_temp = new_temp
         return new_temp
     
-    def calculate_all_readings(self) -> Dict[str, float]:
+    def calculate_all_readings(self) -> ReadingFrame:
         """
-        Бүх 8 мэдрэгчийн утгыг физик хамаарлын дагуу тооцоолох
+        Бүх 8 мэдрэгчийн утгыг физик хамаарлын дагуу тооцоолох (ReadingFrame)
         
         Урсгал:
         Station (85°C, 6.5bar)
@@ -256,7 +705,7 @@ class HeatingSystem:
         Station return (53°C, 5.65bar)
         """
         
-        readings = {}
+        readings = FRAME_SCHEMA.empty()
         
         # 1️⃣ Шугам 1: Станцаас ирэх (Supply from station)
         T1 = self.calculate_station_supply_temp()
@@ -315,82 +764,229 @@ class HeatingSystem:
         
         # Оновчтой delta T = 25-30°C
         return delta_t
+    
+    def stream(self, start: datetime, end: datetime, step: Union[timedelta, float],
+               chunk: int = 1000) -> Iterator[List[Tuple[datetime, Dict[str, float]]]]:
+        """
+        [start, end) хугацааны уншилтыг симуляцийн цагаар үүсгэх
+        
+        Хүлээлтгүй, CPU-ийн хурдаар ажиллана. chunk ширхэг
+        (цаг, уншилт) хосыг нэг жагсаалтаар yield хийнэ:
+        
+            for rows in system.stream(start, end, timedelta(seconds=3)):
+                for ts, readings in rows:
+                    sender.send(readings, ts)
+        """
+        seconds = step.total_seconds() if isinstance(step, timedelta) else float(step)
+        if seconds <= 0:
+            raise ValueError("step must be positive")
+        
+        saved_clock = self.clock
+        self.clock = SimulatedClock(start)
+        try:
+            rows = []
+            while self.clock.now() < end:
+                rows.append((self.clock.now(), self.calculate_all_readings()))
+                if len(rows) >= chunk:
+                    yield rows
+                    rows = []
+                self.clock.sleep(seconds)
+            if rows:
+                yield rows
+        finally:
+            self.clock = saved_clock
+    
+    def get_state(self) -> Dict:
+        """Checkpoint-д (checkpoint.py): smooth transition ба random-ийн төлөв"""
+        version, internal, gauss_next = random.getstate()
+        return {
+            'last_station_temp': self.last_station_temp,
+            'last_pressure': self.last_pressure,
+            'random_version': version,
+            'random': list(internal),
+            'random_gauss': gauss_next,
+        }
+    
+    def set_state(self, state: Dict):
+        random.setstate((state['random_version'], tuple(state['random']),
+                         state['random_gauss']))
+        self.last_station_temp = state['last_station_temp']
+        self.last_pressure = state['last_pressure']
 
 # ============================================
 # ӨГӨГДӨЛ ИЛГЭЭХ
 # ============================================
-class GetSensorIDs:
-    def __init__(self,url: str):
-        #self.url = url
-        self.url = url  
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Accept': 'application/json',
-            'User-Agent': 'Mozilla/5.0'
+def build_payload(readings: Dict[str, float], timestamp: datetime,
+                  sensor_ids: Dict[str, int] = None) -> Dict:
+    """
+    /v/value руу илгээх JSON бүтэц үүсгэх
+    
+    sensor_ids: түлхүүр → sensorObjectId (SensorRegistry.sensor_ids).
+    Өгөөгүй бол Config.SENSORS[...]['id'].
+    """
+    payload = {
+        'time': timestamp.isoformat(),
+        'sensorObjects': []
+    }
+    
+    for key, value in readings.items():
+        sensor_id = sensor_ids[key] if sensor_ids else Config.SENSORS[key]['id']
+        payload['sensorObjects'].append({
+            'sensorObjectId': sensor_id,
+            'value': value,
         })
-    def fetch(self):        
-        #url = f'http://mysql-server-tailscale.tailb51a53.ts.net:5000/m/sensor-objects-in-measurement-object/1'
-        
-        try:
-            logger.info(self.url)
-            
-            response = self.session.get(self.url, timeout=5)
-            if response.status_code == 201:
-                
-                data = response.json()                
-                logger.info("🔍 Мэдрэгчийн ID-үүдийг серверээс авч байна...{data}")
-                for sensor in data:
-                    for key, config in Config.SENSORS.items():
-                        if Config.SENSORS[key]['sensorObjectLocationId'] == sensor['sensorObjectLocationId']:
-                            Config.SENSORS[key]['id'] = sensor['id']
-                            
-                logger.info("✅ Мэдрэгчийн ID-үүдийг амжилттай авлаа")
-                
-                for key, config in Config.SENSORS.items():
-                    logger.info(f"   - {key}: ID={config['id']} sensorObjectLocationId={config['sensorObjectLocationId']}")
-                return True
-            else:
-                logger.error(f"❌ HTTP {response.status_code} while fetching sensor IDs")
-                return {}
-        except Exception as e:
-            logger.error(f"❌ Error fetching sensor IDs: {str(e)}")
-            return {}
+    return payload
+
+DEFAULT_SENSOR_IDS = {key: config['id'] for key, config in Config.SENSORS.items()}
+
+def sensor_ids_resolved(sensor_ids: Dict[str, int]) -> bool:
+    """Бүх sensorObjectId мэдэгдэж байгаа эсэх (0 = бүртгэлээс хараахан татагдаагүй)"""
+    return bool(sensor_ids) and all(sensor_ids.values())
+
+def encode_json(readings: Dict[str, float], timestamp: datetime,
+                sensor_ids: Dict[str, int] = None) -> str:
+    """
+    /v/value-ийн compact JSON мөр
+    
+    ReadingFrame бол бэлэн загвараар шууд (завсрын dict-гүй), бусад
+    (deadband-ийн хэсэгчилсэн dict) үед build_payload → json.dumps.
+    """
+    if isinstance(readings, ReadingFrame):
+        ids = readings.schema.ids(sensor_ids or DEFAULT_SENSOR_IDS)
+        return readings.to_json(timestamp.isoformat(), ids)
+    return json.dumps(build_payload(readings, timestamp, sensor_ids), separators=(',', ':'))
+
 class DataSender:
-    def __init__(self, url: str):
+    def __init__(self, url: str, spool: Spool = None, sensor_ids: Dict[str, int] = None,
+                 encoding: str = Config.WIRE_ENCODING):
         self.url = url
         self.session = requests.Session()
         self.success_count = 0
         self.failed_count = 0
+        self.spooled_count = 0
+        self.dropped_count = 0       # spool байхгүй тул алдагдсан
+        self.unresolved_count = 0
         self.timezone = timezone(timedelta(hours=8))  # GMT+8
-    def send(self, readings: Dict[str, float]) -> bool:
+        self.spool = spool
+        self.sensor_ids = sensor_ids
+        self.encoder = WireEncoder(encoding, Config.SENSORS) if encoding != JSON else None
+        self.content_type = CONTENT_TYPES[encoding]
+    
+    def check_sensor_ids(self, sensor_ids: Dict[str, int] = None) -> bool:
+        """
+        sensorObjectId бүгд мэдэгдэж байгаа эсэх — үгүй бол алгасаж тоолно
+        
+        0 ID-тай баримтыг илгээх, spool-д хадгалах нь утгагүй (сервер хүлээж авахгүй).
+        """
+        if sensor_ids_resolved(self.sensor_ids if sensor_ids is None else sensor_ids):
+            return True
+        self.unresolved_count += 1
+        SEND_RESULTS.labels(result='unresolved').inc()
+        if self.unresolved_count == 1 or self.unresolved_count % 100 == 0:
+            logger.error(f"❌ sensorObjectId тодорхойгүй (0) — илгээлтийг алгаслаа "
+                         f"({self.unresolved_count} удаа)")
+        return False
+    
+    def _encode(self, readings: Dict[str, float], timestamp: datetime,
+                sensor_ids: Dict[str, int]) -> bytes:
+        """Хоёртын бичлэг (өмнө нь кодлогдсон төхөөрөмжийн толгойг дахин ашиглана)"""
+        with STAGE_SECONDS.labels(stage='serialize').time():
+            return self.encoder.encode(sensor_ids, timestamp, readings)
+    
+    def send(self, readings: Dict[str, float], timestamp: datetime = None,
+             sensor_ids: Dict[str, int] = None) -> bool:
+        """sensor_ids: энэ уншилтын төхөөрөмжийн ID (флот), None бол self.sensor_ids"""
+        if sensor_ids is None:
+            sensor_ids = self.sensor_ids
+        if not self.check_sensor_ids(sensor_ids):
+            return False
+        timestamp = timestamp or datetime.now(self.timezone)
+        if self.encoder is not None:
+            data = self._encode(readings, timestamp, sensor_ids)
+        else:
+            with STAGE_SECONDS.labels(stage='serialize').time():
+                body = encode_json(readings, timestamp, sensor_ids)
+            logger.debug("Илгээх өгөгдөл: %s", body)
+            data = body.encode('utf-8')
         try:
-            payload = {
-                'time': datetime.now(self.timezone).isoformat(),                
-                'sensorObjects': []
-            }
-            
-            for key, value in readings.items():
-                sensor_config = Config.SENSORS[key]
-                payload['sensorObjects'].append({
-                    'sensorObjectId': sensor_config['id'],                    
-                    'value': value,                    
-                })
-            logger.info(f"Илгээх өгөгдөл: {json.dumps(payload)}")
-            response = self.session.post(self.url, json=payload, timeout=5)
+            with STAGE_SECONDS.labels(stage='http').time():
+                response = self.session.post(self.url, data=data, timeout=5,
+                                             headers={'Content-Type': self.content_type})
+            BYTES_SENT.labels(transport='http').inc(len(data))
             
             if response.status_code == 200:
                 self.success_count += 1
-                logger.info(f"✅ Илгээгдлээ: {len(readings)} мэдрэгч")
+                SEND_RESULTS.labels(result='success').inc()
+                logger.info("✅ Илгээгдлээ: %d мэдрэгч", len(readings))
                 return True
             else:
                 self.failed_count += 1
+                SEND_RESULTS.labels(result='failed').inc()
                 logger.error(f"❌ HTTP {response.status_code}")
-                return False
                 
         except Exception as e:
             self.failed_count += 1
+            SEND_RESULTS.labels(result='failed').inc()
             logger.error(f"❌ Алдаа: {str(e)}")
+        
+        self._spool([build_payload(readings, timestamp, sensor_ids)])
+        return False
+    
+    def defer(self, readings: Dict[str, float], timestamp: datetime,
+              sensor_ids: Dict[str, int] = None) -> bool:
+        """Илгээхгүйгээр spool-д хадгалах (circuit нээлттэй, дараалал дүүрсэн үед)"""
+        if sensor_ids is None:
+            sensor_ids = self.sensor_ids
+        if not self.check_sensor_ids(sensor_ids):
+            return False
+        if self.spool is None:
+            self._drop(1)
             return False
+        self.spool.append(build_payload(readings, timestamp, sensor_ids))
+        self.spooled_count += 1
+        return True
+    
+    def record_results(self, success: int, failed: int):
+        """Өөр transport (AsyncDataSender)-оор илгээсэн үр дүнг энэ илгээгчид тоолох"""
+        self.success_count += success
+        self.failed_count += failed
+        SEND_RESULTS.labels(result='success').inc(success)
+        SEND_RESULTS.labels(result='failed').inc(failed)
+    
+    def _drop(self, count: int):
+        """Spool-гүй үед илгээгдээгүй уншилтыг тоолох (чимээгүй алдагдуулахгүй)"""
+        previous, self.dropped_count = self.dropped_count, self.dropped_count + count
+        SEND_RESULTS.labels(result='dropped').inc(count)
+        if previous == 0 or previous // 100 != self.dropped_count // 100:
+            logger.warning(f"⚠️  Spool байхгүй — илгээгдээгүй уншилт хаягдлаа "
+                           f"(нийт {self.dropped_count})")
+    
+    def _spool(self, payloads):
+        """Илгээгдээгүй баримтыг анхны цагтай нь диск рүү хадгалах"""
+        if self.spool is None:
+            self._drop(len(payloads))
+            return
+        for payload in payloads:
+            self.spool.append(payload)
+        self.spooled_count += len(payloads)
+        logger.info(f"💾 Spool-д хадгаллаа: {len(payloads)} баримт")
+    
+    def flush(self) -> bool:
+        return True
+    
+    def get_state(self) -> Dict:
+        return {
+            'success': self.success_count,
+            'failed': self.failed_count,
+            'spooled': self.spooled_count,
+            'dropped': self.dropped_count,
+        }
+    
+    def set_state(self, state: Dict):
+        self.success_count = state['success']
+        self.failed_count = state['failed']
+        self.spooled_count = state['spooled']
+        self.dropped_count = state.get('dropped', 0)
     
     def get_statistics(self) -> Dict:
         total = self.success_count + self.failed_count
@@ -399,27 +995,170 @@ class DataSender:
             'success': self.success_count,
             'failed': self.failed_count,
             'total': total,
-            'success_rate': round(success_rate, 2)
+            'success_rate': round(success_rate, 2),
+            'spooled': self.spooled_count,
+            'dropped': self.dropped_count,
+            'unresolved': self.unresolved_count,
         }
 
+class BatchingSender(DataSender):
+    """
+    Олон tick / олон төхөөрөмжийн өгөгдлийг нэг хүсэлтээр илгээх
+    
+    Буфер дүүрэх (max_items) эсвэл хуучрах (max_age) үед /v/value/batch
+    руу JSON массив (эсвэл залгасан хоёртын бичлэгүүд) хэлбэрээр илгээнэ.
+    compress=True бол биеийг gzip-ээр шахна.
+    Тоолуур нь мөр (reading) бүрээр тоологдоно.
+    """
+    
+    def __init__(self, url: str, max_items: int = Config.BATCH_MAX_ITEMS,
+                 max_age: float = Config.BATCH_MAX_AGE, compress: bool = Config.BATCH_GZIP,
+                 spool: Spool = None, sensor_ids: Dict[str, int] = None,
+                 encoding: str = Config.WIRE_ENCODING):
+        super().__init__(url, spool, sensor_ids, encoding)
+        self.max_items = max_items
+        self.max_age = max_age
+        self.compress = compress
+        self.buffer = []
+        self.originals = []  # Хоёртын бичлэгийн анхны (readings, timestamp, sensor_ids) — spool-д
+        self.buffer_started = None
+        self.batch_count = 0
+        self.bytes_raw = 0
+        self.bytes_sent = 0
+    
+    def send(self, readings: Dict[str, float], timestamp: datetime = None,
+             sensor_ids: Dict[str, int] = None) -> bool:
+        if sensor_ids is None:
+            sensor_ids = self.sensor_ids
+        if not self.check_sensor_ids(sensor_ids):
+            return False
+        if not self.buffer:
+            self.buffer_started = time.monotonic()
+        timestamp = timestamp or datetime.now(self.timezone)
+        if self.encoder is not None:
+            self.buffer.append(self._encode(readings, timestamp, sensor_ids))
+            self.originals.append((readings, timestamp, sensor_ids))
+        else:
+            with STAGE_SECONDS.labels(stage='serialize').time():
+                self.buffer.append(encode_json(readings, timestamp, sensor_ids))
+        
+        if self._is_due():
+            return self.flush()
+        return True
+    
+    def _is_due(self) -> bool:
+        if len(self.buffer) >= self.max_items:
+            return True
+        return bool(self.buffer) and time.monotonic() - self.buffer_started >= self.max_age
+    
+    def flush(self) -> bool:
+        if not self.buffer:
+            return True
+        
+        items, self.buffer = self.buffer, []
+        originals, self.originals = self.originals, []
+        with STAGE_SECONDS.labels(stage='serialize').time():
+            if self.encoder is not None:
+                body = b''.join(items)
+            else:
+                body = ('[' + ','.join(items) + ']').encode('utf-8')
+            headers = {'Content-Type': self.content_type}
+            self.bytes_raw += len(body)
+            if self.compress:
+                body = gzip.compress(body)
+                headers['Content-Encoding'] = 'gzip'
+        
+        try:
+            with STAGE_SECONDS.labels(stage='http').time():
+                response = self.session.post(self.url, data=body, headers=headers, timeout=5)
+            BYTES_SENT.labels(transport='http').inc(len(body))
+            if response.status_code == 200:
+                self.success_count += len(items)
+                SEND_RESULTS.labels(result='success').inc(len(items))
+                self.batch_count += 1
+                self.bytes_sent += len(body)
+                logger.info(f"✅ Багц илгээгдлээ: {len(items)} мөр, {len(body)} байт")
+                return True
+            else:
+                self.failed_count += len(items)
+                SEND_RESULTS.labels(result='failed').inc(len(items))
+                logger.error(f"❌ HTTP {response.status_code} (багц {len(items)} мөр)")
+        except Exception as e:
+            self.failed_count += len(items)
+            SEND_RESULTS.labels(result='failed').inc(len(items))
+            logger.error(f"❌ Алдаа: {str(e)}")
+        
+        if self.encoder is not None:
+            # float32 фрэймээс буцааж задлахгүй — нарийвчлал, цагийн бичлэг хэвээр
+            items = [build_payload(readings, timestamp, sensor_ids)
+                     for readings, timestamp, sensor_ids in originals]
+        else:
+            items = [json.loads(item) for item in items]
+        self._spool(items)
+        return False
+    
+    def get_state(self) -> Dict:
+        state = super().get_state()
+        state['batches'] = self.batch_count
+        return state
+    
+    def set_state(self, state: Dict):
+        super().set_state(state)
+        self.batch_count = state['batches']
+    
+    def get_statistics(self) -> Dict:
+        stats = super().get_statistics()
+        stats['batches'] = self.batch_count
+        stats['bytes_raw'] = self.bytes_raw
+        stats['bytes_sent'] = self.bytes_sent
+        return stats
+
 # ============================================
 # ҮНДСЭН СИМУЛЯТОР
 # ============================================
 
 class HeatingSubstationSimulator:
-    def __init__(self):
-        self.get_sensorids = GetSensorIDs(Config.GET_SENSOR_ID_URL)
-        self.heating_system = HeatingSystem()
-        self.data_sender = DataSender(Config.SERVER_URL)
+    def __init__(self, clock=None):
+        self.clock = clock or SystemClock()
+        self.sensor_registry = setup_sensor_registry()
+        if Config.PHYSICS_MODEL == 'dynamic':
+            from dynamics import DynamicHeatingSystem
+            self.heating_system = DynamicHeatingSystem(self.clock)
+        else:
+            self.heating_system = HeatingSystem(self.clock)
+        self.spool = setup_spool() if Config.SPOOL_ENABLED else None
+        if Config.BATCH_ENABLED:
+            self.data_sender = BatchingSender(Config.BATCH_URL, spool=self.spool)
+        else:
+            self.data_sender = DataSender(Config.SERVER_URL, spool=self.spool)
+        self.deadband = setup_deadband() if Config.DEADBAND_ENABLED else None
+        self.deadband_lost = 0  # _resync_deadband-ийн сүүлд харсан алдагдлын тоо
+        self.breaker = CircuitBreaker(Config.BREAKER_FAILURE_THRESHOLD,
+                                      Config.BREAKER_RESET_TIMEOUT, Config.BREAKER_MAX_TIMEOUT)
+        self.pipeline = DeliveryPipeline(self.data_sender, self.breaker,
+                                         Config.DELIVERY_QUEUE_SIZE, Config.DELIVERY_POLICY)
+        self.spool_drainer = None
+        self.checkpointer = None
+        self.analytics = self._setup_analytics() if Config.ANALYTICS_ENABLED else None
+        self.scheduler = TickScheduler(
+            Config.SEND_INTERVAL,
+            phase=device_phase(Config.DEVICE_ID, Config.SEND_INTERVAL),
+            policy=Config.TICK_POLICY,
+            clock=self.clock,
+        )
+        self.log_sampler = DeviceSampler(Config.LOG_SAMPLE_EVERY, Config.LOG_RATE_LIMIT)
+        self.log_summary = ReadingSummary(Config.LOG_SUMMARY_INTERVAL)
         self.running = False
         self.iteration = 0
-        
+        self._print_banner()
+    
+    def _print_banner(self):
         logger.info("=" * 70)
         logger.info("🏭 ДУЛААНЫ ДАХИН ДАМЖУУЛАХ ТӨВИЙН СИМУЛЯТОР")
         logger.info("=" * 70)
         logger.info(f"📍 Төхөөрөмж: {Config.DEVICE_ID}")
         logger.info(f"📍 Байршил: {Config.LOCATION}")
-        logger.info(f"🌐 Сервер:   {Config.SERVER_URL}")
+        logger.info(f"🌐 Сервер:   {self.data_sender.url}")
         logger.info(f"⏱️  Давтамж:  {Config.SEND_INTERVAL} секунд")
         logger.info(f"📊 Мэдрэгч:  8 ширхэг (4 шугам)")
         logger.info("")
@@ -429,30 +1168,51 @@ class HeatingSubstationSimulator:
         logger.info("=" * 70)
     
     def run(self):
-        self.get_sensorids.fetch()
+        self._resolve_sensor_ids()
         self.running = True
         
+        if Config.METRICS_PORT and serve_metrics():
+            TICK_OVERRUNS.labels().set_function(lambda: self.scheduler.overrun_count)
+        
+        self._start_spool_drainer()
+        self._restore_checkpoint()
+        self.pipeline.start()
+        
         try:
             while self.running:
+                TICK_LAG_SECONDS.set(self.scheduler.wait())
                 self.iteration += 1
                 
                 # Мэдрэгч унших
-                readings = self.heating_system.calculate_all_readings()
+                with STAGE_SECONDS.labels(stage='physics').time():
+                    readings = self.heating_system.calculate_all_readings()
                 
                 # Үр ашиг тооцоолох
                 efficiency = self.heating_system.get_system_efficiency(readings)
+                if self.analytics is not None:
+                    self.analytics.update([readings.data])
                 
                 # Дэлгэцэнд харуулах
-                self._print_readings(readings, efficiency)
+                with STAGE_SECONDS.labels(stage='log').time():
+                    self._log_tick(readings, efficiency)
                 
-                # Сервер лүү илгээх
-                self.data_sender.send(readings)
+                # Илгээх дараалал руу (deadband үед зөвхөн өөрчлөгдсөн утгууд) —
+                # сервер удаан хариулсан ч tick хүлээхгүй
+                timestamp = self.clock.now()
+                if self.deadband is not None:
+                    self._resync_deadband()
+                    changed = self.deadband.filter(readings, timestamp.timestamp())
+                    if changed:
+                        self.pipeline.submit(changed, timestamp)
+                else:
+                    self.pipeline.submit(readings, timestamp)
                 
                 # Статистик (10 удаад нэг)
                 if self.iteration % 10 == 0:
                     self._print_statistics()
                 
-                time.sleep(Config.SEND_INTERVAL)
+                if self.checkpointer is not None:
+                    self.checkpointer.maybe_save()
                 
         except KeyboardInterrupt:
             logger.info("\n⚠️  Ctrl+C - Зогсож байна")
@@ -461,45 +1221,142 @@ class HeatingSubstationSimulator:
             logger.error(f"❌ Алдаа: {str(e)}")
             self.stop()
     
+    def _resync_deadband(self):
+        """
+        Өмнөх уншилт алдагдсан бол (дарааллаас хаягдсан, spool-гүй алдаа,
+        ID тодорхойгүй) энэ tick-т бүх утгыг keyframe-ээр илгээнэ
+        
+        Spool-д орсон алдаа тоологдохгүй — SpoolDrainer хожим хүргэнэ.
+        """
+        lost = (self.pipeline.dropped_count + self.data_sender.dropped_count
+                + self.data_sender.unresolved_count)
+        if lost != self.deadband_lost:
+            self.deadband_lost = lost
+            self.deadband.force_keyframe()
+    
+    def _start_spool_drainer(self):
+        if self.spool is None:
+            return
+        QUEUE_DEPTH.labels(queue='spool_bytes').set_function(lambda: self.spool.size)
+        self.spool_drainer = SpoolDrainer(
+            self.spool, self.data_sender.url,
+            batch=Config.BATCH_ENABLED,
+            batch_size=Config.SPOOL_BATCH_SIZE,
+            replay_rate=Config.SPOOL_REPLAY_RATE,
+        )
+        self.spool_drainer.start()
+    
+    def _setup_analytics(self) -> RollingAnalytics:
+        return setup_analytics([Config.DEVICE_ID])
+    
+    def _checkpoint_components(self) -> Dict:
+        components = {
+            'simulator': self,
+            'physics': self.heating_system,
+            'sender': self.data_sender,
+        }
+        if self.deadband is not None:
+            components['deadband'] = self.deadband
+        if self.analytics is not None:
+            components['analytics'] = self.analytics
+        return components
+    
+    def _restore_checkpoint(self):
+        """Өмнөх ажиллагааны төлөвөөс үргэлжлүүлэх (физик, RNG, тоолуур)"""
+        if not Config.CHECKPOINT_ENABLED:
+            return
+        self.checkpointer = setup_checkpointer(self._checkpoint_components())
+        if self.checkpointer.restore():
+            logger.info(f"   - Давталт #{self.iteration}-аас үргэлжилнэ")
+    
+    def get_state(self) -> Dict:
+        return {'iteration': self.iteration}
+    
+    def set_state(self, state: Dict):
+        self.iteration = state['iteration']
+    
+    def _resolve_sensor_ids(self):
+        """
+        Кэшээс шууд ачаалж, татах/шинэчлэхийг ард талд
+        
+        Илгээгч нь бүртгэлийн dict-ийг барина — ард талын татал дууссан
+        мөчөөс ID шинэчлэгдэнэ. Тэр хүртэл (0) илгээлт алгасагдана.
+        """
+        registry = self.sensor_registry
+        registry.load()
+        self.data_sender.sensor_ids = registry.sensor_ids(Config.MEASUREMENT_OBJECT_ID)
+        registry.start_refresh([Config.MEASUREMENT_OBJECT_ID], Config.SENSOR_REFRESH_INTERVAL)
+        
+        if not sensor_ids_resolved(self.data_sender.sensor_ids):
+            logger.warning("⚠️  Мэдрэгчийн ID кэшид алга — ард талд татаж байна")
+        for key, sensor_id in self.data_sender.sensor_ids.items():
+            logger.info(f"   - {key}: ID={sensor_id} sensorObjectLocationId={registry.locations[key]}")
+    
     def stop(self):
         self.running = False
+        self.sensor_registry.stop()
+        self.pipeline.stop()
+        self.data_sender.flush()
+        if self.spool_drainer is not None:
+            self.spool_drainer.stop()
+        if self.checkpointer is not None:
+            self.checkpointer.save()
         logger.info("\n" + "=" * 70)
         logger.info("🛑 СИМУЛЯТОР ЗОГСЛОО")
         self._print_statistics()
         logger.info("=" * 70)
     
+    def _log_tick(self, readings: Dict[str, float], efficiency: float):
+        if Config.LOG_MODE == 'summary':
+            self.log_summary.add(readings, efficiency)
+            if self.log_summary.due():
+                self.log_summary.emit(logger)
+        elif self.log_sampler.allow(Config.DEVICE_ID):
+            self._print_readings(readings, efficiency)
+    
     def _print_readings(self, readings: Dict[str, float], efficiency: float):
-        outdoor = self.heating_system.get_outdoor_temperature()
-        
-        logger.info(f"\n{'━' * 70}")
-        logger.info(f"📊 Давталт #{self.iteration} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        logger.info(f"🌡️  Гадны температур: {outdoor:.1f}°C")
-        logger.info(f"{'─' * 70}")
-        
-        # Шугам 1: Станцаас
-        logger.info(f"🔴 Шугам 1 - СТАНЦААС ОРОХ:")
-        logger.info(f"   Температур: {readings['supply_from_station_temp']:6.1f}°C")
-        logger.info(f"   Даралт:     {readings['supply_from_station_pressure']:6.2f} bar")
-        
-        # Шугам 2: Хэрэглэгч рүү
-        logger.info(f"🟠 Шугам 2 - ХЭРЭГЛЭГЧ РҮҮ:")
-        logger.info(f"   Температур: {readings['forward_to_consumer_temp']:6.1f}°C")
-        logger.info(f"   Даралт:     {readings['forward_to_consumer_pressure']:6.2f} bar")
-        
-        # Шугам 3: Хэрэглэгчээс
-        logger.info(f"🔵 Шугам 3 - ХЭРЭГЛЭГЧЭЭС БУЦАХ:")
-        logger.info(f"   Температур: {readings['return_from_consumer_temp']:6.1f}°C")
-        logger.info(f"   Даралт:     {readings['return_from_consumer_pressure']:6.2f} bar")
+        # Лог унтраалттай бол форматлахгүй
+        if not logger.isEnabledFor(logging.INFO):
+            return
         
-        # Шугам 4: Станц руу
-        logger.info(f"🟣 Шугам 4 - СТАНЦ РУУ БУЦАХ:")
-        logger.info(f"   Температур: {readings['return_to_station_temp']:6.1f}°C")
-        logger.info(f"   Даралт:     {readings['return_to_station_pressure']:6.2f} bar")
+        # Физикт ашигласан утга (дахин тооцоолбол өөр шуугиан/агшин)
+        outdoor = self.heating_system.outdoor_temp
         
-        # Системийн үр ашиг
-        logger.info(f"{'─' * 70}")
-        logger.info(f"⚡ ΔT (Үр ашиг):  {efficiency:.1f}°C {'✅' if 25 <= efficiency <= 35 else '⚠️'}")
-        logger.info(f"   Оновчтой: 25-35°C")
+        # Нэг бичлэгээр (20 тусдаа дуудлагын оронд)
+        lines = [
+            f"\n{'━' * 70}",
+            f"📊 Давталт #{self.iteration} - {self.clock.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"🌡️  Гадны температур: {outdoor:.1f}°C",
+            f"{'─' * 70}",
+            
+            # Шугам 1: Станцаас
+            f"🔴 Шугам 1 - СТАНЦААС ОРОХ:",
+            f"   Температур: {readings['supply_from_station_temp']:6.1f}°C",
+            f"   Даралт:     {readings['supply_from_station_pressure']:6.2f} bar",
+            
+            # Шугам 2: Хэрэглэгч рүү
+            f"🟠 Шугам 2 - ХЭРЭГЛЭГЧ РҮҮ:",
+            f"   Температур: {readings['forward_to_consumer_temp']:6.1f}°C",
+            f"   Даралт:     {readings['forward_to_consumer_pressure']:6.2f} bar",
+            
+            # Шугам 3: Хэрэглэгчээс
+            f"🔵 Шугам 3 - ХЭРЭГЛЭГЧЭЭС БУЦАХ:",
+            f"   Температур: {readings['return_from_consumer_temp']:6.1f}°C",
+            f"   Даралт:     {readings['return_from_consumer_pressure']:6.2f} bar",
+            
+            # Шугам 4: Станц руу
+            f"🟣 Шугам 4 - СТАНЦ РУУ БУЦАХ:",
+            f"   Температур: {readings['return_to_station_temp']:6.1f}°C",
+            f"   Даралт:     {readings['return_to_station_pressure']:6.2f} bar",
+            
+            # Системийн үр ашиг
+            f"{'─' * 70}",
+            f"⚡ ΔT (Үр ашиг):  {efficiency:.1f}°C {'✅' if 25 <= efficiency <= 35 else '⚠️'}",
+            f"   Оновчтой: 25-35°C",
+        ]
+        logger.info('\n'.join(lines),
+                    extra={'fields': {'device': Config.DEVICE_ID, 'iteration': self.iteration,
+                                      'outdoor': round(outdoor, 1), **readings}})
     
     def _print_statistics(self):
         stats = self.data_sender.get_statistics()
@@ -510,6 +1367,38 @@ class HeatingSubstationSimulator:
         logger.info(f"❌ Амжилтгүй:     {stats['failed']:5} удаа")
         logger.info(f"📦 Нийт:          {stats['total']:5} удаа")
         logger.info(f"📊 Амжилтын хувь: {stats['success_rate']:5.1f}%")
+        if stats['dropped'] or stats['unresolved']:
+            logger.info(f"🗑️  Хаягдсан:      {stats['dropped']:5} (spool-гүй), "
+                        f"{stats['unresolved']} ID тодорхойгүй")
+        tick_stats = self.scheduler.get_statistics()
+        logger.info(f"⏱️  Jitter:        {tick_stats['jitter_mean_ms']:8.1f} ms дундаж, "
+                    f"{tick_stats['jitter_max_ms']:.1f} ms дээд, "
+                    f"{tick_stats['overruns']} хэтрэлт, {tick_stats['skipped']} алгассан")
+        if self.spool is not None:
+            spool_stats = self.spool.get_statistics()
+            logger.info(f"💾 Spool:         {spool_stats['bytes'] / 1024:8.1f} KB "
+                        f"({spool_stats['segments']} segment, {spool_stats['dropped']} устгагдсан)")
+        pipeline_stats = self.pipeline.get_statistics()
+        logger.info(f"📬 Дараалал:      {pipeline_stats['queued']:5} ({pipeline_stats['max_depth']} дээд, "
+                    f"{pipeline_stats['dropped']} хаягдсан, {pipeline_stats['spilled']} spool), "
+                    f"circuit {pipeline_stats['breaker']['state']} "
+                    f"({pipeline_stats['breaker']['opens']} удаа нээгдсэн)")
+        if self.deadband is not None:
+            deadband_stats = self.deadband.get_statistics()
+            logger.info(f"🔇 Deadband:      {deadband_stats['suppression_ratio'] * 100:8.1f}% дарагдсан "
+                        f"({deadband_stats['sent']}/{deadband_stats['offered']} утга, "
+                        f"{deadband_stats['keyframes']} keyframe)")
+        if self.analytics is not None:
+            analytics_stats = self.analytics.get_statistics()
+            logger.info(f"📐 ΔT цонх:       {analytics_stats['dt_mean']:8.1f}°C дундаж "
+                        f"({analytics_stats['dt_min']:.1f}…{analytics_stats['dt_max']:.1f}), "
+                        f"⚡ {analytics_stats['heat_power_kw']:.1f} kW, "
+                        f"{analytics_stats['out_of_band_ticks']} tick хэвийн бус, "
+                        f"{analytics_stats['drifting']} drift")
+        if self.checkpointer is not None:
+            checkpoint_stats = self.checkpointer.get_statistics()
+            logger.info(f"🧷 Checkpoint:    {checkpoint_stats['saves']:5} удаа "
+                        f"({checkpoint_stats['bytes'] / 1024:.1f} KB, {checkpoint_stats['save_ms']} ms)")
         logger.info(f"{'═' * 70}")
 
 # ============================================
@@ -531,6 +1420,7 @@ def signal_handler(signum, frame):
 def main():
     global simulator
     
+    setup_logger()
     signal.signal(signal.SIGTERM, signal_handler)
     signal.signal(signal.SIGINT, signal_handler)
     
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+НЭГ УДАА ТООЦООЛЖ, ОЛОН ГАРАЛТ РУУ ТАРААХ
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Физик загвар tick бүрт нэг л удаа тооцоологдоно. Үр дүн FanOut-аар
+дамжин гаралт (sink) бүрийн өөрийн дараалал руу орж, тус бүрийн
+thread дээр бичигдэнэ:
+
+    HeatingFleet ─→ FanOut ─┬→ [queue] → HttpSink        (/v/value)
+                            ├→ [queue] → ThingsBoardSink (gateway MQTT)
+                            ├→ [queue] → TimescaleSink   (COPY → hypertable)
+                            ├→ [queue] → FileSink        (JSON мөр)
+                            ├→ [queue] → RecordSink      (багана файл, recording.py)
+                            ├→ [queue] → AnalyticsSink   (гулсах цонх → /metrics)
+                            └→ [queue] → StdoutSink
+
+Удаан гаралт физикийн давталт болон бусад гаралтыг саатуулахгүй —
+дараалал дүүрвэл хамгийн хуучин tick-ийг хаяж, dropped тоолуурт бичнэ.
+"""
+
+import abc
+import asyncio
+import json
+import queue
+import sys
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Sequence
+
+from deadband import DeadbandFilter
+from metrics import QUEUE_DEPTH, STAGE_SECONDS, TICK_LAG_SECONDS
+from pipeline import CircuitBreaker, deliver
+from simulator import (FRAME_SCHEMA, BatchingSender, Config, DataSender, DeviceSampler,
+                       fleet_measurement_ids, logger, serve_metrics, setup_analytics, setup_deadband, setup_logger,
+                       setup_spool, start_sensor_registry)
+from spool import SpoolDrainer
+
+CHANNELS = tuple(Config.SENSORS)
+
+# Нэг tick-ийн үр дүн: бүх гаралт ижил объектыг хуваалцана (зөвхөн унших)
+Tick = namedtuple('Tick', ['timestamp', 'device_ids', 'rows'])
+
+_STOP = object()
+
+# ============================================
+# ГАРАЛТЫН СУУРЬ
+# ============================================
+
+class Sink(threading.Thread, metaclass=abc.ABCMeta):
+    kind = 'sink'
+
+    def __init__(self, queue_size: int = 100):
+        super().__init__(daemon=True, name=f"Sink-{self.kind}")
+        self.queue = queue.Queue(maxsize=queue_size)
+        QUEUE_DEPTH.labels(queue=self.kind).set_function(self.queue.qsize)
+        self.written_count = 0
+        self.dropped_count = 0
+        self.error_count = 0
+
+    def submit(self, tick: Tick, block: bool = False):
+        """
+        Дараалалд нэмэх — анхдагчаар хэзээ ч хүлээхгүй
+
+        block=True бол дүүрэхэд хүлээнэ (бичлэгийг дахин тоглуулахад tick хаягдахгүй)
+        """
+        if block:
+            self.queue.put(tick)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(tick)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped_count += 1
+                except queue.Empty:
+                    pass
+
+    def run(self):
+        while True:
+            tick = self.queue.get()
+            if tick is _STOP:
+                break
+            try:
+                self.write(tick)
+                self.written_count += 1
+            except Exception as e:
+                self.error_count += 1
+                logger.error(f"❌ [{self.kind}] Алдаа: {str(e)}")
+        self.close()
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Үлдсэнийг бичээд зогсох
+
+        Thread гацаж дараалал дүүрсэн бол хамгийн хуучин tick-ийг хаяж
+        _STOP-д байр гаргана — зогсолт хэзээ ч гацахгүй.
+        """
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            try:
+                self.queue.get_nowait()
+                self.dropped_count += 1
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(_STOP)
+            except queue.Full:
+                pass
+            logger.warning(f"⚠️  [{self.kind}] Гаралт гацсан — дарааллыг бүрэн бичилгүй зогслоо")
+        self.join(timeout)
+
+    @abc.abstractmethod
+    def write(self, tick: Tick):
+        """Нэг tick-ийг бичих (гаралтын thread дээр)"""
+
+    def close(self):
+        pass
+
+    def get_statistics(self) -> Dict:
+        return {
+            'written': self.written_count,
+            'dropped': self.dropped_count,
+            'errors': self.error_count,
+            'queue': self.queue.qsize(),
+        }
+
+# ============================================
+# ГАРАЛТУУД
+# ============================================
+
+class HttpSink(Sink):
+    """
+    DataSender (эсвэл BatchingSender)-ээр /v/value руу
+
+    sensor_ids: device_id → SensorRegistry.sensor_ids — мөр бүр өөрийн
+    төхөөрөмжийн ID-аар кодлогдоно. None бол sender.sensor_ids (нэг төхөөрөмж).
+
+    Флот BatchingSender-гүй бол tick-ийн POST-ууд AsyncDataSender.send_many-ээр
+    зэрэг явна (нэг нэгээр явбал хэдэн зуун төхөөрөмж tick-т багтахгүй).
+    sender нь тоолуур, spool (амжилтгүй → defer), ID шалгалтаа хадгална;
+    breaker нь tick бүрээр (бүгд амжилтгүй бол алдаа) тоологдоно.
+    """
+    kind = 'http'
+
+    def __init__(self, sender: DataSender, deadband: DeadbandFilter = None,
+                 breaker: CircuitBreaker = None, sensor_ids: Dict[str, Dict[str, int]] = None,
+                 registry=None, drainer=None, queue_size: int = 100):
+        super().__init__(queue_size)
+        self.sender = sender
+        self.deadband = deadband
+        self.breaker = breaker
+        self.sensor_ids = sensor_ids
+        self.registry = registry
+        self.drainer = drainer   # sender-ийн spool-ийг буцааж илгээх SpoolDrainer
+        self.transport = None    # AsyncDataSender (флот, багцгүй)
+        self.loop = None
+        if sensor_ids is not None and not isinstance(sender, BatchingSender):
+            from async_sender import AsyncDataSender
+            self.transport = AsyncDataSender(sender.url)
+            self.transport.sensor_ids = sensor_ids
+
+    def _device_sensor_ids(self, device_ids: Sequence[str]) -> List[Dict[str, int]]:
+        if self.sensor_ids is None:
+            return [None] * len(device_ids)
+        # Бүртгэлд байхгүй төхөөрөмж → {} (илгээгч алгасаж тоолно)
+        return [self.sensor_ids.get(device_id, {}) for device_id in device_ids]
+
+    def _losses(self) -> int:
+        """Хүрэхгүй болсон уншилт (spool-гүй хаягдсан + ID тодорхойгүй)"""
+        return self.sender.dropped_count + self.sender.unresolved_count
+
+    def write(self, tick: Tick):
+        device_sensor_ids = self._device_sensor_ids(tick.device_ids)
+        dropped = self.sender.dropped_count
+        if self.deadband is not None:
+            # Зөвхөн өөрчлөгдсөн утгууд; бүгд дарагдсан төхөөрөмж ({}) алгасагдана
+            readings = self.deadband.filter_rows(tick.rows, tick.timestamp.timestamp())
+        else:
+            readings = [FRAME_SCHEMA.frame(row) for row in tick.rows]
+
+        if self.transport is not None:
+            lost = self._send_fleet(tick, readings, device_sensor_ids)
+        else:
+            lost = []
+            for i, (values, sensor_ids) in enumerate(zip(readings, device_sensor_ids)):
+                if not values:
+                    continue
+                before = self._losses()
+                deliver(self.sender, self.breaker, values, tick.timestamp, sensor_ids)
+                if self._losses() != before:
+                    lost.append(i)
+
+        if self.deadband is not None:
+            # Алдагдсан өөрчлөлтийг дараагийн tick-т бүтэн keyframe-ээр нөхнө (spool-д
+            # орсон нь хожим хүрнэ); багцын flush хаягдвал аль төхөөрөмж болох нь
+            # мэдэгдэхгүй — бүгдийг
+            if isinstance(self.sender, BatchingSender) and self.sender.dropped_count != dropped:
+                self.deadband.force_keyframe()
+            elif lost:
+                self.deadband.force_keyframe(lost)
+
+    def _send_fleet(self, tick: Tick, readings: List, device_sensor_ids: List) -> List[int]:
+        """Нэг tick-ийг зэрэг илгээх; алдагдсан (spool-д ч ороогүй) индексийг буцаах"""
+        lost, ready = [], []
+        for i, (values, sensor_ids) in enumerate(zip(readings, device_sensor_ids)):
+            if not values:
+                continue
+            (ready if self.sender.check_sensor_ids(sensor_ids) else lost).append(i)
+        if not ready:
+            return lost
+
+        if self.breaker is not None and not self.breaker.allow():
+            return lost + [i for i in ready
+                           if not self.sender.defer(readings[i], tick.timestamp,
+                                                    device_sensor_ids[i])]
+
+        results = self.loop.run_until_complete(self.transport.send_many(
+            ((tick.device_ids[i], readings[i]) for i in ready), tick.timestamp))
+        rejected = [i for i, ok in zip(ready, results) if not ok]
+        self.sender.record_results(len(ready) - len(rejected), len(rejected))
+        lost += [i for i in rejected
+                 if not self.sender.defer(readings[i], tick.timestamp, device_sensor_ids[i])]
+        if self.breaker is not None:
+            if len(rejected) < len(ready):
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+        return lost
+
+    def run(self):
+        if self.transport is not None:
+            # Event loop нь гаралтын thread-д харьяалагдана
+            self.loop = asyncio.new_event_loop()
+            self.loop.run_until_complete(self.transport.open())
+        if self.drainer is not None:
+            self.drainer.start()
+        super().run()
+
+    def close(self):
+        self.sender.flush()
+        if self.loop is not None:
+            self.loop.run_until_complete(self.transport.close())
+            self.loop.close()
+        if self.registry is not None:
+            self.registry.stop()
+        if self.drainer is not None:
+            self.drainer.stop()
+
+    def get_statistics(self) -> Dict:
+        stats = super().get_statistics()
+        stats['sender'] = self.sender.get_statistics()
+        if self.deadband is not None:
+            stats['deadband'] = self.deadband.get_statistics()
+        if self.breaker is not None:
+            stats['breaker'] = self.breaker.get_statistics()
+        return stats
+
+class ThingsBoardSink(Sink):
+    """GatewayPublisher-ээр widget-ийн түлхүүрүүдтэй (temp_in_fac, ...)"""
+    kind = 'thingsboard'
+
+    def __init__(self, publisher, queue_size: int = 100):
+        super().__init__(queue_size)
+        self.publisher = publisher
+
+    def write(self, tick: Tick):
+        self.publisher.publish(tick.device_ids, tick.rows, tick.timestamp)
+
+    def close(self):
+        self.publisher.disconnect()
+
+class TimescaleSink(Sink):
+    """TimescaleWriter-ээр hypertable руу COPY"""
+    kind = 'timescale'
+
+    def __init__(self, writer, queue_size: int = 100):
+        super().__init__(queue_size)
+        self.writer = writer
+
+    def write(self, tick: Tick):
+        self.writer.write(tick.device_ids, tick.rows, tick.timestamp)
+
+    def close(self):
+        self.writer.disconnect()
+
+    def get_statistics(self) -> Dict:
+        stats = super().get_statistics()
+        stats['timescale'] = self.writer.get_statistics()
+        return stats
+
+class FileSink(Sink):
+    """Төхөөрөмж бүрт нэг JSON мөр"""
+    kind = 'file'
+
+    def __init__(self, path: str, queue_size: int = 100):
+        super().__init__(queue_size)
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, tick: Tick):
+        time = tick.timestamp.isoformat()
+        self.file.writelines(
+            json.dumps({'device': device_id, 'time': time, **dict(zip(CHANNELS, row))},
+                       ensure_ascii=False) + '\n'
+            for device_id, row in zip(tick.device_ids, tick.rows)
+        )
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class RecordSink(Sink):
+    """recording.Recorder-оор багана файлд (recording.py replay-ээр дахин тоглуулна)"""
+    kind = 'record'
+
+    def __init__(self, path: str, queue_size: int = 100):
+        super().__init__(queue_size)
+        self.path = path
+        self.recorder = None
+
+    def write(self, tick: Tick):
+        if self.recorder is None:
+            from recording import Recorder
+            self.recorder = Recorder(self.path, tick.device_ids)
+        self.recorder.append(tick.timestamp, tick.rows)
+
+    def close(self):
+        if self.recorder is not None:
+            self.recorder.close()
+
+class AnalyticsSink(Sink):
+    """analytics.RollingAnalytics-ийг өөрийн thread дээр шинэчлэх (флотын хэмжээ эхний tick-ээр)"""
+    kind = 'analytics'
+
+    def __init__(self, queue_size: int = 100):
+        super().__init__(queue_size)
+        self.analytics = None
+
+    def write(self, tick: Tick):
+        if self.analytics is None:
+            self.analytics = setup_analytics(tick.device_ids)
+        self.analytics.update(tick.rows)
+
+    def get_statistics(self) -> Dict:
+        stats = super().get_statistics()
+        if self.analytics is not None:
+            stats['analytics'] = self.analytics.get_statistics()
+        return stats
+
+class StdoutSink(Sink):
+    """
+    Товч мөр (tick бүрт дээд тал нь max_devices төхөөрөмж)
+
+    Төхөөрөмж бүр LOG_SAMPLE_EVERY / LOG_RATE_LIMIT-ээр дээжлэгдэнэ —
+    дарагдсан төхөөрөмжийн оронд дараагийнх нь хэвлэгдэх тул том флотод
+    мөрүүд бүх төхөөрөмжөөр ээлжилнэ.
+    """
+    kind = 'stdout'
+
+    def __init__(self, max_devices: int = 5, sampler: DeviceSampler = None,
+                 queue_size: int = 100):
+        super().__init__(queue_size)
+        self.max_devices = max_devices
+        self.sampler = sampler or DeviceSampler(Config.LOG_SAMPLE_EVERY, Config.LOG_RATE_LIMIT)
+
+    def write(self, tick: Tick):
+        time = tick.timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        printed = 0
+        for device_id, row in zip(tick.device_ids, tick.rows):
+            if printed >= self.max_devices:
+                break
+            if not self.sampler.allow(device_id):
+                continue
+            values = ' '.join(f"{value:6.2f}" for value in row)
+            sys.stdout.write(f"{time} {device_id} {values}\n")
+            printed += 1
+        sys.stdout.flush()
+
+    def get_statistics(self) -> Dict:
+        stats = super().get_statistics()
+        stats['suppressed'] = self.sampler.suppressed_count
+        return stats
+
+# ============================================
+# ТАРААГЧ
+# ============================================
+
+class FanOut:
+    def __init__(self, sinks: List[Sink]):
+        self.sinks = sinks
+
+    def start(self):
+        for sink in self.sinks:
+            sink.start()
+
+    def stop(self):
+        for sink in self.sinks:
+            sink.stop()
+
+    def publish(self, timestamp: datetime, device_ids: Sequence[str], readings,
+                block: bool = False):
+        """
+        Нэг tick-ийн уншилтыг бүх гаралт руу тараах
+
+        readings: (N × 8) NumPy матриц эсвэл мөрүүдийн жагсаалт.
+        block:    дараалал дүүрвэл хүлээх (үгүй бол хамгийн хуучныг хаяна)
+        Хуулбарыг нэг л удаа үүсгэнэ — физик буфер дахин бичигдсэн ч
+        гаралтууд нөлөөлөгдөхгүй.
+        """
+        rows = readings.tolist() if hasattr(readings, 'tolist') else [list(r) for r in readings]
+        tick = Tick(timestamp, list(device_ids), rows)
+        for sink in self.sinks:
+            sink.submit(tick, block)
+
+    def get_statistics(self) -> Dict[str, Dict]:
+        return {sink.kind: sink.get_statistics() for sink in self.sinks}
+
+def build_sinks(names: Sequence[str], sender: DataSender = None,
+                deadband: DeadbandFilter = None, breaker: CircuitBreaker = None,
+                device_ids: Sequence[str] = None, offset: int = 0) -> List[Sink]:
+    """
+    Config.SINKS-ийн нэрсээс гаралтуудыг үүсгэх
+
+    sender:     'http' гаралтад ашиглах бэлэн илгээгч (байхгүй бол Config.SPOOL_ENABLED
+                үед spool + SpoolDrainer-тэй шинээр)
+    deadband:   'http' гаралтын шүүлтүүр (байхгүй бол Config.DEADBAND_ENABLED-ээр)
+    breaker:    'http' гаралтын circuit breaker (байхгүй бол Config.BREAKER_*-ээр)
+    device_ids: 'http' гаралтын төхөөрөмжүүд — тус бүрийн sensor ID-г бүртгэлээс
+                (fleet_measurement_ids, offset нь shard-ийн эхний индекс)
+    """
+    sinks = []
+    for name in names:
+        if name == 'http':
+            drainer = None
+            if sender is None:
+                # Circuit нээлттэй / илгээлт амжилтгүй үед уншилт spool руу
+                spool = setup_spool() if Config.SPOOL_ENABLED else None
+                if Config.BATCH_ENABLED:
+                    sender = BatchingSender(Config.BATCH_URL, spool=spool)
+                else:
+                    sender = DataSender(Config.SERVER_URL, spool=spool)
+                if spool is not None:
+                    drainer = SpoolDrainer(spool, sender.url, batch=Config.BATCH_ENABLED,
+                                           batch_size=Config.SPOOL_BATCH_SIZE,
+                                           replay_rate=Config.SPOOL_REPLAY_RATE)
+            if deadband is None and Config.DEADBAND_ENABLED:
+                deadband = setup_deadband()
+            if breaker is None:
+                breaker = CircuitBreaker(Config.BREAKER_FAILURE_THRESHOLD,
+                                         Config.BREAKER_RESET_TIMEOUT, Config.BREAKER_MAX_TIMEOUT)
+            sensor_ids = registry = None
+            if device_ids is not None:
+                measurement_ids = fleet_measurement_ids(len(device_ids), offset)
+                registry = start_sensor_registry(measurement_ids)
+                sensor_ids = {device_id: registry.sensor_ids(measurement_id)
+                              for device_id, measurement_id in zip(device_ids, measurement_ids)}
+            sinks.append(HttpSink(sender, deadband, breaker, sensor_ids, registry, drainer))
+        elif name == 'thingsboard':
+            from tb_gateway import GatewayPublisher
+            publisher = GatewayPublisher()
+            publisher.connect()
+            sinks.append(ThingsBoardSink(publisher))
+        elif name == 'timescale':
+            from timescale_sink import TimescaleWriter
+            writer = TimescaleWriter()
+            writer.connect()
+            sinks.append(TimescaleSink(writer))
+        elif name == 'file':
+            sinks.append(FileSink(Config.SINK_FILE_PATH))
+        elif name == 'record':
+            sinks.append(RecordSink(Config.RECORD_PATH))
+        elif name == 'analytics':
+            sinks.append(AnalyticsSink())
+        elif name == 'stdout':
+            sinks.append(StdoutSink())
+        else:
+            raise ValueError(f"unknown sink: {name}")
+    return sinks
+
+# ============================================
+# MAIN
+# ============================================
+
+def main():
+    setup_logger()
+    from fleet import create_fleet
+    from scheduler import TickScheduler
+
+    fleet = create_fleet(Config.FLEET_SIZE)
+    fanout = FanOut(build_sinks(Config.SINKS, device_ids=fleet.device_ids))
+    scheduler = TickScheduler(Config.SEND_INTERVAL, policy=Config.TICK_POLICY)
+    tz = timezone(timedelta(hours=8))
+
+    logger.info(f"🏭 {fleet.size} төхөөрөмж → {', '.join(Config.SINKS)}")
+    if Config.METRICS_PORT:
+        serve_metrics()
+    fanout.start()
+    try:
+        iteration = 0
+        while True:
+            TICK_LAG_SECONDS.set(scheduler.wait())
+            iteration += 1
+            with STAGE_SECONDS.labels(stage='physics').time():
+                readings = fleet.step()
+            fanout.publish(datetime.now(tz), fleet.device_ids, readings)
+
+            if iteration % 10 == 0:
+                for name, stats in fanout.get_statistics().items():
+                    logger.info(f"📈 {name}: ✍️ {stats['written']} 🗑️ {stats['dropped']} "
+                                f"❌ {stats['errors']} (дараалал {stats['queue']})")
+    except KeyboardInterrupt:
+        logger.info("\n⚠️  Ctrl+C - Зогсож байна")
+    finally:
+        fanout.stop()
+
+if __name__ == "__main__":
+    main()
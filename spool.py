@@ -0,0 +1,326 @@
+"""
+ДИСК ДЭЭРХ ХАДГАЛЖ-ДАМЖУУЛАХ ДАРААЛАЛ (store-and-forward)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Сервер хүрэх боломжгүй үед илгээгдээгүй баримтыг анхны цагтай нь
+segment файлуудад (JSON мөр бүрт нэг баримт) дараалан бичнэ.
+
+    spool/
+        00000001.log   ← хамгийн хуучин
+        00000002.log
+        00000003.log   ← одоо бичиж буй
+        cursor         ← уншсан байрлал (segment, offset)
+        quarantine     ← задрахгүй (эвдэрсэн) мөрүүд, шалгахад
+
+• Нийт хэмжээ max_bytes-аас хэтэрвэл хамгийн хуучин segment устгагдана
+• Санах ойд зөвхөн нэг багц л байна — удаан тасалдалд ч санах ой тогтвортой
+• SpoolDrainer сервер сэргэсний дараа хуримтлалыг том багцаар,
+  хязгаартай хурдаар буцааж илгээнэ
+
+Хязгаарлалт: batch endpoint унтраалттай (BATCH_ENABLED = False) бол
+/v/value нэг л баримт авна. Тэр үед ижил цагтай дараалсан баримтууд
+(флотын нэг tick) нэг баримт болж нэгтгэгдэнэ, харин нэг төхөөрөмжийн
+хуримтлал tick бүрээр нэг POST хэвээр — replay_rate-ээр хязгаарлагдана.
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Tuple
+
+import requests
+
+logger = logging.getLogger('HeatingSimulator')
+
+Cursor = Tuple[int, int]
+
+# ============================================
+# SPOOL
+# ============================================
+
+class Spool:
+    def __init__(self, directory: str, segment_bytes: int = 4 * 1024 * 1024,
+                 max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        self.appended_count = 0
+        self.dropped_count = 0
+        self.corrupt_count = 0
+        self.quarantine_mark: Cursor = (0, 0)  # Хорио руу хуулсан хамгийн сүүлийн байрлал
+
+        os.makedirs(directory, exist_ok=True)
+        self.segments = sorted(
+            int(name[:-4]) for name in os.listdir(directory) if name.endswith('.log')
+        ) or [1]
+        self._repair(self.segments[-1])
+
+        self.cursor = self._load_cursor()
+        self.writer = open(self._path(self.segments[-1]), 'ab')
+        self.size = sum(self._segment_size(seg) for seg in self.segments)
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{segment:08d}.log")
+
+    def _segment_size(self, segment: int) -> int:
+        try:
+            return os.path.getsize(self._path(segment))
+        except FileNotFoundError:
+            return 0
+
+    def _repair(self, segment: int):
+        """Гэнэт зогссоны дараах дутуу сүүлийн мөрийг таслах"""
+        path = self._path(segment)
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb+') as f:
+            data = f.read()
+            end = data.rfind(b'\n') + 1
+            if end != len(data):
+                f.truncate(end)
+                logger.warning(f"⚠️  Spool: дутуу мөр таслагдлаа ({path})")
+
+    def _load_cursor(self) -> Cursor:
+        try:
+            with open(os.path.join(self.directory, 'cursor')) as f:
+                segment, offset = (int(x) for x in f.read().split())
+        except (FileNotFoundError, ValueError):
+            return (self.segments[0], 0)
+        if segment not in self.segments:
+            return (self.segments[0], 0)
+        return (segment, offset)
+
+    def _save_cursor(self):
+        path = os.path.join(self.directory, 'cursor')
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(f"{self.cursor[0]} {self.cursor[1]}")
+        os.replace(tmp, path)
+
+    def _roll(self):
+        self.writer.close()
+        self.segments.append(self.segments[-1] + 1)
+        self.writer = open(self._path(self.segments[-1]), 'ab')
+
+    def _remove_segment(self, segment: int) -> int:
+        """Segment устгаж, доторх мөрийн тоог буцаах"""
+        path = self._path(segment)
+        with open(path, 'rb') as f:
+            lines = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(65536), b''))
+        self.size -= os.path.getsize(path)
+        os.remove(path)
+        self.segments.remove(segment)
+        return lines
+
+    def _enforce_limit(self):
+        while self.size > self.max_bytes and len(self.segments) > 1:
+            oldest = self.segments[0]
+            if self.cursor[0] == oldest:
+                self.cursor = (self.segments[1], 0)
+            self.dropped_count += self._remove_segment(oldest)
+            logger.warning(f"⚠️  Spool дүүрлээ: {oldest:08d}.log устгагдлаа")
+
+    def append(self, payload: Dict):
+        line = json.dumps(payload, separators=(',', ':')).encode('utf-8') + b'\n'
+        with self.lock:
+            if self.writer.tell() > 0 and self.writer.tell() + len(line) > self.segment_bytes:
+                self._roll()
+            self.writer.write(line)
+            self.writer.flush()
+            self.size += len(line)
+            self.appended_count += 1
+            self._enforce_limit()
+
+    def _quarantine(self, cursor: Cursor, line: bytes):
+        """Задрахгүй мөрийг quarantine файл руу хуулж алгасах (нэг удаа)"""
+        if cursor <= self.quarantine_mark:
+            return
+        self.quarantine_mark = cursor
+        self.corrupt_count += 1
+        with open(os.path.join(self.directory, 'quarantine'), 'ab') as f:
+            f.write(line if line.endswith(b'\n') else line + b'\n')
+        logger.warning(f"⚠️  Spool: эвдэрсэн мөр алгаслаа ({cursor[0]:08d}.log, "
+                       f"{len(line)} байт) → quarantine")
+
+    def read_batch(self, max_items: int) -> List[Tuple[Cursor, Dict]]:
+        """
+        Уншаагүй баримтуудаас max_items хүртэлхийг унших
+
+        Мөр бүрийн дараах cursor-ийг хамт буцаана — commit() хийгээгүй
+        бол дараагийн уншилт ижил байрлалаас эхэлнэ. Эвдэрсэн мөр
+        (гэнэт зогсохоос үлдсэн) quarantine руу шилжиж алгасагдана.
+        """
+        entries = []
+        with self.lock:
+            segment, offset = self.cursor
+            while len(entries) < max_items:
+                with open(self._path(segment), 'rb') as f:
+                    f.seek(offset)
+                    for line in f:
+                        offset += len(line)
+                        try:
+                            entries.append(((segment, offset), json.loads(line)))
+                        except ValueError:
+                            self._quarantine((segment, offset), line)
+                            continue
+                        if len(entries) >= max_items:
+                            break
+                if len(entries) >= max_items or segment == self.segments[-1]:
+                    break
+                segment = self.segments[self.segments.index(segment) + 1]
+                offset = 0
+            if not entries and (segment, offset) != self.cursor:
+                # Зөвхөн эвдэрсэн мөр байсан — дахин уншихгүйн тулд cursor-ийг шилжүүлнэ
+                self._commit((segment, offset))
+        return entries
+
+    def commit(self, cursor: Cursor):
+        """cursor хүртэлх баримтыг илгээгдсэн гэж тэмдэглэх"""
+        with self.lock:
+            self._commit(cursor)
+
+    def _commit(self, cursor: Cursor):
+        if cursor[0] not in self.segments:
+            return
+        self.cursor = cursor
+        for segment in [s for s in self.segments if s < cursor[0]]:
+            self._remove_segment(segment)
+        self._save_cursor()
+
+    def is_empty(self) -> bool:
+        with self.lock:
+            return self.cursor == (self.segments[-1], self.writer.tell())
+
+    def close(self):
+        with self.lock:
+            self.writer.close()
+
+    def get_statistics(self) -> Dict:
+        with self.lock:
+            return {
+                'segments': len(self.segments),
+                'bytes': self.size,
+                'appended': self.appended_count,
+                'dropped': self.dropped_count,
+                'corrupt': self.corrupt_count,
+            }
+
+# ============================================
+# ХУРИМТЛАЛ БУЦААЖ ИЛГЭЭХ
+# ============================================
+
+class SpoolDrainer(threading.Thread):
+    """
+    Spool-ийн хуримтлалыг ард талд илгээх thread
+
+    batch=True бол нэг хүсэлтэд batch_size баримт (/v/value/batch),
+    үгүй бол ижил цагтай баримтуудыг нэгтгэж /v/value руу. replay_rate нь
+    секундэд илгээх баримтын дээд тоо — шууд tick-үүдтэй өрсөлдөхгүйн тулд.
+    """
+
+    def __init__(self, spool: Spool, url: str, batch: bool = True,
+                 batch_size: int = 500, replay_rate: float = 200.0,
+                 compress: bool = True, timeout: float = 10.0):
+        super().__init__(daemon=True, name='SpoolDrainer')
+        self.spool = spool
+        self.url = url
+        self.batch = batch
+        self.batch_size = batch_size
+        self.replay_rate = replay_rate
+        self.compress = compress
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.replayed_count = 0
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _post_batch(self, documents: List[Dict]) -> bool:
+        body = json.dumps(documents, separators=(',', ':')).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if self.compress:
+            body = gzip.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+        response = self.session.post(self.url, data=body, headers=headers, timeout=self.timeout)
+        return response.status_code == 200
+
+    def _drain_once(self, entries) -> int:
+        """Илгээгдсэн баримтын тоог буцаах"""
+        if self.batch:
+            if not self._post_batch([doc for _, doc in entries]):
+                return 0
+            self.spool.commit(entries[-1][0])
+            return len(entries)
+
+        # Бүлэг бүрийг илгээж, cursor-ийг багцын төгсгөлд нэг л удаа
+        sent = 0
+        cursor = None
+        try:
+            for cursor_after, document, count in _merge_by_time(entries):
+                response = self.session.post(self.url, json=document, timeout=self.timeout)
+                if response.status_code != 200:
+                    break
+                cursor = cursor_after
+                sent += count
+        finally:
+            if cursor is not None:
+                self.spool.commit(cursor)
+        return sent
+
+    def run(self):
+        if not self.batch:
+            logger.info("📤 Spool: batch endpoint унтраалттай — ижил цагтай баримтуудыг "
+                        f"нэгтгэн /v/value руу (≤ {self.replay_rate:.0f} баримт/сек)")
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            try:
+                entries = self.spool.read_batch(self.batch_size)
+            except OSError as e:
+                logger.error(f"❌ Spool уншиж чадсангүй: {str(e)}")
+                entries = []
+            if not entries:
+                self._stop_event.wait(1.0)
+                continue
+
+            try:
+                sent = self._drain_once(entries)
+            except requests.RequestException:
+                sent = 0
+            except Exception as e:
+                # Thread чимээгүй үхвэл spool дахин хэзээ ч хоосрохгүй
+                logger.error(f"❌ Spool буцааж илгээх алдаа: {str(e)}")
+                sent = 0
+
+            if sent == 0:
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+                continue
+
+            backoff = 1.0
+            self.replayed_count += sent
+            logger.info(f"📤 Spool: {sent} баримт буцааж илгээлээ")
+            self._stop_event.wait(sent / self.replay_rate)
+
+def _merge_by_time(entries):
+    """
+    Ижил 'time'-тай дараалсан баримтуудыг нэг /v/value баримт болгох
+
+    sensorObjectId төхөөрөмж бүрт өөр тул sensorObjects-ийг залгахад
+    мэдээлэл алдагдахгүй. (cursor_after, баримт, эх баримтын тоо) буцаана.
+    """
+    groups = []
+    for cursor_after, document in entries:
+        if groups and groups[-1][1].get('time') == document.get('time'):
+            _, merged, count = groups[-1]
+            merged['sensorObjects'].extend(document.get('sensorObjects', []))
+            groups[-1] = (cursor_after, merged, count + 1)
+        else:
+            groups.append((cursor_after, {**document,
+                                          'sensorObjects': list(document.get('sensorObjects', []))},
+                           1))
+    return groups
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+ОРОН НУТГИЙН ОРЛОЛТ СЕРВЕР (offline туршилтад)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Жинхэнэ API-ийн оронд ажиллах энгийн HTTP сервер:
+    POST /v/value                                  - нэг баримт
+    POST /v/value/batch                            - баримтын массив (gzip дэмжинэ)
+    Content-Type: application/x-msgpack, application/x-heating-frame - wire.py-ийн кодчилол
+    GET  /m/sensor-objects-in-measurement-object/<id>  - мэдрэгчийн жагсаалт
+
+Ачааллын туршилтад (loadtest.py) хариуны саатал болон алдаа оруулж болно:
+    latency       - хариу бүрийн тогтмол саатал (секунд)
+    jitter        - нэмэлт санамсаргүй саатал [0, jitter)
+    failure_rate  - 503 буцаах магадлал
+
+Ажиллуулах:
+    python stub_server.py [port] [--latency 0.05] [--jitter 0.02] [--failure-rate 0.01]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+from simulator import Config, logger, setup_logger
+from wire import decode
+
+SENSOR_OBJECTS_PATH = re.compile(r'^/m/sensor-objects-in-measurement-object/(\d+)$')
+
+def stub_sensor_id(measurement_id: int, location_id: int) -> int:
+    """Орлолт серверийн sensorObjectId (measurement × 100 + байршил)"""
+    return measurement_id * 100 + location_id
+
+def stub_sensor_ids(measurement_id: int) -> Dict[str, int]:
+    """Бүртгэлээс татахгүйгээр орлолт серверийн ID (bench, loadtest)"""
+    return {key: stub_sensor_id(measurement_id, config['sensorObjectLocationId'])
+            for key, config in Config.SENSORS.items()}
+
+# ============================================
+# СЕРВЕР
+# ============================================
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = None):
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.reading_count = 0
+        self.batch_count = 0
+        self.bytes_received = 0
+        self.injected_failures = 0
+
+    def handle_error(self, request, client_address):
+        # Клиент хүсэлтээ цуцалбал (timeout, шатны төгсгөл) traceback хэвлэхгүй
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def inject(self) -> bool:
+        """Тохируулсан саатлыг хүлээж, алдаа буцаах эсэхийг шийдэх"""
+        with self.lock:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.failure_rate > 0 and self.random.random() < self.failure_rate
+            if fail:
+                self.injected_failures += 1
+        if delay > 0:
+            time.sleep(delay)
+        return fail
+
+    def record(self, readings: int, body_size: int, batch: bool = False):
+        with self.lock:
+            self.request_count += 1
+            self.reading_count += readings
+            self.bytes_received += body_size
+            if batch:
+                self.batch_count += 1
+
+    def get_statistics(self):
+        with self.lock:
+            return {
+                'requests': self.request_count,
+                'readings': self.reading_count,
+                'batches': self.batch_count,
+                'bytes': self.bytes_received,
+                'injected_failures': self.injected_failures,
+            }
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive — HTTP/1.0 бол хариу бүрийн дараа холболт хаагдаж, pool хэмжилт худал болно
+    protocol_version = 'HTTP/1.1'
+    # Толгой, бие тусдаа бичигддэг — Nagle + delayed ACK хариу бүрийг ~40 ms саатуулна
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body=None):
+        data = json.dumps(body if body is not None else {}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        return body
+
+    def do_GET(self):
+        if self.server.inject():
+            return self._reply(503, {'error': 'injected failure'})
+        match = SENSOR_OBJECTS_PATH.match(self.path)
+        if not match:
+            return self._reply(404, {'error': 'not found'})
+
+        measurement_id = int(match.group(1))
+        sensors = [
+            {
+                'id': stub_sensor_id(measurement_id, config['sensorObjectLocationId']),
+                'sensorObjectLocationId': config['sensorObjectLocationId'],
+                'measurementObjectId': measurement_id,
+            }
+            for config in Config.SENSORS.values()
+        ]
+        # Жинхэнэ API 201 буцаадаг
+        self._reply(201, sensors)
+
+    def do_POST(self):
+        raw_size = int(self.headers.get('Content-Length', 0))
+        try:
+            body = self._read_body()
+        except OSError:
+            return self._reply(400, {'error': 'bad payload'})
+        if self.server.inject():
+            return self._reply(503, {'error': 'injected failure'})
+        try:
+            documents = decode(body, self.headers.get('Content-Type', 'application/json'))
+        except (ValueError, TypeError, OSError):
+            return self._reply(400, {'error': 'bad payload'})
+
+        if self.path == '/v/value':
+            if len(documents) != 1:
+                return self._reply(400, {'error': 'expected a single document'})
+            self.server.record(1, raw_size)
+            return self._reply(200, {'accepted': 1})
+
+        if self.path == '/v/value/batch':
+            self.server.record(len(documents), raw_size, batch=True)
+            return self._reply(200, {'accepted': len(documents)})
+
+        self._reply(404, {'error': 'not found'})
+
+# ============================================
+# ТУСЛАХ
+# ============================================
+
+def start_stub_server(host: str = '127.0.0.1', port: int = 0, **options) -> StubServer:
+    """
+    Серверийг ард талын thread дээр эхлүүлэх (port=0 бол чөлөөт порт)
+
+    options: latency, jitter, failure_rate, seed (StubServer)
+    """
+    server = StubServer((host, port), **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def main():
+    setup_logger()
+    parser = argparse.ArgumentParser(description='Орон нутгийн орлолт сервер')
+    parser.add_argument('port', nargs='?', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.0, help='тогтмол саатал (секунд)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='санамсаргүй нэмэлт саатал (секунд)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='503 буцаах магадлал')
+    args = parser.parse_args()
+
+    server = StubServer(('0.0.0.0', args.port), latency=args.latency,
+                        jitter=args.jitter, failure_rate=args.failure_rate)
+    logger.info(f"🧪 Орлолт сервер: http://0.0.0.0:{args.port} "
+                f"(саатал {args.latency}+{args.jitter}s, алдаа {args.failure_rate:.1%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info(f"\n⚠️  Зогслоо: {server.get_statistics()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+THINGSBOARD GATEWAY ГОРИМЫН ФЛОТ ИЛГЭЭГЧ
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+uddt_simulator.py нь access token бүрт нэг MQTT холболт нээдэг.
+Энд нэг gateway холболтоор олон виртуал төхөөрөмжийн telemetry-г
+ThingsBoard-ын gateway сэдвүүдээр илгээнэ:
+
+    v1/gateway/connect     {"device": "SUBSTATION_0001", "type": "..."}
+    v1/gateway/telemetry   {"SUBSTATION_0001": [{"ts": ..., "values": {...}}], ...}
+    v1/gateway/disconnect  {"device": "SUBSTATION_0001"}
+
+Нэг мессежид batch_size төхөөрөмж багтана. Түлхүүрүүд нь widget-ийнхтэй
+ижил (temp_in_fac, press_out_cus, ...) — Config.SENSORS[...]['tbKey'].
+
+'mqtt' шатны хугацаа нь publish()-ээс on_publish хүртэл (QoS 1: PUBACK,
+QoS 0: socket-д бичигдсэн) — дарааллад нэмэх агшин биш.
+"""
+
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Sequence
+
+import paho.mqtt.client as mqtt
+
+from metrics import BYTES_SENT, STAGE_SECONDS
+from simulator import Config, logger, setup_logger
+
+TOPIC_CONNECT = "v1/gateway/connect"
+TOPIC_DISCONNECT = "v1/gateway/disconnect"
+TOPIC_TELEMETRY = "v1/gateway/telemetry"
+
+TB_KEYS = [config['tbKey'] for config in Config.SENSORS.values()]
+
+# ============================================
+# GATEWAY ИЛГЭЭГЧ
+# ============================================
+
+class GatewayPublisher:
+    def __init__(self, host: str = Config.TB_HOST, port: int = Config.TB_PORT,
+                 token: str = Config.TB_GATEWAY_TOKEN,
+                 batch_size: int = Config.TB_BATCH_SIZE, qos: int = Config.TB_QOS,
+                 device_type: str = 'heating_substation'):
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.qos = qos
+        self.device_type = device_type
+
+        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        self.client.username_pw_set(token)
+        self.client.on_publish = self._on_publish
+
+        # mid → publish() эхэлсэн агшин; on_publish нь publish() буцахаас
+        # өмнө ирж болох тул тэр үеийн дууссан агшныг acked-д хадгална
+        self.lock = threading.Lock()
+        self.inflight: Dict[int, float] = {}
+        self.acked: Dict[int, float] = {}
+
+        self.connected_devices = set()
+        self.message_count = 0
+        self.failed_count = 0
+        self.bytes_sent = 0
+
+    def connect(self):
+        self.client.connect(self.host, self.port, 60)
+        self.client.loop_start()
+        logger.info(f"✅ ThingsBoard gateway холбогдлоо: {self.host}:{self.port}")
+
+    def disconnect(self):
+        for device_id in sorted(self.connected_devices):
+            self._publish(TOPIC_DISCONNECT, {'device': device_id})
+        self.connected_devices.clear()
+        self.client.loop_stop()
+        self.client.disconnect()
+        with self.lock:
+            self.inflight.clear()
+            self.acked.clear()
+
+    def _on_publish(self, client, userdata, mid, reason_code=None, properties=None):
+        now = time.perf_counter()
+        with self.lock:
+            started = self.inflight.pop(mid, None)
+            if started is None:
+                self.acked[mid] = now
+                return
+        STAGE_SECONDS.labels(stage='mqtt').observe(now - started)
+
+    def _publish(self, topic: str, message: Dict) -> bool:
+        with STAGE_SECONDS.labels(stage='serialize').time():
+            payload = json.dumps(message, separators=(',', ':'))
+        started = time.perf_counter()
+        info = self.client.publish(topic, payload, qos=self.qos)
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            self.failed_count += 1
+            logger.error(f"❌ MQTT publish алдаа: {mqtt.error_string(info.rc)}")
+            return False
+        with self.lock:
+            acked = self.acked.pop(info.mid, None)
+            if acked is None:
+                self.inflight[info.mid] = started
+        if acked is not None:
+            STAGE_SECONDS.labels(stage='mqtt').observe(acked - started)
+        self.message_count += 1
+        self.bytes_sent += len(payload)
+        BYTES_SENT.labels(transport='mqtt').inc(len(payload))
+        return True
+
+    def connect_devices(self, device_ids: Sequence[str]):
+        """Шинэ төхөөрөмжүүдийг gateway-д бүртгэх (нэг удаа)"""
+        for device_id in device_ids:
+            if device_id not in self.connected_devices:
+                self._publish(TOPIC_CONNECT, {'device': device_id, 'type': self.device_type})
+                self.connected_devices.add(device_id)
+
+    def publish(self, device_ids: Sequence[str], readings, timestamp: datetime = None) -> int:
+        """
+        (N × 8) уншилтыг batch_size төхөөрөмжөөр багцлан илгээх
+
+        readings: NumPy матриц эсвэл мөрүүдийн жагсаалт (Config.SENSORS дараалал)
+        Илгээсэн мессежийн тоог буцаана.
+        """
+        self.connect_devices(device_ids)
+
+        ts = int((timestamp or datetime.now()).timestamp() * 1000)
+        rows = readings.tolist() if hasattr(readings, 'tolist') else readings
+
+        sent = 0
+        for start in range(0, len(device_ids), self.batch_size):
+            message = {
+                device_id: [{'ts': ts, 'values': dict(zip(TB_KEYS, row))}]
+                for device_id, row in zip(device_ids[start:start + self.batch_size],
+                                          rows[start:start + self.batch_size])
+            }
+            if self._publish(TOPIC_TELEMETRY, message):
+                sent += 1
+        return sent
+
+    def get_statistics(self) -> Dict:
+        return {
+            'devices': len(self.connected_devices),
+            'messages': self.message_count,
+            'failed': self.failed_count,
+            'bytes': self.bytes_sent,
+        }
+
+# ============================================
+# MAIN
+# ============================================
+
+def main():
+    setup_logger()
+    from fleet import create_fleet
+    from scheduler import TickScheduler
+
+    fleet = create_fleet(Config.FLEET_SIZE)
+    publisher = GatewayPublisher()
+    scheduler = TickScheduler(Config.SEND_INTERVAL, policy=Config.TICK_POLICY)
+
+    publisher.connect()
+    logger.info(f"🏭 {fleet.size} төхөөрөмж, {Config.TB_BATCH_SIZE} төхөөрөмж/мессеж, QoS {Config.TB_QOS}")
+
+    try:
+        iteration = 0
+        while True:
+            scheduler.wait()
+            iteration += 1
+            publisher.publish(fleet.device_ids, fleet.step())
+
+            if iteration % 10 == 0:
+                stats = publisher.get_statistics()
+                logger.info(f"📈 {stats['messages']} мессеж, {stats['bytes'] / 1024:.1f} KB, "
+                            f"❌ {stats['failed']}")
+    except KeyboardInterrupt:
+        logger.info("\n⚠️  Ctrl+C - Зогсож байна")
+    finally:
+        publisher.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Checkpoint: файлын формат, хадгалах → сэргээх, таарахгүй үед шинээр эхлэх"""
+
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from checkpoint import ALIGN, MAGIC, Checkpointer, read_checkpoint, write_checkpoint
+from deadband import DeadbandFilter
+from fleet import HeatingFleet
+from simulator import Config
+
+START = datetime(2026, 1, 15, 6, 0)
+
+def _step(fleet: HeatingFleet, ticks: int, first: int = 0) -> np.ndarray:
+    for tick in range(first, first + ticks):
+        readings = fleet.step(START + timedelta(seconds=3 * tick))
+    return readings
+
+def _deadband() -> DeadbandFilter:
+    return DeadbandFilter(Config.SENSORS, [0.5] * len(Config.SENSORS), 60.0)
+
+def test_file_round_trip(tmp_path):
+    path = str(tmp_path / 'state.ckpt')
+    arrays = {
+        'a.float': np.linspace(0.0, 1.0, 24).reshape(3, 8),
+        'a.int': np.arange(5, dtype=np.int32),
+        'b.bool': np.array([[True, False]]),
+        'b.empty': np.zeros((0, 8)),
+    }
+    values = {'a.count': 7, 'b.nested': {'state': [1, 2]}}
+    size = write_checkpoint(path, arrays, values)
+    assert os.path.getsize(path) == size
+    assert not os.path.exists(path + '.tmp')
+
+    restored, restored_values = read_checkpoint(path)
+    for name, array in arrays.items():
+        assert restored[name].dtype == array.dtype
+        np.testing.assert_array_equal(restored[name], array)
+        # Массив бүр 64 байтын хил дээр — mmap-аас шууд view
+        assert restored[name].__array_interface__['data'][0] % ALIGN == 0 or array.size == 0
+    assert restored_values['a.count'] == 7
+    assert restored_values['b.nested'] == {'state': [1, 2]}
+    assert 'created' in restored_values
+
+def test_restore_continues_identically(tmp_path):
+    path = str(tmp_path / 'state.ckpt')
+    fleet, deadband = HeatingFleet(5, seed=1), _deadband()
+    deadband.apply(_step(fleet, 10), 30.0)
+    assert Checkpointer(path, {'physics': fleet, 'deadband': deadband}).save()
+    expected = _step(fleet, 5, first=10)
+
+    # Өөр seed — сэргээгээгүй бол өөр утга гарна
+    restored, restored_deadband = HeatingFleet(5, seed=2), _deadband()
+    assert Checkpointer(path, {'physics': restored, 'deadband': restored_deadband}).restore()
+    np.testing.assert_array_equal(_step(restored, 5, first=10), expected)
+    assert restored_deadband.get_statistics() == deadband.get_statistics()
+    np.testing.assert_array_equal(restored_deadband.last_value, deadband.last_value)
+
+def test_mismatched_component_starts_fresh(tmp_path):
+    path = str(tmp_path / 'state.ckpt')
+    fleet, deadband = HeatingFleet(5, seed=1), _deadband()
+    deadband.apply(_step(fleet, 3), 9.0)
+    Checkpointer(path, {'physics': fleet, 'deadband': deadband}).save()
+
+    # Флотын хэмжээ өөрчлөгдсөн — physics алгасна, deadband сэргэнэ
+    resized, restored_deadband = HeatingFleet(7, seed=1), _deadband()
+    initial = resized.get_state()
+    assert Checkpointer(path, {'physics': resized, 'deadband': restored_deadband}).restore()
+    np.testing.assert_array_equal(resized.last_station_temp, initial['last_station_temp'])
+    assert restored_deadband.get_statistics()['offered'] == 5 * len(Config.SENSORS)
+
+    # Юу ч таарахгүй бол False
+    assert not Checkpointer(path, {'physics': HeatingFleet(7, seed=1)}).restore()
+
+def test_missing_or_corrupt_file_starts_fresh(tmp_path):
+    path = str(tmp_path / 'state.ckpt')
+    fleet = HeatingFleet(2, seed=1)
+    assert not Checkpointer(path, {'physics': fleet}).restore()
+    with open(path, 'wb') as f:
+        f.write(b'NOTACKPT' + b'\x00' * 64)
+    assert not Checkpointer(path, {'physics': fleet}).restore()
+    with open(path, 'wb') as f:
+        f.write(MAGIC + b'\x01')  # толгой таслагдсан
+    assert not Checkpointer(path, {'physics': fleet}).restore()
+
+def test_maybe_save_respects_interval(tmp_path):
+    now = [100.0]
+    checkpointer = Checkpointer(str(tmp_path / 'sub' / 'state.ckpt'),
+                                {'physics': HeatingFleet(2, seed=1)}, interval=60.0,
+                                clock=lambda: now[0])
+    now[0] += 59.0
+    assert not checkpointer.maybe_save()
+    now[0] += 1.0
+    assert checkpointer.maybe_save()
+    assert not checkpointer.maybe_save()
+    assert checkpointer.get_statistics()['saves'] == 1
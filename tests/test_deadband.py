@@ -0,0 +1,87 @@
+"""Deadband: дарах, keyframe, алдагдсаны дараах дахин синк"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from deadband import DeadbandFilter
+from pipeline import CircuitBreaker
+from simulator import Config, DataSender
+from sinks import HttpSink, Tick
+from spool import Spool
+from stub_server import start_stub_server, stub_sensor_ids
+
+CHANNELS = ('temp', 'pressure')
+
+def _filter(max_silence=60.0) -> DeadbandFilter:
+    return DeadbandFilter(CHANNELS, [0.5, 0.05], max_silence)
+
+def test_first_tick_sends_everything_then_suppresses():
+    deadband = _filter()
+    assert deadband.filter_rows([[70.0, 6.0], [65.0, 5.5]], 0.0) == [
+        {'temp': 70.0, 'pressure': 6.0}, {'temp': 65.0, 'pressure': 5.5}]
+    assert deadband.filter_rows([[70.2, 6.01], [65.0, 5.5]], 3.0) == [{}, {}]
+
+def test_only_channels_past_threshold_are_sent():
+    deadband = _filter()
+    deadband.filter({'temp': 70.0, 'pressure': 6.0}, 0.0)
+    assert deadband.filter({'temp': 70.6, 'pressure': 6.02}, 3.0) == {'temp': 70.6}
+    # Босгыг сүүлд илгээснээс тооцно — бага багаар гулсахад ч илгээгдэнэ
+    assert deadband.filter({'temp': 70.9, 'pressure': 6.04}, 6.0) == {}
+    assert deadband.filter({'temp': 71.2, 'pressure': 6.06}, 9.0) == {'temp': 71.2,
+                                                                     'pressure': 6.06}
+
+def test_max_silence_keyframe():
+    deadband = _filter(max_silence=10.0)
+    deadband.filter({'temp': 70.0, 'pressure': 6.0}, 0.0)
+    assert deadband.filter({'temp': 70.0, 'pressure': 6.0}, 9.0) == {}
+    assert deadband.filter({'temp': 70.0, 'pressure': 6.0}, 10.0) == {'temp': 70.0,
+                                                                      'pressure': 6.0}
+    assert deadband.get_statistics()['keyframes'] == 2
+
+def test_force_keyframe_rows():
+    deadband = _filter()
+    rows = np.array([[70.0, 6.0], [65.0, 5.5], [60.0, 5.0]])
+    deadband.apply(rows, 0.0)
+    deadband.force_keyframe([1])
+    assert deadband.apply(rows, 1.0).tolist() == [[False, False], [True, True], [False, False]]
+    deadband.force_keyframe()
+    assert deadband.apply(rows, 2.0).all()
+
+def test_fleet_size_change_resets_state():
+    deadband = _filter()
+    deadband.apply([[70.0, 6.0]], 0.0)
+    assert deadband.apply([[70.0, 6.0], [65.0, 5.5]], 1.0).all()
+
+def test_state_round_trip():
+    deadband = _filter()
+    deadband.apply([[70.0, 6.0]], 0.0)
+    restored = _filter()
+    restored.set_state(deadband.get_state())
+    assert not restored.apply([[70.1, 6.0]], 1.0).any()
+    assert restored.get_statistics()['offered'] == 4
+
+def _resyncs(spool) -> int:
+    """Үргэлж 503 буцаах сервер рүү 4 tick — хэдэн удаа бүтэн keyframe болсон"""
+    server = start_stub_server(failure_rate=1.0)
+    try:
+        sender = DataSender(f"http://127.0.0.1:{server.server_address[1]}/v/value",
+                            spool=spool, sensor_ids=stub_sensor_ids(1))
+        deadband = DeadbandFilter(Config.SENSORS, [1.0] * len(Config.SENSORS), 600.0)
+        sink = HttpSink(sender, deadband, CircuitBreaker(failure_threshold=100))
+        start = datetime(2026, 1, 1, tzinfo=timezone(timedelta(hours=8)))
+        row = np.linspace(60.0, 67.0, 8)
+        sent = []
+        for tick in range(4):
+            before = deadband.sent_count
+            sink.write(Tick(start + timedelta(seconds=3 * tick), ['SUBSTATION_01'], row[None, :]))
+            sent.append(deadband.sent_count - before)
+        return sum(1 for count in sent[1:] if count == 8)
+    finally:
+        server.shutdown()
+
+def test_spooled_failures_do_not_force_keyframes(tmp_path):
+    assert _resyncs(Spool(str(tmp_path))) == 0
+
+def test_lost_failures_force_keyframes():
+    assert _resyncs(None) == 3
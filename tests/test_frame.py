@@ -0,0 +1,58 @@
+"""ReadingFrame: Mapping зан төлөв, загвар JSON нь build_payload-тай байт бүрээрээ ижил"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from simulator import DEFAULT_SENSOR_IDS, FRAME_SCHEMA, Config, build_payload, encode_json
+from stub_server import stub_sensor_ids
+
+TIMESTAMP = datetime(2026, 1, 15, 6, 30, 0, 250000, tzinfo=timezone(timedelta(hours=8)))
+
+VALUES = [
+    [60.123456789 + i for i in range(len(Config.SENSORS))],
+    [70.0, -0.0, 1e-07, 1e20, 5.5, 0.1 + 0.2, -273.15, 3.0],
+    # numpy-оос ирсэн мөр (np.float64 нь float-ийн дэд анги)
+    list(np.linspace(40.0, 75.0, len(Config.SENSORS))),
+]
+
+def _dumps(readings, sensor_ids=None) -> str:
+    return json.dumps(build_payload(readings, TIMESTAMP, sensor_ids), separators=(',', ':'))
+
+@pytest.mark.parametrize('values', VALUES)
+@pytest.mark.parametrize('sensor_ids', [None, stub_sensor_ids(7)])
+def test_frame_json_matches_build_payload(values, sensor_ids):
+    frame = FRAME_SCHEMA.frame(list(values))
+    readings = dict(zip(Config.SENSORS, values))
+    assert encode_json(frame, TIMESTAMP, sensor_ids) == _dumps(readings, sensor_ids)
+
+def test_template_escapes_string_ids():
+    sensor_ids = {key: f'id-%s-"{i}"' for i, key in enumerate(Config.SENSORS)}
+    frame = FRAME_SCHEMA.frame(list(VALUES[0]))
+    encoded = encode_json(frame, TIMESTAMP, sensor_ids)
+    assert encoded == _dumps(dict(frame.items()), sensor_ids)
+    assert json.loads(encoded) == build_payload(frame, TIMESTAMP, sensor_ids)
+
+def test_template_is_cached_per_id_set():
+    ids = FRAME_SCHEMA.ids(DEFAULT_SENSOR_IDS)
+    assert FRAME_SCHEMA.json_template(ids) is FRAME_SCHEMA.json_template(ids)
+
+def test_frame_behaves_like_dict():
+    values = list(VALUES[0])
+    frame = FRAME_SCHEMA.frame(values)
+    readings = dict(zip(Config.SENSORS, values))
+    assert dict(frame) == dict(**frame) == readings
+    assert list(frame) == list(Config.SENSORS) and len(frame) == len(Config.SENSORS)
+    key = next(iter(Config.SENSORS))
+    frame[key] = 12.5
+    # Frame жагсаалтыг хуулахгүй — эзэмшинэ
+    assert values[0] == frame[key] == 12.5
+    with pytest.raises(KeyError):
+        frame['unknown']
+
+def test_partial_dict_still_encodes():
+    # Deadband-ийн хэсэгчилсэн dict → build_payload зам
+    readings = {key: 1.5 for key in list(Config.SENSORS)[:2]}
+    assert encode_json(readings, TIMESTAMP) == _dumps(readings)
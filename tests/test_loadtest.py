@@ -0,0 +1,31 @@
+"""Саатлгүй орон нутгийн шатны хариу хэдхэн ms-д багтах (Nagle / delayed ACK буцаж ирэхгүй)"""
+
+import asyncio
+
+from fleet import HeatingFleet
+from loadtest import LoadGenerator, Stage
+from stub_server import start_stub_server, stub_sensor_ids
+
+def test_local_stage_latency_is_not_delayed_ack_bound():
+    server = start_stub_server()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    stage = Stage(20, 4.0, 1, 2.0)
+    fleet = HeatingFleet(stage.devices, seed=1)
+    generator = LoadGenerator(base + '/v/value', base + '/v/value/batch')
+    generator.sensor_ids = [stub_sensor_ids(i + 1) for i in range(fleet.size)]
+
+    async def run():
+        await generator.open()
+        try:
+            return (await generator.run_stage(stage, fleet)).summary()
+        finally:
+            await generator.close()
+
+    try:
+        summary = asyncio.run(run())
+    finally:
+        server.shutdown()
+    assert summary['statuses'] == {'200': summary['scheduled']}
+    assert summary['cancelled'] == 0
+    # Delayed ACK-тай үед p95 ~45 ms байсан
+    assert summary['latency_ms']['p95'] < 15.0
@@ -0,0 +1,31 @@
+"""Шуугианы урсгалууд алхам / цэг хооронд давхцахгүй байх"""
+
+import numpy as np
+
+from dynamics import sensor_noise
+
+def _correlation(a, b):
+    return abs(np.corrcoef(a.ravel(), b.ravel())[0, 1])
+
+def test_sensor_noise_independent_across_reports():
+    shape = (500, 8)
+    for substep in (10, 11, 40):
+        current = sensor_noise(7, substep, shape)
+        following = sensor_noise(7, substep + 1, shape)
+        assert np.intersect1d(current, following).size == 0
+        # Өмнөх тайлангийн шуугиан 4k утгаар шилжээгүй
+        for shift in (4, 8, 120):
+            assert _correlation(current.ravel()[shift:], following.ravel()[:-shift]) < 0.1
+
+def test_sensor_noise_reproducible():
+    assert np.array_equal(sensor_noise(7, 10, (3, 8)), sensor_noise(7, 10, (3, 8)))
+
+def test_district_noise_does_not_rotate_between_points():
+    from weather import WeatherProvider
+
+    districts = {f'd{i}': {'lat': 47.9 + i * 0.01, 'lon': 106.9} for i in range(9)}
+    provider = WeatherProvider(districts, noise=2.0, seed=3)
+    point = 29_000_000
+    current = provider._noise_point(point).copy()
+    following = provider._noise_point(point + 1)
+    assert np.intersect1d(current, following).size == 0
@@ -0,0 +1,130 @@
+"""Circuit breaker-ийн төлөв ба дамжуулах шугамын дүүрэх үеийн бодлого"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pipeline import BLOCK, CLOSED, DROP_OLDEST, HALF_OPEN, OPEN, SPILL, CircuitBreaker, \
+    DeliveryPipeline
+from simulator import Config, DataSender
+from spool import Spool
+from stub_server import stub_sensor_ids
+
+TIMESTAMP = datetime(2026, 1, 15, 6, 30, tzinfo=timezone(timedelta(hours=8)))
+READINGS = {key: 60.0 + i for i, key in enumerate(Config.SENSORS)}
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def _breaker(clock) -> CircuitBreaker:
+    return CircuitBreaker(failure_threshold=3, reset_timeout=10.0, max_timeout=30.0, clock=clock)
+
+def test_breaker_opens_after_threshold():
+    breaker = _breaker(FakeClock())
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.get_statistics() == {'state': OPEN, 'opens': 1, 'rejected': 1,
+                                        'timeout': 10.0}
+
+def test_success_resets_consecutive_failures():
+    breaker = _breaker(FakeClock())
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+def test_half_open_trial_closes_on_success():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 8.9  # jitter-ийн доод хязгаар (0.9 × 10)-аас өмнө
+    assert not breaker.allow()
+    clock.now += 2.2
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.timeout == 10.0
+
+def test_failed_trial_doubles_timeout_up_to_max():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+    for expected in (20.0, 30.0, 30.0):
+        clock.now += 40.0
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.timeout == expected
+        clock.now += expected * 0.89
+        assert not breaker.allow()
+    # Дахин нээгдэх нь шинэ тасалдал биш
+    assert breaker.open_count == 1
+
+def _sender(spool=None) -> DataSender:
+    return DataSender('http://127.0.0.1:9/v/value', spool=spool, sensor_ids=stub_sensor_ids(1))
+
+def test_drop_oldest_keeps_newest():
+    # Thread-ийг эхлүүлэхгүй — дараалал дүүрсэн хэвээр
+    pipeline = DeliveryPipeline(_sender(), max_size=2, policy=DROP_OLDEST)
+    for n in range(5):
+        pipeline.submit(READINGS, TIMESTAMP + timedelta(seconds=n))
+    assert [item[1] for item in list(pipeline.queue.queue)] == [
+        TIMESTAMP + timedelta(seconds=3), TIMESTAMP + timedelta(seconds=4)]
+    stats = pipeline.get_statistics()
+    assert (stats['submitted'], stats['dropped'], stats['max_depth']) == (5, 3, 2)
+
+def test_spill_writes_overflow_to_spool(tmp_path):
+    spool = Spool(str(tmp_path))
+    pipeline = DeliveryPipeline(_sender(spool), max_size=2, policy=SPILL)
+    for n in range(5):
+        pipeline.submit(READINGS, TIMESTAMP + timedelta(seconds=n))
+    assert pipeline.queue.qsize() == 2
+    assert (pipeline.spilled_count, pipeline.dropped_count) == (3, 0)
+    assert [document['time'] for _, document in spool.read_batch(10)] == [
+        (TIMESTAMP + timedelta(seconds=n)).isoformat() for n in range(2, 5)]
+
+def test_policy_validation():
+    with pytest.raises(ValueError):
+        DeliveryPipeline(_sender(), policy=SPILL)
+    with pytest.raises(ValueError):
+        DeliveryPipeline(_sender(), policy='drop_newest')
+
+def test_block_waits_for_room():
+    pipeline = DeliveryPipeline(_sender(), max_size=1, policy=BLOCK)
+    pipeline.submit(READINGS, TIMESTAMP)
+    # Дараалал дүүрсэн — дараагийн submit хаяхгүй, сул зай гартал хүлээнэ
+    blocked = threading.Thread(target=pipeline.submit,
+                               args=(READINGS, TIMESTAMP + timedelta(seconds=1)))
+    blocked.start()
+    blocked.join(0.2)
+    assert blocked.is_alive()
+    assert pipeline.queue.get_nowait()[1] == TIMESTAMP
+    blocked.join(1.0)
+    assert not blocked.is_alive()
+    assert pipeline.queue.get_nowait()[1] == TIMESTAMP + timedelta(seconds=1)
+    assert pipeline.dropped_count == 0
+
+def test_open_breaker_defers_without_sending(tmp_path):
+    spool = Spool(str(tmp_path))
+    sender = _sender(spool)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60.0)
+    breaker.record_failure()
+    pipeline = DeliveryPipeline(sender, breaker, max_size=10)
+    pipeline.submit(READINGS, TIMESTAMP)
+    pipeline.stop(timeout=1.0)
+    assert len(spool.read_batch(10)) == 1
+    assert sender.get_statistics()['failed'] == 0
@@ -0,0 +1,82 @@
+"""Tick төлөвлөгч: skip / catch_up бодлого, тараасан slot-ууд алгасалтын дараа"""
+
+from datetime import datetime
+
+import pytest
+
+from scheduler import CATCH_UP, SKIP, StaggeredScheduler, TickScheduler, device_phase
+from simulator import SimulatedClock
+
+def _clock() -> SimulatedClock:
+    return SimulatedClock(datetime(2026, 1, 15, 6, 0))
+
+def test_on_time_ticks_follow_the_grid():
+    clock = _clock()
+    scheduler = TickScheduler(3.0, phase=1.0, clock=clock)
+    for expected in (1.0, 4.0, 7.0):
+        assert scheduler.wait() == 0.0
+        assert clock.monotonic() == expected
+        clock.sleep(0.5)  # tick-ийн ажил давтамжийг гулсуулахгүй
+    assert scheduler.get_statistics()['overruns'] == 0
+
+def test_skip_drops_missed_ticks():
+    clock = _clock()
+    scheduler = TickScheduler(3.0, policy=SKIP, clock=clock)
+    scheduler.wait()
+    clock.sleep(10.0)  # 3, 6, 9 өнгөрсөн
+    # 3, 6 алгасагдаж, хамгийн сүүлийн хуваарь (9) шууд
+    assert scheduler.wait() == 1.0
+    assert scheduler.wait() == 0.0
+    assert clock.monotonic() == 12.0
+    stats = scheduler.get_statistics()
+    assert (stats['ticks'], stats['overruns'], stats['skipped']) == (3, 1, 2)
+
+def test_catch_up_fires_missed_ticks_back_to_back():
+    clock = _clock()
+    scheduler = TickScheduler(3.0, policy=CATCH_UP, clock=clock)
+    scheduler.wait()
+    clock.sleep(10.0)
+    # Хүлээлтгүй дараалан: 3, 6, 9 — дараа нь хуваарьтаа буцна
+    assert [scheduler.wait() for _ in range(3)] == [7.0, 4.0, 1.0]
+    assert clock.monotonic() == 10.0
+    assert scheduler.wait() == 0.0
+    assert clock.monotonic() == 12.0
+    assert scheduler.get_statistics()['skipped'] == 0
+
+def test_catch_up_is_capped():
+    clock = _clock()
+    scheduler = TickScheduler(3.0, policy=CATCH_UP, max_catch_up=1, clock=clock)
+    scheduler.wait()
+    clock.sleep(10.0)
+    # 3 алгасагдана, 6 ба 9 гүйцээгдэнэ
+    assert [scheduler.wait() for _ in range(2)] == [4.0, 1.0]
+    assert scheduler.skipped_count == 1
+
+def test_validation():
+    with pytest.raises(ValueError):
+        TickScheduler(0.0)
+    with pytest.raises(ValueError):
+        TickScheduler(1.0, policy='late')
+
+def test_device_phase_is_stable_and_in_range():
+    phases = [device_phase(f'SUBSTATION_{i:02d}', 3.0) for i in range(50)]
+    assert phases == [device_phase(f'SUBSTATION_{i:02d}', 3.0) for i in range(50)]
+    assert all(0.0 <= phase < 3.0 for phase in phases)
+    assert len(set(phases)) > 1
+
+def test_staggered_groups_cover_the_fleet():
+    scheduler = StaggeredScheduler(3.0, device_count=10, slots=3, clock=_clock())
+    groups = [scheduler.wait() for _ in range(3)]
+    assert [list(group) for group in groups] == [[0, 1, 2], [3, 4, 5], [6, 7, 8, 9]]
+
+def test_staggered_slot_stays_aligned_after_skip():
+    clock = _clock()
+    scheduler = StaggeredScheduler(3.0, device_count=6, slots=3, policy=SKIP, clock=clock)
+    assert scheduler.wait() == range(0, 2)   # t=0
+    assert scheduler.wait() == range(2, 4)   # t=1
+    clock.sleep(2.5)                         # t=2 алгасагдана
+    # t=3 — бүлэг 0-ийн агшин; алгассан slot-ыг дараагийн бүлэгт шилжүүлэхгүй
+    assert scheduler.wait() == range(0, 2)
+    assert scheduler.wait() == range(2, 4)
+    assert clock.monotonic() == 4.0
+    assert scheduler.get_statistics()['skipped'] == 1
@@ -0,0 +1,101 @@
+"""Spool: segment солих, cursor, хорио (quarantine), буцааж илгээх"""
+
+import os
+
+from spool import Spool, SpoolDrainer
+from stub_server import start_stub_server
+
+def _document(n: int, time: str = None) -> dict:
+    return {'time': time or f'2026-01-01T00:00:{n:02d}+08:00',
+            'sensorObjects': [{'sensorObjectId': 100 + n, 'value': float(n)}]}
+
+def test_segments_roll_and_cursor_survives_reopen(tmp_path):
+    spool = Spool(str(tmp_path), segment_bytes=200)
+    for n in range(10):
+        spool.append(_document(n))
+    assert len(spool.segments) > 1
+
+    entries = spool.read_batch(4)
+    assert [doc['sensorObjects'][0]['value'] for _, doc in entries] == [0.0, 1.0, 2.0, 3.0]
+    spool.commit(entries[-1][0])
+    spool.close()
+
+    reopened = Spool(str(tmp_path), segment_bytes=200)
+    rest = reopened.read_batch(100)
+    assert [doc['sensorObjects'][0]['value'] for _, doc in rest] == [float(n) for n in range(4, 10)]
+    reopened.commit(rest[-1][0])
+    assert reopened.is_empty()
+    # Бүрэн уншсан segment-ууд устгагдана
+    assert len(reopened.segments) == 1
+
+def test_uncommitted_batch_is_read_again(tmp_path):
+    spool = Spool(str(tmp_path))
+    for n in range(3):
+        spool.append(_document(n))
+    first = spool.read_batch(10)
+    assert spool.read_batch(10) == first
+
+def test_corrupt_line_is_quarantined_once(tmp_path):
+    spool = Spool(str(tmp_path))
+    spool.append(_document(0))
+    spool.writer.write(b'{not json\n')
+    spool.writer.flush()
+    spool.append(_document(2))
+
+    entries = spool.read_batch(10)
+    assert [doc['sensorObjects'][0]['value'] for _, doc in entries] == [0.0, 2.0]
+    spool.read_batch(10)  # дахин уншихад дахин хуулахгүй
+    assert spool.corrupt_count == 1
+    with open(os.path.join(str(tmp_path), 'quarantine'), 'rb') as f:
+        assert f.read() == b'{not json\n'
+
+def test_only_corrupt_lines_advance_cursor(tmp_path):
+    spool = Spool(str(tmp_path))
+    spool.writer.write(b'garbage\n')
+    spool.writer.flush()
+    assert spool.read_batch(10) == []
+    assert spool.is_empty()
+
+def test_partial_tail_is_repaired(tmp_path):
+    spool = Spool(str(tmp_path))
+    spool.append(_document(0))
+    spool.writer.write(b'{"time": "trunc')
+    spool.close()
+    assert len(Spool(str(tmp_path)).read_batch(10)) == 1
+
+def test_drainer_batch_and_grouped_replay(tmp_path):
+    server = start_stub_server()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        spool = Spool(str(tmp_path / 'batch'))
+        for n in range(5):
+            spool.append(_document(n))
+        drainer = SpoolDrainer(spool, base + '/v/value/batch', batch=True, compress=True)
+        assert drainer._drain_once(spool.read_batch(10)) == 5
+        assert spool.is_empty()
+        assert server.get_statistics()['batches'] == 1
+
+        # /v/value: ижил цагтай баримтууд нэг POST болно
+        spool = Spool(str(tmp_path / 'single'))
+        for tick in range(2):
+            for n in range(3):
+                spool.append(_document(n, time=f'2026-01-01T00:00:0{tick}+08:00'))
+        drainer = SpoolDrainer(spool, base + '/v/value', batch=False)
+        before = server.get_statistics()['requests']
+        assert drainer._drain_once(spool.read_batch(10)) == 6
+        assert server.get_statistics()['requests'] - before == 2
+        assert spool.is_empty()
+    finally:
+        server.shutdown()
+
+def test_drainer_keeps_backlog_on_failure(tmp_path):
+    server = start_stub_server(failure_rate=1.0)
+    try:
+        spool = Spool(str(tmp_path))
+        spool.append(_document(0))
+        drainer = SpoolDrainer(spool, f"http://127.0.0.1:{server.server_address[1]}/v/value",
+                               batch=False)
+        assert drainer._drain_once(spool.read_batch(10)) == 0
+        assert not spool.is_empty()
+    finally:
+        server.shutdown()
@@ -0,0 +1,66 @@
+"""Хоёртын кодчилол: encode → decode, амжилтгүй багцын spool"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from simulator import FRAME_SCHEMA, BatchingSender, Config, build_payload
+from spool import Spool
+from stub_server import stub_sensor_ids
+from wire import CONTENT_TYPES, FRAME, JSON, MSGPACK, STRUCT, WireEncoder, decode, msgpack
+
+TZ = timezone(timedelta(hours=8))
+TIMESTAMP = datetime(2026, 1, 15, 6, 30, 0, 250000, tzinfo=TZ)
+SENSOR_IDS = stub_sensor_ids(3)
+READINGS = {key: 60.123456789 + i for i, key in enumerate(Config.SENSORS)}
+
+ENCODINGS = [STRUCT, pytest.param(MSGPACK, marks=pytest.mark.skipif(
+    msgpack is None, reason='msgpack суулгаагүй'))]
+
+@pytest.mark.parametrize('encoding', ENCODINGS)
+def test_round_trip(encoding):
+    encoder = WireEncoder(encoding, Config.SENSORS)
+    body = b''.join(encoder.encode(SENSOR_IDS, TIMESTAMP + timedelta(seconds=i), READINGS)
+                    for i in range(3))
+    documents = decode(body, CONTENT_TYPES[encoding])
+    assert len(documents) == 3
+    for i, document in enumerate(documents):
+        assert datetime.fromisoformat(document['time']) == TIMESTAMP + timedelta(seconds=i)
+        ids = [item['sensorObjectId'] for item in document['sensorObjects']]
+        values = [item['value'] for item in document['sensorObjects']]
+        assert ids == [SENSOR_IDS[key] for key in Config.SENSORS]
+        # float32 нарийвчлал
+        np.testing.assert_allclose(values, [READINGS[key] for key in Config.SENSORS], rtol=1e-6)
+
+@pytest.mark.parametrize('encoding', ENCODINGS)
+def test_frame_and_dict_encode_identically(encoding):
+    encoder = WireEncoder(encoding, Config.SENSORS)
+    frame = FRAME_SCHEMA.frame([READINGS[key] for key in Config.SENSORS])
+    assert encoder.encode(SENSOR_IDS, TIMESTAMP, frame) == encoder.encode(SENSOR_IDS, TIMESTAMP,
+                                                                          READINGS)
+
+def test_struct_frame_is_fixed_size():
+    encoder = WireEncoder(STRUCT, Config.SENSORS)
+    assert len(encoder.encode(SENSOR_IDS, TIMESTAMP, READINGS)) == FRAME.size == 72
+    with pytest.raises(ValueError):
+        decode(b'\x00' * (FRAME.size - 1), CONTENT_TYPES[STRUCT])
+
+def test_json_decode_accepts_document_or_array():
+    document = build_payload(READINGS, TIMESTAMP, SENSOR_IDS)
+    assert decode(json.dumps(document).encode(), CONTENT_TYPES[JSON]) == [document]
+    assert decode(json.dumps([document, document]).encode()) == [document, document]
+
+def test_failed_binary_batch_spools_original_readings(tmp_path):
+    spool = Spool(str(tmp_path))
+    sender = BatchingSender('http://127.0.0.1:9/v/value/batch', max_items=2, compress=False,
+                            spool=spool, sensor_ids=SENSOR_IDS, encoding=STRUCT)
+    assert sender.send(READINGS, TIMESTAMP)
+    assert not sender.send(READINGS, TIMESTAMP + timedelta(seconds=3))
+
+    documents = [document for _, document in spool.read_batch(10)]
+    # float32 фрэймээс биш — анхны утга, анхны цагийн бүс
+    assert documents[0] == build_payload(READINGS, TIMESTAMP, SENSOR_IDS)
+    assert documents[1]['time'] == (TIMESTAMP + timedelta(seconds=3)).isoformat()
+    assert sender.get_statistics()['spooled'] == 2
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+TIMESCALEDB РУУ ШУУД БӨӨНӨӨР БИЧИХ
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+HTTP API нь уншилт бүрт нэг хүсэлт — түүхэн өгөгдөл нөхөхөд удаан.
+Энд мөрүүдийг санах ойд багцалж, холболтын жижиг pool-оор hypertable руу
+COPY хийнэ:
+
+    write() → [буфер] ─ batch_rows эсвэл flush_interval ─→ thread pool
+                                                            ↓
+        COPY heating_staging FROM STDIN (BINARY)   ← сессийн түр хүснэгт
+        INSERT INTO heating_readings SELECT ... ON CONFLICT DO NOTHING
+
+(device_id, time) давхцвал алгасна — ижил хугацааг дахин ачаалахад
+давхардал үүсэхгүй. Хүснэгт, hypertable-ийг анх холбогдоход үүсгэнэ
+(timescaledb өргөтгөлгүй Postgres дээр энгийн хүснэгт хэвээр үлдэнэ).
+
+Орон нутгийн контейнер дээр турших:
+
+    docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=test timescale/timescaledb:latest-pg16
+    python timescale_sink.py --dsn "host=localhost user=postgres password=test" \\
+        --devices 1000 --start 2025-10-01T00:00 --duration 86400 --step 10
+    python timescale_sink.py --dsn ... --recording day.rec     # recording.py-ийн бичлэг
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Sequence
+
+from psycopg import sql
+from psycopg_pool import ConnectionPool
+
+from metrics import STAGE_SECONDS
+from simulator import Config, logger, setup_logger
+
+CHANNELS = tuple(Config.SENSORS)
+COLUMNS = ('time', 'device_id') + CHANNELS
+COPY_TYPES = ['timestamptz', 'text'] + ['float4'] * len(CHANNELS)
+
+# ============================================
+# БИЧИГЧ
+# ============================================
+
+class TimescaleWriter:
+    def __init__(self, dsn: str = Config.TIMESCALE_DSN, table: str = Config.TIMESCALE_TABLE,
+                 batch_rows: int = Config.TIMESCALE_BATCH_ROWS,
+                 flush_interval: float = Config.TIMESCALE_FLUSH_INTERVAL,
+                 pool_size: int = Config.TIMESCALE_POOL_SIZE):
+        """
+        batch_rows:     Нэг COPY-ийн мөрийн тоо
+        flush_interval: Буфер үүнээс удаан хүлээхгүй (секунд)
+        pool_size:      Зэрэг COPY хийх холболтын тоо
+        """
+        self.dsn = dsn
+        self.table = table
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.pool_size = pool_size
+
+        self.pool = None
+        self.executor = None
+        # Буфер нь pool_size-аас их хүлээгдэж буй багц үүсгэхгүй — санах ой хязгаартай
+        self.slots = threading.BoundedSemaphore(pool_size)
+        self.lock = threading.Lock()
+
+        self.buffer: List[tuple] = []
+        self.last_flush = time.monotonic()
+
+        self.inserted_count = 0
+        self.skipped_count = 0
+        self.failed_count = 0
+        self.batch_count = 0
+
+    def connect(self):
+        self.pool = ConnectionPool(self.dsn, min_size=1, max_size=self.pool_size,
+                                   name='timescale', open=True)
+        self.pool.wait(timeout=30)
+        self.executor = ThreadPoolExecutor(self.pool_size, thread_name_prefix='timescale')
+        self.ensure_schema()
+        logger.info(f"✅ TimescaleDB холбогдлоо: {self.table} ({self.pool_size} холболт)")
+
+    def ensure_schema(self):
+        table = sql.Identifier(self.table)
+        channels = sql.SQL(', ').join(
+            sql.SQL('{} real').format(sql.Identifier(channel)) for channel in CHANNELS
+        )
+        with self.pool.connection() as conn:
+            conn.execute(sql.SQL(
+                "CREATE TABLE IF NOT EXISTS {} ("
+                "time timestamptz NOT NULL, device_id text NOT NULL, {}, "
+                "PRIMARY KEY (device_id, time))"
+            ).format(table, channels))
+            has_timescale = conn.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'"
+            ).fetchone()
+            if has_timescale:
+                conn.execute("SELECT create_hypertable(%s, 'time', if_not_exists => TRUE, "
+                             "migrate_data => TRUE)", (self.table,))
+            else:
+                logger.warning("⚠️  timescaledb өргөтгөл алга — энгийн хүснэгт ашиглана")
+
+    def write(self, device_ids: Sequence[str], readings, timestamp: datetime = None):
+        """
+        (N × 8) уншилтыг буферт нэмэх
+
+        readings: NumPy матриц эсвэл мөрүүдийн жагсаалт (Config.SENSORS дараалал)
+        """
+        timestamp = timestamp or datetime.now(timezone(timedelta(hours=8)))
+        rows = readings.tolist() if hasattr(readings, 'tolist') else readings
+        self.buffer.extend((timestamp, device_id, *row) for device_id, row in zip(device_ids, rows))
+        if (len(self.buffer) >= self.batch_rows
+                or time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush(wait=False)
+
+    def flush(self, wait: bool = True):
+        """Буферийг COPY-д өгөх (wait=True бол бүх багц дуусахыг хүлээнэ)"""
+        while self.buffer:
+            batch = self.buffer[:self.batch_rows]
+            del self.buffer[:self.batch_rows]
+            self.slots.acquire()
+            self.executor.submit(self._copy, batch)
+        self.last_flush = time.monotonic()
+
+        if wait:
+            for _ in range(self.pool_size):
+                self.slots.acquire()
+            for _ in range(self.pool_size):
+                self.slots.release()
+
+    def _copy(self, rows: List[tuple]):
+        staging = sql.Identifier(f"{self.table}_staging")
+        columns = sql.SQL(', ').join(map(sql.Identifier, COLUMNS))
+        try:
+            with STAGE_SECONDS.labels(stage='copy').time(), self.pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(sql.SQL(
+                        "CREATE TEMP TABLE IF NOT EXISTS {} (LIKE {} INCLUDING DEFAULTS) "
+                        "ON COMMIT DELETE ROWS"
+                    ).format(staging, sql.Identifier(self.table)))
+                    with cur.copy(sql.SQL("COPY {} ({}) FROM STDIN (FORMAT BINARY)")
+                                  .format(staging, columns)) as copy:
+                        copy.set_types(COPY_TYPES)
+                        for row in rows:
+                            copy.write_row(row)
+                    cur.execute(sql.SQL(
+                        "INSERT INTO {} ({}) SELECT {} FROM {} ON CONFLICT DO NOTHING"
+                    ).format(sql.Identifier(self.table), columns, columns, staging))
+                    inserted = cur.rowcount
+            with self.lock:
+                self.inserted_count += inserted
+                self.skipped_count += len(rows) - inserted
+                self.batch_count += 1
+        except Exception as e:
+            with self.lock:
+                self.failed_count += len(rows)
+            logger.error(f"❌ TimescaleDB COPY алдаа ({len(rows)} мөр): {str(e)}")
+        finally:
+            self.slots.release()
+
+    def disconnect(self):
+        if self.pool is None:
+            return
+        self.flush()
+        self.executor.shutdown(wait=True)
+        self.pool.close()
+        self.pool = None
+
+    def get_statistics(self) -> Dict:
+        with self.lock:
+            return {
+                'inserted': self.inserted_count,
+                'skipped': self.skipped_count,
+                'failed': self.failed_count,
+                'batches': self.batch_count,
+                'buffered': len(self.buffer),
+            }
+
+# ============================================
+# MAIN
+# ============================================
+
+def main():
+    setup_logger()
+    parser = argparse.ArgumentParser(description='Симуляцийн өгөгдлийг TimescaleDB руу нөхөж ачаалах')
+    parser.add_argument('--dsn', default=Config.TIMESCALE_DSN)
+    parser.add_argument('--table', default=Config.TIMESCALE_TABLE)
+    parser.add_argument('--batch-rows', type=int, default=Config.TIMESCALE_BATCH_ROWS)
+    parser.add_argument('--pool-size', type=int, default=Config.TIMESCALE_POOL_SIZE)
+    parser.add_argument('--recording', help='recording.py-ийн бичлэг (өгвөл физик тооцоолохгүй)')
+    parser.add_argument('--devices', type=int, default=Config.FLEET_SIZE)
+    parser.add_argument('--start', help='ISO цаг (GMT+8)',
+                        default=(datetime.now() - timedelta(days=1)).replace(microsecond=0).isoformat())
+    parser.add_argument('--duration', type=float, default=86400.0, help='секунд')
+    parser.add_argument('--step', type=float, default=Config.SEND_INTERVAL, help='секунд')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    writer = TimescaleWriter(args.dsn, args.table, args.batch_rows, pool_size=args.pool_size)
+    writer.connect()
+    started = time.perf_counter()
+    rows = 0
+    try:
+        if args.recording:
+            from recording import Recording
+            recording = Recording(args.recording)
+            device_ids = recording.device_ids
+            for times, block in recording.chunks():
+                for timestamp_ms, readings in zip(times.tolist(), block):
+                    writer.write(device_ids, readings, recording.timestamp(timestamp_ms))
+                rows += block.shape[0] * block.shape[1]
+        else:
+            from fleet import create_fleet
+            fleet = create_fleet(args.devices, seed=args.seed)
+            start = datetime.fromisoformat(args.start)
+            if start.tzinfo is None:
+                start = start.replace(tzinfo=timezone(timedelta(hours=8)))
+            end = start + timedelta(seconds=args.duration)
+            for times, block in fleet.stream(start, end, timedelta(seconds=args.step)):
+                for timestamp, readings in zip(times, block):
+                    writer.write(fleet.device_ids, readings, timestamp)
+                rows += block.shape[0] * block.shape[1]
+    except KeyboardInterrupt:
+        logger.info("\n⚠️  Ctrl+C - Зогсож байна")
+    finally:
+        writer.disconnect()
+
+    elapsed = time.perf_counter() - started
+    stats = writer.get_statistics()
+    logger.info(f"💾 {rows} мөр {elapsed:.1f} секундэд ({rows / max(elapsed, 1e-9):.0f} мөр/с): "
+                f"✅ {stats['inserted']} шинэ, ⏭️ {stats['skipped']} давхцсан, "
+                f"❌ {stats['failed']} алдаа, {stats['batches']} COPY")
+
+if __name__ == "__main__":
+    main()
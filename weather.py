@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+ДҮҮРГИЙН ЦАГ АГААРЫН ТАЛБАР
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+get_outdoor_temperature() дуудлага бүр шинэ шуугиан татдаг байсан тул
+_print_readings-ийн гадны температур физикт ашигласантай таардаггүй, N
+төхөөрөмжтэй флотод tick бүрт 2N удаа тооцоологддог байв. Энд:
+
+    WeatherProvider.field(now)      ← дүүрэг бүрт нэг утга (D,), now-оор кэшлэнэ
+         │
+         └─ weights (N × D) @ field  ← төхөөрөмжийн байршлаар interpolation
+
+Шуугиан нь resolution (секунд) тутмын цэгүүдийн хооронд шугаман
+interpolation — Philox(seed, counter-ийн дээд үг = цэгийн дугаар)-аар тодорхойлогддог
+тул ижил цагт бүх процесс (shard) ижил цаг агаар харна.
+
+Түүхэн өгөгдөл (WEATHER_FILE): CSV-г нэг удаа хоёртын хавтас болгож
+(<csv>.wx/: meta.json, time.i8, values.f4), дараа нь mmap-аар уншина:
+
+    time,temperature                       ← бүх дүүрэгт (+ дүүргийн offset)
+    2024-01-15T00:00,-31.2
+    ...
+    time,sukhbaatar,bayanzurkh,...         ← эсвэл дүүрэг бүрт тусдаа багана
+
+Цагийн индекс: алхам тогтмол бол шууд тооцоолно (O(1)), үгүй бол
+np.searchsorted. Хоёр мөрийн хооронд шугаман interpolation.
+
+    python weather.py import ub_2024.csv
+    python weather.py info ub_2024.csv
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+VERSION = 1
+META_FILE = 'meta.json'
+TIME_FILE = 'time.i8'
+VALUES_FILE = 'values.f4'
+TIME_DTYPE = np.dtype('<i8')
+VALUE_DTYPE = np.dtype('<f4')
+LOCAL_TZ = timezone(timedelta(hours=8))  # Улаанбаатар (CSV-ийн цагийн бүсгүй утгууд)
+
+# ============================================
+# ТҮҮХЭН ӨГӨГДӨЛ
+# ============================================
+
+class HistoricalWeather:
+    """Хоёртын хавтсыг mmap-аар уншиж, дурын агшинд interpolation хийх"""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['version'] != VERSION:
+            raise ValueError(f"unsupported weather cache version: {meta['version']}")
+        self.path = path
+        self.columns = meta['columns']
+        self.times = np.memmap(os.path.join(path, TIME_FILE), dtype=TIME_DTYPE, mode='r')
+        self.values = np.memmap(os.path.join(path, VALUES_FILE), dtype=VALUE_DTYPE, mode='r',
+                                shape=(len(self.times), len(self.columns)))
+        if len(self.times) < 2:
+            raise ValueError("weather history needs at least two rows")
+
+        # Алхам тогтмол бол индекс = (t - t0) / step
+        steps = np.diff(self.times)
+        self.step = int(steps[0]) if np.all(steps == steps[0]) else None
+
+    @classmethod
+    def load(cls, path: str) -> 'HistoricalWeather':
+        """CSV бол хоёртын кэшийг (шаардлагатай бол) үүсгээд нээнэ"""
+        if os.path.isdir(path):
+            return cls(path)
+        cache = path + '.wx'
+        meta = os.path.join(cache, META_FILE)
+        if not os.path.exists(meta) or os.path.getmtime(meta) < os.path.getmtime(path):
+            import_csv(path, cache)
+        return cls(cache)
+
+    def index(self, seconds: np.ndarray):
+        """Агшин бүрийн доод мөрийн индекс ба жин (хил дээр хязгаарлана)"""
+        last = len(self.times) - 1
+        if self.step is not None:
+            position = (seconds - self.times[0]) / self.step
+        else:
+            lower = np.clip(np.searchsorted(self.times, seconds, side='right') - 1, 0, last - 1)
+            span = self.times[lower + 1] - self.times[lower]
+            position = lower + (seconds - self.times[lower]) / span
+        position = np.clip(position, 0, last)
+        lower = np.minimum(position.astype(np.int64), last - 1)
+        return lower, position - lower
+
+    def at(self, seconds) -> np.ndarray:
+        """Unix секундын (k,) массивт (k × C) температур"""
+        lower, weight = self.index(np.atleast_1d(np.asarray(seconds, dtype=np.float64)))
+        weight = weight[:, np.newaxis]
+        return self.values[lower] * (1 - weight) + self.values[lower + 1] * weight
+
+    def describe(self) -> str:
+        start = datetime.fromtimestamp(int(self.times[0]), LOCAL_TZ)
+        end = datetime.fromtimestamp(int(self.times[-1]), LOCAL_TZ)
+        step = f"{self.step} с алхам" if self.step is not None else "жигд бус алхам"
+        return (f"{self.path}: {len(self.times)} мөр ({step}), {start.isoformat()} → "
+                f"{end.isoformat()}, багана: {', '.join(self.columns)}")
+
+def import_csv(csv_path: str, cache: str) -> str:
+    """time,<багана>... CSV-г хоёртын хавтас болгох (цагаар эрэмбэлнэ)"""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        if header[0] != 'time' or len(header) < 2:
+            raise ValueError("weather CSV must start with a 'time' column")
+        times, values = [], []
+        for row in reader:
+            if not row:
+                continue
+            timestamp = datetime.fromisoformat(row[0])
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=LOCAL_TZ)
+            times.append(int(timestamp.timestamp()))
+            values.append([float(value) for value in row[1:]])
+
+    order = np.argsort(times, kind='stable')
+    os.makedirs(cache, exist_ok=True)
+    np.asarray(times, dtype=TIME_DTYPE)[order].tofile(os.path.join(cache, TIME_FILE))
+    np.asarray(values, dtype=VALUE_DTYPE)[order].tofile(os.path.join(cache, VALUES_FILE))
+    tmp = os.path.join(cache, META_FILE + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': VERSION, 'columns': header[1:], 'source': csv_path}, f)
+    os.replace(tmp, os.path.join(cache, META_FILE))
+    return cache
+
+# ============================================
+# ЦАГ АГААРЫН ТАЛБАР
+# ============================================
+
+class WeatherProvider:
+    def __init__(self, districts: Dict[str, Dict], history: Optional[HistoricalWeather] = None,
+                 noise: float = 2.0, resolution: float = 60.0, seed: int = 0):
+        """
+        districts:  {нэр: {'lat', 'lon', 'offset'}} — offset нь дүүргийн зөрүү (°C)
+        history:    Түүхэн өгөгдөл (None бол өдрийн синус загвар)
+        noise:      Дүүргийн шуугианы стандарт хазайлт (°C)
+        resolution: Шуугианы цэгүүдийн хоорондох хугацаа (секунд)
+        """
+        if resolution <= 0:
+            raise ValueError("resolution must be positive")
+        self.names = list(districts)
+        self.coords = np.array([[d['lat'], d['lon']] for d in districts.values()])
+        self.offsets = np.array([d.get('offset', 0.0) for d in districts.values()])
+        self.history = history
+        self.noise = noise
+        self.resolution = resolution
+        self.seed = seed
+
+        # Түүхэн баганыг дүүрэгт: нэрээр, байхгүй бол эхний багана + offset
+        if history is not None:
+            self.columns = np.array([history.columns.index(name) if name in history.columns else 0
+                                     for name in self.names])
+            self.column_offsets = np.where(
+                [name in history.columns for name in self.names], 0.0, self.offsets)
+
+        self._field_key = None
+        self._field = None
+        self._noise_points: Dict[int, np.ndarray] = {}
+        self.computed_count = 0
+
+    # ---------- байршил ----------
+
+    def weights(self, locations) -> np.ndarray:
+        """(N × 2) өргөрөг/уртрагаас (N × D) inverse-distance² жин (мөр бүрийн нийлбэр 1)"""
+        locations = np.atleast_2d(np.asarray(locations, dtype=np.float64))
+        scale = np.array([1.0, math.cos(math.radians(float(self.coords[:, 0].mean())))])
+        distance2 = (((locations[:, np.newaxis, :] - self.coords[np.newaxis]) * scale) ** 2).sum(-1)
+        exact = distance2 < 1e-12
+        weights = np.where(exact.any(axis=1, keepdims=True), exact.astype(np.float64),
+                           1.0 / np.maximum(distance2, 1e-12))
+        return weights / weights.sum(axis=1, keepdims=True)
+
+    def locate(self, device_ids: Sequence[str], spread: float = 0.02) -> np.ndarray:
+        """
+        Байршилгүй төхөөрөмжүүдийг дүүрэгт тогтмол (crc32) хуваарилах
+
+        Төхөөрөмж бүр дүүргийн төвөөс ±spread градус зөрнө.
+        """
+        locations = np.empty((len(device_ids), 2))
+        for i, device_id in enumerate(device_ids):
+            digest = zlib.crc32(device_id.encode('utf-8'))
+            district = digest % len(self.names)
+            jitter = np.array([(digest >> 8) & 0xFFF, (digest >> 20) & 0xFFF]) / 0xFFF * 2 - 1
+            locations[i] = self.coords[district] + jitter * spread
+        return locations
+
+    # ---------- талбар ----------
+
+    def climate(self, start: datetime, offsets: np.ndarray) -> np.ndarray:
+        """start + offsets (секунд, (k,)) агшнуудын шуугиангүй суурь температур (k × D)"""
+        offsets = np.atleast_1d(np.asarray(offsets, dtype=np.float64))
+        if self.history is not None:
+            values = self.history.at(start.timestamp() + offsets)
+            return values[:, self.columns] + self.column_offsets
+        seconds = (start.hour * 3600 + start.minute * 60 + start.second
+                   + start.microsecond / 1e6 + offsets)
+        daily_variation = 5 * np.sin((seconds / 3600 - 6) * math.pi / 12)
+        return (-20.0 + daily_variation)[:, np.newaxis] + self.offsets
+
+    def _noise_point(self, point: int) -> np.ndarray:
+        values = self._noise_points.get(point)
+        if values is None:
+            if len(self._noise_points) > 8:
+                self._noise_points.clear()
+            # Цэгийн дугаар нь counter-ийн дээд үг — доод үг үүсгэх явцад
+            # нэмэгддэг тул point, point+1-ийн утгууд дүүргүүдээр эргэлдэхгүй
+            values = self._noise_points[point] = np.random.Generator(
+                np.random.Philox(key=self.seed, counter=[0, 0, 0, point % 2 ** 64])
+            ).normal(0, self.noise, len(self.names))
+        return values
+
+    def field(self, now: datetime) -> np.ndarray:
+        """now агшны дүүрэг бүрийн температур (D,) — ижил now-д дахин тооцоолохгүй"""
+        key = now.timestamp()
+        if key == self._field_key:
+            return self._field
+        field = self.climate(now, 0.0)[0]
+        if self.noise > 0:
+            position = key / self.resolution
+            point = math.floor(position)
+            weight = position - point
+            field = field + (self._noise_point(point) * (1 - weight)
+                             + self._noise_point(point + 1) * weight)
+        self._field_key, self._field = key, field
+        self.computed_count += 1
+        return field
+
+    def temperature(self, now: datetime, weights: np.ndarray) -> np.ndarray:
+        """Төхөөрөмж бүрийн гадны температур (N,)"""
+        return weights @ self.field(now)
+
+# ============================================
+# MAIN
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Түүхэн цаг агаарын өгөгдөл')
+    parser.add_argument('command', choices=['import', 'info'])
+    parser.add_argument('path', help='CSV эсвэл <csv>.wx хавтас')
+    args = parser.parse_args()
+
+    if args.command == 'import' and not os.path.isdir(args.path):
+        import_csv(args.path, args.path + '.wx')
+    print(HistoricalWeather.load(args.path).describe())
+
+if __name__ == "__main__":
+    main()
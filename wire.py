@@ -0,0 +1,126 @@
+"""
+ТЕЛЕМЕТРИЙН ТОВЧ (ХОЁРТЫН) КОДЧИЛОЛ
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+/v/value-ийн JSON нь tick бүрт 'sensorObjectId'/'value' түлхүүр болон ISO
+цагийг давтдаг (~340 байт). Сул холболтод зориулсан хоёр хувилбар:
+
+    struct   '<8I q 8f' тогтмол бичлэг — 8 sensorObjectId, цаг (мс), 8 float32 (72 байт)
+    msgpack  [ids, цаг (мс), утгууд] MessagePack массив (~60-75 байт)
+
+Бичлэгийн толгой (8 sensorObjectId) төхөөрөмж бүрт нэг удаа кодлогдож
+кэшлэгдэнэ — tick бүрт зөвхөн цаг болон утгууд нэмэгдэнэ. Олон бичлэгийг
+зүгээр л залгаж багцална (/v/value/batch).
+
+Утгууд Config.SENSORS-ийн дарааллаар, float32 нарийвчлалтай.
+"""
+
+import json
+import struct
+from datetime import datetime, timezone
+from typing import Dict, List, Sequence, Tuple
+
+from frame import ReadingFrame
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = 'json'
+MSGPACK = 'msgpack'
+STRUCT = 'struct'
+
+CONTENT_TYPES = {
+    JSON: 'application/json',
+    MSGPACK: 'application/x-msgpack',
+    STRUCT: 'application/x-heating-frame',
+}
+ENCODINGS = {content_type: name for name, content_type in CONTENT_TYPES.items()}
+
+N_SENSORS = 8
+HEADER = struct.Struct(f'<{N_SENSORS}I')
+BODY = struct.Struct(f'<q{N_SENSORS}f')
+FRAME = struct.Struct(f'<{N_SENSORS}Iq{N_SENSORS}f')
+
+# ============================================
+# КОДЛОГЧ
+# ============================================
+
+class WireEncoder:
+    def __init__(self, encoding: str, channels: Sequence[str]):
+        """
+        encoding: 'msgpack' эсвэл 'struct'
+        channels: Config.SENSORS-ийн түлхүүрүүд (утгын дараалал)
+        """
+        if encoding not in (MSGPACK, STRUCT):
+            raise ValueError(f"unknown wire encoding: {encoding}")
+        if encoding == MSGPACK and msgpack is None:
+            raise RuntimeError("msgpack суулгаагүй байна: pip install msgpack")
+        self.encoding = encoding
+        self.content_type = CONTENT_TYPES[encoding]
+        self.channels = tuple(channels)
+        self.headers: Dict[Tuple[int, ...], bytes] = {}
+
+    def header(self, sensor_ids: Tuple[int, ...]) -> bytes:
+        """Төхөөрөмжийн толгой (кэштэй) — ID өөрчлөгдвөл шинээр кодлогдоно"""
+        header = self.headers.get(sensor_ids)
+        if header is None:
+            if self.encoding == STRUCT:
+                header = HEADER.pack(*sensor_ids)
+            else:
+                header = b'\x93' + msgpack.packb(list(sensor_ids))
+            header = self.headers[sensor_ids] = header
+        return header
+
+    def encode_row(self, sensor_ids: Tuple[int, ...], timestamp_ms: int,
+                   values: Sequence[float]) -> bytes:
+        """Нэг бичлэг (values нь channels дарааллаар)"""
+        if self.encoding == STRUCT:
+            return self.header(sensor_ids) + BODY.pack(timestamp_ms, *values)
+        return (self.header(sensor_ids) + msgpack.packb(timestamp_ms)
+                + msgpack.packb(list(values), use_single_float=True))
+
+    def encode(self, sensor_ids: Dict[str, int], timestamp: datetime,
+               readings: Dict[str, float]) -> bytes:
+        if isinstance(readings, ReadingFrame) and readings.schema.channels == self.channels:
+            ids, values = readings.schema.ids(sensor_ids), readings.data
+        else:
+            ids = tuple(sensor_ids[key] for key in self.channels)
+            values = [readings[key] for key in self.channels]
+        return self.encode_row(ids, int(timestamp.timestamp() * 1000), values)
+
+# ============================================
+# ЗАДЛАГЧ
+# ============================================
+
+def _document(sensor_ids, timestamp_ms, values) -> Dict:
+    return {
+        'time': datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc).isoformat(),
+        'sensorObjects': [
+            {'sensorObjectId': sensor_id, 'value': value}
+            for sensor_id, value in zip(sensor_ids, values)
+        ],
+    }
+
+def decode(body: bytes, content_type: str = CONTENT_TYPES[JSON]) -> List[Dict]:
+    """
+    Биеийг /v/value-ийн JSON баримтуудын жагсаалт болгох
+
+    JSON нь нэг баримт эсвэл массив байж болно. Хоёртын бие нь
+    залгасан бичлэгүүд.
+    """
+    encoding = ENCODINGS.get(content_type.split(';')[0].strip())
+    if encoding == STRUCT:
+        if len(body) % FRAME.size:
+            raise ValueError(f"frame хэмжээ буруу: {len(body)} байт")
+        return [_document(frame[:N_SENSORS], frame[N_SENSORS], frame[N_SENSORS + 1:])
+                for frame in FRAME.iter_unpack(body)]
+    if encoding == MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack суулгаагүй байна")
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(body)
+        return [_document(*record) for record in unpacker]
+    documents = json.loads(body)
+    return documents if isinstance(documents, list) else [documents]